@@ -0,0 +1,120 @@
+"""
+Crash-safe checkpoints for the video analysis pipeline.
+
+The intermediate results used to be rewritten in full after every analyzed
+video, which costs O(N) per video and leaves a truncated file behind if the
+process dies mid-write. AnalysisJournal splits them in two:
+
+- a snapshot (youtube_analysis_intermediate.json) with the run header: channel,
+  top videos, analysis step and the analyses known when it was written. It is
+  only rewritten at step boundaries, atomically (temp file + fsync + rename).
+- an append-only journal (youtube_analysis_journal.ndjson) with one fsync'd
+  line per completed video analysis, so a checkpoint costs the same whatever
+  the run size.
+
+load() replays the journal over the snapshot. Writing a new snapshot compacts
+the journal into it and truncates the journal. A line torn by a crash is
+ignored, so at most the analysis in flight is lost.
+"""
+
+import json
+import os
+import threading
+
+INTERMEDIATE_FILE = 'youtube_analysis_intermediate.json'
+JOURNAL_FILE = 'youtube_analysis_journal.ndjson'
+
+
+def write_json_atomic(path, document):
+    """
+    Writes a JSON document so readers see either the old or the new file, never a partial one.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(document, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class AnalysisJournal:
+    """
+    Snapshot plus append-only journal of per-video analyses.
+    """
+
+    def __init__(self, snapshot_path=INTERMEDIATE_FILE, journal_path=JOURNAL_FILE):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self._lock = threading.Lock()
+        self._journal = None
+
+    def append(self, video_id, video_analysis):
+        """
+        Durably records the analysis of one video.
+        """
+        line = json.dumps({'video_id': video_id, **video_analysis}) + '\n'
+        with self._lock:
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a')
+                # Start on a fresh line after a write torn by a crash
+                if self._journal.tell() > 0 and not self._ends_with_newline():
+                    self._journal.write('\n')
+            self._journal.write(line)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def _ends_with_newline(self):
+        with open(self.journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def replay(self):
+        """
+        Yields the journaled (video_id, analysis) pairs in the order they were written.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from an interrupted run
+                    continue
+                video_id = record.pop('video_id')
+                yield video_id, record
+
+    def load(self):
+        """
+        Returns the snapshot with the journaled analyses merged into its video_analyses.
+
+        Raises:
+            OSError or ValueError if there is no readable snapshot
+        """
+        with open(self.snapshot_path, 'r') as f:
+            results = json.load(f)
+        results.setdefault('video_analyses', {})
+        for video_id, video_analysis in self.replay():
+            results['video_analyses'][video_id] = video_analysis
+        return results
+
+    def save(self, results):
+        """
+        Atomically writes a new snapshot and compacts the journal into it.
+
+        results must already contain every journaled analysis that should be kept.
+        """
+        with self._lock:
+            write_json_atomic(self.snapshot_path, results)
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            # The snapshot now holds everything, so the journal starts over
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
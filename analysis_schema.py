@@ -0,0 +1,205 @@
+"""
+Typed records for the structured (JSON schema) outputs of the analysis prompts.
+
+The title, thumbnail and patterns requests ask the model for JSON that follows
+a strict schema (response_format json_schema) instead of free text. Responses
+are validated into the dataclasses below, which render the markdown used in
+the reports and the sections shown by the dashboard, so nothing has to be
+recovered from the text afterwards.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+# Sections of the patterns report, as the dashboard looks them up
+COMMON_PATTERNS_SECTION = 'common patterns and success factors'
+RECOMMENDATIONS_SECTION = 'actionable recommendations'
+
+
+def _require(data, key, kind):
+    value = data.get(key) if isinstance(data, dict) else None
+    if not isinstance(value, kind):
+        raise ValueError(f"Expected '{key}' to be {kind.__name__}, got {type(value).__name__}")
+    return value
+
+
+def _strict_object(properties):
+    return {
+        'type': 'object',
+        'properties': properties,
+        'required': list(properties),
+        'additionalProperties': False
+    }
+
+
+def response_format(name, schema):
+    """
+    Returns the response_format of a chat completion request for a strict JSON schema.
+    """
+    return {
+        'type': 'json_schema',
+        'json_schema': {'name': name, 'strict': True, 'schema': schema}
+    }
+
+
+@dataclass
+class AnalysisElement:
+    """
+    One aspect of a title or thumbnail (e.g. keywords, composition) and why it works.
+    """
+    name: str
+    explanation: str
+
+    SCHEMA = _strict_object({
+        'name': {'type': 'string'},
+        'explanation': {'type': 'string'}
+    })
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(name=_require(data, 'name', str), explanation=_require(data, 'explanation', str))
+
+
+@dataclass
+class ElementAnalysis:
+    """
+    Analysis of a title or a thumbnail: a summary and the elements that make it effective.
+    """
+    summary: str
+    elements: list = field(default_factory=list)
+
+    SCHEMA = _strict_object({
+        'summary': {'type': 'string'},
+        'elements': {'type': 'array', 'items': AnalysisElement.SCHEMA}
+    })
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            summary=_require(data, 'summary', str),
+            elements=[AnalysisElement.from_dict(element) for element in _require(data, 'elements', list)]
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        Validates a structured response. Raises ValueError if it does not match the schema.
+        """
+        return cls.from_dict(json.loads(text))
+
+    def to_text(self):
+        lines = [self.summary, ""] if self.summary else []
+        for i, element in enumerate(self.elements, 1):
+            lines.append(f"{i}. **{element.name}**: {element.explanation}")
+        return "\n".join(lines).strip()
+
+    def to_ui(self):
+        """
+        Returns the {full_text, sections} form shown by the dashboard.
+        """
+        result = {'full_text': self.to_text()}
+        if self.elements:
+            result['sections'] = {element.name.strip().lower(): element.explanation for element in self.elements}
+        return result
+
+
+TITLE_ANALYSIS_FORMAT = response_format('title_analysis', ElementAnalysis.SCHEMA)
+THUMBNAIL_ANALYSIS_FORMAT = response_format('thumbnail_analysis', ElementAnalysis.SCHEMA)
+
+
+@dataclass
+class PatternItem:
+    """
+    A pattern or recommendation with its supporting points.
+    """
+    title: str
+    points: list = field(default_factory=list)
+
+    SCHEMA = _strict_object({
+        'title': {'type': 'string'},
+        'points': {'type': 'array', 'items': {'type': 'string'}}
+    })
+
+    @classmethod
+    def from_dict(cls, data):
+        points = _require(data, 'points', list)
+        if not all(isinstance(point, str) for point in points):
+            raise ValueError("Expected 'points' to be a list of strings")
+        return cls(title=_require(data, 'title', str), points=points)
+
+
+def render_items(items):
+    """
+    Renders numbered items as '1. **Title**:' followed by bullet points.
+    """
+    lines = []
+    for i, item in enumerate(items, 1):
+        # The dashboard splits items on '**Title**:', so titles cannot contain colons
+        title = item.title.replace(':', '').strip()
+        lines.append(f"{i}. **{title}**:")
+        lines.extend(f"- {point}" for point in item.points)
+    return "\n".join(lines)
+
+
+@dataclass
+class PatternsReport:
+    """
+    Patterns shared by the top videos and recommendations derived from them.
+    """
+    summary: str
+    common_patterns: list = field(default_factory=list)
+    recommendations: list = field(default_factory=list)
+
+    SCHEMA = _strict_object({
+        'summary': {'type': 'string'},
+        'common_patterns': {'type': 'array', 'items': PatternItem.SCHEMA},
+        'recommendations': {'type': 'array', 'items': PatternItem.SCHEMA}
+    })
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            summary=_require(data, 'summary', str),
+            common_patterns=[PatternItem.from_dict(item) for item in _require(data, 'common_patterns', list)],
+            recommendations=[PatternItem.from_dict(item) for item in _require(data, 'recommendations', list)]
+        )
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        Validates a structured response. Raises ValueError if it does not match the schema.
+        """
+        return cls.from_dict(json.loads(text))
+
+    def sections(self):
+        return {
+            COMMON_PATTERNS_SECTION: render_items(self.common_patterns),
+            RECOMMENDATIONS_SECTION: render_items(self.recommendations)
+        }
+
+    def to_text(self):
+        parts = [f"### {name.title()}\n\n{text}" for name, text in self.sections().items() if text]
+        if self.summary:
+            parts.append(f"### Summary\n\n{self.summary}")
+        return "\n\n".join(parts)
+
+    def to_ui(self):
+        """
+        Returns the {full_text, sections} form shown by the dashboard.
+        """
+        return {'full_text': self.to_text(), 'sections': {name: text for name, text in self.sections().items() if text}}
+
+
+PATTERNS_REPORT_FORMAT = response_format('patterns_report', PatternsReport.SCHEMA)
+
+
+def parse_structured(record_class, text):
+    """
+    Returns the record for a structured response, or None for free text (errors, older cached answers).
+    """
+    if not isinstance(text, str):
+        return None
+    try:
+        return record_class.from_json(text)
+    except ValueError:
+        return None
@@ -1,48 +1,37 @@
 import json
-import os
-import requests
-from io import BytesIO
-import pandas as pd
-from openai import OpenAI
-
-from PIL import Image
-from urllib.request import urlopen
-import matplotlib.pyplot as plt
-import seaborn as sns
+from functools import lru_cache
+from llm_cache import LLMCache, LazyOpenAI, cached_completion
+from video_dataset import load_video_dataset, select_top_videos
 
 
 API_KEY = "sk-XXX"
 
-# Initialize OpenAI client
-client = OpenAI(api_key=API_KEY)
+# OpenAI client, created on first request
+client = LazyOpenAI(api_key=API_KEY)
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    """Shared cache of OpenAI responses, keyed on the full request, opened on first use"""
+    return LLMCache()
 
 def load_data(json_file_path):
-    """Load YouTube data from JSON file"""
+    """Load YouTube data from JSON file, with the videos as a typed DataFrame (cached as Feather)"""
     try:
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-        return data
+        channel, videos = load_video_dataset(json_file_path)
+        return {'channel': channel, 'videos': videos}
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
 def get_top_videos(data, metric='views', count=10):
     """Get top videos based on specified metric"""
-    videos = data['videos']
-    df = pd.DataFrame(videos)
-    
-    # Convert views to numeric if not already
-    if df[metric].dtype == 'object':
-        df[metric] = pd.to_numeric(df[metric])
-    
-    # Sort by the chosen metric and get top N
-    top_videos = df.sort_values(by=metric, ascending=False).head(count)
-    return top_videos
+    return select_top_videos(data['videos'], metric=metric, count=count)
 
 def analyze_title_with_llm(title):
     """Analyze title using OpenAI's GPT model"""
     try:
-        response = client.chat.completions.create(
+        # Responses are cached on the full request, so a prompt change is never served stale
+        return cached_completion(client, dict(
             model="gpt-4o",
             messages=[
                 {
@@ -56,8 +45,7 @@ def analyze_title_with_llm(title):
             ],
             temperature=0.7,
             max_tokens=500
-        )
-        return response.choices[0].message.content
+        ), get_llm_cache())
     except Exception as e:
         print(f"Error analyzing title with LLM: {e}")
         return "Error analyzing title"
@@ -66,6 +54,7 @@ def analyze_thumbnail_with_vision(thumbnail_url):
     """Analyze thumbnail using OpenAI's Vision model"""
     try:
         # Get image data
+        import requests
         response = requests.get(thumbnail_url)
         if response.status_code != 200:
             return "Failed to retrieve thumbnail image"
@@ -73,8 +62,8 @@ def analyze_thumbnail_with_vision(thumbnail_url):
         # Convert image to base64 (alternative approach)
         image_content = response.content
         
-        # Send to OpenAI Vision
-        response = client.chat.completions.create(
+        # Send to OpenAI Vision (cached on the full request)
+        return cached_completion(client, dict(
             model="gpt-4o",
             messages=[
                 {
@@ -95,8 +84,7 @@ def analyze_thumbnail_with_vision(thumbnail_url):
                 }
             ],
             max_tokens=500
-        )
-        return response.choices[0].message.content
+        ), get_llm_cache())
     except Exception as e:
         print(f"Error analyzing thumbnail with Vision: {e}")
         return "Error analyzing thumbnail"
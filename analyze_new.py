@@ -1,63 +1,37 @@
 import json
-import os
-import requests
-from io import BytesIO
-import pandas as pd
-from openai import OpenAI
-
-from PIL import Image
-from urllib.request import urlopen
-import matplotlib.pyplot as plt
-import seaborn as sns
+from functools import lru_cache
+from llm_cache import LLMCache, LazyOpenAI, cached_completion
+from video_dataset import load_video_dataset, select_top_videos
 
 API_KEY = "sk-XXX"
 
 
-# Initialize OpenAI client
-client = OpenAI(api_key=API_KEY)
+# OpenAI client, created on first request
+client = LazyOpenAI(api_key=API_KEY)
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    """Shared cache of OpenAI responses, keyed on the full request, opened on first use"""
+    return LLMCache()
 
 def load_data(json_file_path):
-    """Load YouTube data from JSON file"""
+    """Load YouTube data from JSON file, with the videos as a typed DataFrame (cached as Feather)"""
     try:
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-        return data
+        channel, videos = load_video_dataset(json_file_path)
+        return {'channel': channel, 'videos': videos}
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
 def get_top_videos(data, metric='views', count=10):
     """Get top videos based on specified metric"""
-    videos = data['videos']
-    df = pd.DataFrame(videos)
-    
-    # Convert views to numeric if not already
-    if df[metric].dtype == 'object':
-        df[metric] = pd.to_numeric(df[metric])
-    
-    # Sort by the chosen metric and get top N
-    top_videos = df.sort_values(by=metric, ascending=False).head(count)
-    return top_videos
+    return select_top_videos(data['videos'], metric=metric, count=count)
 
 def analyze_title_with_llm(title):
     """Analyze title using OpenAI's GPT model"""
-    # Check if we already have a cached title analysis
-    cache_dir = "title_analysis_cache"
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    # Create a cache filename based on a hash of the title
-    import hashlib
-    title_hash = hashlib.md5(title.encode()).hexdigest()
-    cache_file = os.path.join(cache_dir, f"{title_hash}.txt")
-    
-    # Check if analysis is already cached
-    if os.path.exists(cache_file):
-        print(f"Loading cached title analysis for '{title}'")
-        with open(cache_file, 'r') as f:
-            return f.read()
-    
     try:
-        response = client.chat.completions.create(
+        # Responses are cached on the full request, so a prompt change is never served stale
+        return cached_completion(client, dict(
             model="gpt-4o",
             messages=[
                 {
@@ -71,43 +45,22 @@ def analyze_title_with_llm(title):
             ],
             temperature=0.7,
             max_tokens=2048
-        )
-        
-        analysis = response.choices[0].message.content
-        
-        # Cache the result
-        with open(cache_file, 'w') as f:
-            f.write(analysis)
-            
-        return analysis
+        ), get_llm_cache())
     except Exception as e:
         print(f"Error analyzing title with LLM: {e}")
         return "Error analyzing title"
 
 def analyze_thumbnail_with_vision(thumbnail_url):
     """Analyze thumbnail using OpenAI's Vision model"""
-    # Check if we already have a cached thumbnail analysis
-    cache_dir = "thumbnail_analysis_cache"
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    # Create a cache filename based on the video ID (extracted from URL)
-    video_id = thumbnail_url.split('/')[-2] if '/vi/' in thumbnail_url else thumbnail_url.split('/')[-1].split('.')[0]
-    cache_file = os.path.join(cache_dir, f"{video_id}.txt")
-    
-    # Check if analysis is already cached
-    if os.path.exists(cache_file):
-        print(f"Loading cached thumbnail analysis for {video_id}")
-        with open(cache_file, 'r') as f:
-            return f.read()
-    
     try:
         # Get image data
+        import requests
         response = requests.get(thumbnail_url)
         if response.status_code != 200:
             return "Failed to retrieve thumbnail image"
         
-        # Send to OpenAI Vision
-        response = client.chat.completions.create(
+        # Send to OpenAI Vision (cached on the full request)
+        return cached_completion(client, dict(
             model="gpt-4o",
             messages=[
                 {
@@ -128,15 +81,7 @@ def analyze_thumbnail_with_vision(thumbnail_url):
                 }
             ],
             max_tokens=500
-        )
-        
-        analysis = response.choices[0].message.content
-        
-        # Cache the result
-        with open(cache_file, 'w') as f:
-            f.write(analysis)
-            
-        return analysis
+        ), get_llm_cache())
     except Exception as e:
         print(f"Error analyzing thumbnail with Vision: {e}")
         return "Error analyzing thumbnail"
@@ -205,6 +150,8 @@ def generate_patterns_report(all_analyses):
 
 def save_intermediate_results(data, video_analyses, top_videos, step="video_analysis"):
     """Save intermediate results to avoid repeating analysis if there's an error later"""
+    import pandas as pd
+    
     intermediate_results = {
         'channel_name': data['channel']['name'],
         'channel_subscribers': data['channel']['subscribers'],
@@ -231,6 +178,8 @@ def load_intermediate_results():
 
 def create_final_report(data, video_analyses, patterns_report, top_videos=None):
     """Create the final markdown report"""
+    import pandas as pd
+    
     # Save full results
     results = {
         'channel_name': data['channel']['name'],
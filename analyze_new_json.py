@@ -1,150 +1,157 @@
 import json
-import os
-import requests
-from io import BytesIO
-import pandas as pd
-from openai import OpenAI
-
-from PIL import Image
-from urllib.request import urlopen
-import matplotlib.pyplot as plt
-import seaborn as sns
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from llm_cache import LLMCache, LazyOpenAI, cached_completion, cached_completion_async
+from video_dataset import load_video_dataset, select_top_videos
+from thumbnail_store import ThumbnailStore
+from analysis_journal import AnalysisJournal
+from analysis_schema import (ElementAnalysis, PatternsReport, parse_structured,
+                             TITLE_ANALYSIS_FORMAT, THUMBNAIL_ANALYSIS_FORMAT, PATTERNS_REPORT_FORMAT)
 
 API_KEY = "sk-XXX"
 
+# Limits for the concurrent analysis pipeline
+DEFAULT_CONCURRENCY = 10
+DEFAULT_TOKENS_PER_MINUTE = 30000
+
+# Token budget per prompt for the patterns report map-reduce
+PATTERNS_TOKEN_BUDGET = 60000
+PATTERNS_SUMMARY_MAX_TOKENS = 1500
+PATTERNS_MAX_LEVELS = 4
+
+# Batch API mode
+BATCH_INPUT_FILE = 'youtube_analysis_batch.jsonl'
+BATCH_POLL_INTERVAL = 60
+
+# OpenAI client, created on first request
+client = LazyOpenAI(api_key=API_KEY)
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    """Shared cache of OpenAI responses, keyed on the full request, opened on first use"""
+    return LLMCache()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=API_KEY)
+@lru_cache(maxsize=None)
+def get_thumbnail_store():
+    """Thumbnail validators with perceptual-hash-keyed vision results, opened on first use"""
+    return ThumbnailStore(llm_cache=get_llm_cache())
+
+# Intermediate results: snapshot at step boundaries, journal entry per analyzed video
+analysis_journal = AnalysisJournal()
+
+# Analysis step of a run whose per-video analyses are still being journaled
+VIDEO_ANALYSIS_IN_PROGRESS = "video_analysis_in_progress"
 
 def load_data(json_file_path):
-    """Load YouTube data from JSON file"""
+    """Load YouTube data from JSON file, with the videos as a typed DataFrame (cached as Feather)"""
     try:
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-        return data
+        channel, videos = load_video_dataset(json_file_path)
+        return {'channel': channel, 'videos': videos}
     except Exception as e:
         print(f"Error loading data: {e}")
         return None
 
 def get_top_videos(data, metric='views', count=10):
     """Get top videos based on specified metric"""
-    videos = data['videos']
-    df = pd.DataFrame(videos)
-    
-    # Convert views to numeric if not already
-    if df[metric].dtype == 'object':
-        df[metric] = pd.to_numeric(df[metric])
-    
-    # Sort by the chosen metric and get top N
-    top_videos = df.sort_values(by=metric, ascending=False).head(count)
-    return top_videos
+    return select_top_videos(data['videos'], metric=metric, count=count)
+
+def build_title_request(title):
+    """Build the chat completion request used to analyze a title"""
+    return {
+        'model': "gpt-4o",
+        'messages': [
+            {
+                "role": "system", 
+                "content": "You are an expert in YouTube content strategy and SEO. Analyze this video title and identify key patterns and elements that make it effective. Focus on psychological triggers, keywords, structure, emotion, and clarity. Give a short summary and one element per aspect, each with an explanation."
+            },
+            {
+                "role": "user", 
+                "content": f"Analyze this YouTube title and explain why it's effective: \"{title}\""
+            }
+        ],
+        'temperature': 0.7,
+        'max_tokens': 2048,
+        'response_format': TITLE_ANALYSIS_FORMAT
+    }
+
+def build_thumbnail_request(thumbnail_url):
+    """Build the chat completion request used to analyze a thumbnail"""
+    return {
+        'model': "gpt-4o",
+        'messages': [
+            {
+                "role": "system",
+                "content": "You are an expert in YouTube thumbnail analysis. Examine this thumbnail and identify key elements that make it effective. Focus on composition, colors, text usage, emotional triggers, and clickability factors. Give a short summary and one element per aspect, each with an explanation."
+            },
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Analyze this YouTube thumbnail and explain why it's effective:"},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": thumbnail_url,
+                        },
+                    }
+                ]
+            }
+        ],
+        # Room for the JSON structure, a truncated response cannot be parsed
+        'max_tokens': 1000,
+        'response_format': THUMBNAIL_ANALYSIS_FORMAT
+    }
 
 def analyze_title_with_llm(title):
     """Analyze title using OpenAI's GPT model"""
-    # Check if we already have a cached title analysis
-    cache_dir = "title_analysis_cache"
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    # Create a cache filename based on a hash of the title
-    import hashlib
-    title_hash = hashlib.md5(title.encode()).hexdigest()
-    cache_file = os.path.join(cache_dir, f"{title_hash}.txt")
-    
-    # Check if analysis is already cached
-    if os.path.exists(cache_file):
-        print(f"Loading cached title analysis for '{title}'")
-        with open(cache_file, 'r') as f:
-            return f.read()
-    
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are an expert in YouTube content strategy and SEO. Analyze this video title and identify key patterns and elements that make it effective. Focus on psychological triggers, keywords, structure, emotion, and clarity."
-                },
-                {
-                    "role": "user", 
-                    "content": f"Analyze this YouTube title and explain why it's effective: \"{title}\""
-                }
-            ],
-            temperature=0.7,
-            max_tokens=2048
-        )
-        
-        analysis = response.choices[0].message.content
-        
-        # Cache the result
-        with open(cache_file, 'w') as f:
-            f.write(analysis)
-            
-        return analysis
+        # Responses are cached on the full request, so a prompt change is never served stale
+        analysis = cached_completion(client, build_title_request(title), get_llm_cache())
+        # No content, e.g. a refusal
+        return analysis if analysis is not None else "Error analyzing title"
     except Exception as e:
         print(f"Error analyzing title with LLM: {e}")
         return "Error analyzing title"
 
 def analyze_thumbnail_with_vision(thumbnail_url):
     """Analyze thumbnail using OpenAI's Vision model"""
-    # Check if we already have a cached thumbnail analysis
-    cache_dir = "thumbnail_analysis_cache"
-    os.makedirs(cache_dir, exist_ok=True)
-    
-    # Create a cache filename based on the video ID (extracted from URL)
-    video_id = thumbnail_url.split('/')[-2] if '/vi/' in thumbnail_url else thumbnail_url.split('/')[-1].split('.')[0]
-    cache_file = os.path.join(cache_dir, f"{video_id}.txt")
-    
-    # Check if analysis is already cached
-    if os.path.exists(cache_file):
-        print(f"Loading cached thumbnail analysis for {video_id}")
-        with open(cache_file, 'r') as f:
-            return f.read()
+    request = build_thumbnail_request(thumbnail_url)
     
     try:
-        # Get image data
-        response = requests.get(thumbnail_url)
-        if response.status_code != 200:
+        # Get image data (a conditional GET, so unchanged thumbnails are not downloaded again)
+        phash = get_thumbnail_store().fetch(thumbnail_url)
+        if phash is None:
             return "Failed to retrieve thumbnail image"
         
+        # Unchanged or visually identical thumbnails reuse their previous analysis
+        cached = get_thumbnail_store().get_analysis(phash, request)
+        if cached is not None:
+            print(f"Loading cached thumbnail analysis for {thumbnail_url}")
+            return cached
+        
         # Send to OpenAI Vision
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert in YouTube thumbnail analysis. Examine this thumbnail and identify key elements that make it effective. Focus on composition, colors, text usage, emotional triggers, and clickability factors."
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": "Analyze this YouTube thumbnail and explain why it's effective:"},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": thumbnail_url,
-                            },
-                        }
-                    ]
-                }
-            ],
-            max_tokens=500
-        )
+        response = client.chat.completions.create(**request)
         
         analysis = response.choices[0].message.content
         
-        # Cache the result
-        with open(cache_file, 'w') as f:
-            f.write(analysis)
+        # Cache the result (empty answers, e.g. refusals, are not stored)
+        get_thumbnail_store().put_analysis(phash, request, analysis)
             
-        return analysis
+        return analysis if analysis is not None else "Error analyzing thumbnail"
     except Exception as e:
         print(f"Error analyzing thumbnail with Vision: {e}")
         return "Error analyzing thumbnail"
 
-def get_combined_analysis(row):
-    """Combined analysis of title and thumbnail with additional video metrics"""
-    
-    print(f"Analyzing {row['title']} ({row['video_id']})...")
+def format_combined_analysis(row, title_analysis, thumbnail_analysis):
+    """Format the title and thumbnail analyses together with the video metrics"""
+    # Structured responses are rendered as markdown, anything else is kept as is
+    title_record = parse_structured(ElementAnalysis, title_analysis)
+    if title_record is not None:
+        title_analysis = title_record.to_text()
+    thumbnail_record = parse_structured(ElementAnalysis, thumbnail_analysis)
+    if thumbnail_record is not None:
+        thumbnail_analysis = thumbnail_record.to_text()
     
     # Get video metrics
     metrics_analysis = f"""
@@ -157,12 +164,6 @@ VIDEO METRICS:
 - Published: {row['published_at']}
     """
     
-    # Analyze title with GPT
-    title_analysis = analyze_title_with_llm(row['title'])
-    
-    # Analyze thumbnail with Vision
-    thumbnail_analysis = analyze_thumbnail_with_vision(row['thumbnail_url'])
-    
     # Combine all analyses
     combined_analysis = f"""
 === ANALYSIS FOR VIDEO: {row['title']} ===
@@ -180,31 +181,494 @@ VIDEO URL: https://www.youtube.com/watch?v={row['video_id']}
     
     return combined_analysis
 
-def generate_patterns_report(all_analyses):
-    """Generate a report of common patterns across top videos using GPT"""
+def build_structured_analysis(row, title_analysis, thumbnail_analysis):
+    """Build the dashboard form of a video analysis from the structured responses
+    
+    Returns None unless both responses are structured, e.g. for errors or older cached answers.
+    """
+    title_record = parse_structured(ElementAnalysis, title_analysis)
+    thumbnail_record = parse_structured(ElementAnalysis, thumbnail_analysis)
+    if title_record is None or thumbnail_record is None:
+        return None
+    
+    return {
+        'title': row['title'],
+        'metrics': {
+            'views': str(row['views']),
+            'likes': str(row['likes']),
+            'comments': str(row['comments']),
+            'engagement_rate': f"{row['engagement_rate']}%",
+            'avg_view_duration': f"{row['avg_view_duration']} ({row['retention_rate']}% retention)",
+            'published': row['published_at']
+        },
+        'title_analysis': title_record.to_ui(),
+        'thumbnail_analysis': thumbnail_record.to_ui(),
+        'video_url': f"https://www.youtube.com/watch?v={row['video_id']}"
+    }
+
+def build_video_analysis(row, title_analysis, thumbnail_analysis):
+    """Build the stored analysis of a video: text for reports and prompts, structured form for the dashboard"""
+    video_analysis = {
+        'title': row['title'],
+        'views': row['views'],
+        'analysis': format_combined_analysis(row, title_analysis, thumbnail_analysis)
+    }
+    structured_analysis = build_structured_analysis(row, title_analysis, thumbnail_analysis)
+    if structured_analysis is not None:
+        video_analysis['structured_analysis'] = structured_analysis
+    return video_analysis
+
+def get_combined_analysis(row):
+    """Combined analysis of title and thumbnail with additional video metrics"""
+    
+    print(f"Analyzing {row['title']} ({row['video_id']})...")
+    
+    # Analyze title with GPT
+    title_analysis = analyze_title_with_llm(row['title'])
+    
+    # Analyze thumbnail with Vision
+    thumbnail_analysis = analyze_thumbnail_with_vision(row['thumbnail_url'])
+    
+    return build_video_analysis(row, title_analysis, thumbnail_analysis)
+
+class TokenRateLimiter:
+    """Async token bucket limiting the number of tokens sent per minute"""
+    
+    def __init__(self, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = tokens_per_minute
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self, tokens):
+        """Wait until `tokens` can be spent without exceeding the budget"""
+        tokens = min(tokens, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+def estimate_request_tokens(request):
+    """Rough token estimate for a request: ~4 characters per token plus the completion budget"""
+    prompt_chars = 0
+    for message in request['messages']:
+        content = message['content']
+        if isinstance(content, str):
+            prompt_chars += len(content)
+        else:
+            for part in content:
+                # Low detail images cost a fixed 85 tokens
+                prompt_chars += len(part['text']) if part['type'] == 'text' else 85 * 4
+    return prompt_chars // 4 + request.get('max_tokens', 0)
+
+def budgeted_create(async_client, semaphore, rate_limiter):
+    """Return a chat.completions.create replacement that waits for the concurrency and token budgets"""
+    async def create(**request):
+        await rate_limiter.acquire(estimate_request_tokens(request))
+        async with semaphore:
+            return await async_client.chat.completions.create(**request)
+    return create
+
+async def create_completion_async(async_client, request, semaphore, rate_limiter):
+    """Send one chat completion request within the concurrency and token budgets"""
+    response = await budgeted_create(async_client, semaphore, rate_limiter)(**request)
+    return response.choices[0].message.content
+
+async def analyze_title_with_llm_async(async_client, title, semaphore, rate_limiter):
+    """Async version of analyze_title_with_llm"""
+    try:
+        analysis = await cached_completion_async(async_client, build_title_request(title), get_llm_cache(),
+                                                 create=budgeted_create(async_client, semaphore, rate_limiter))
+        return analysis if analysis is not None else "Error analyzing title"
+    except Exception as e:
+        print(f"Error analyzing title with LLM: {e}")
+        return "Error analyzing title"
+
+async def analyze_thumbnail_with_vision_async(async_client, thumbnail_url, semaphore, rate_limiter):
+    """Async version of analyze_thumbnail_with_vision"""
+    request = build_thumbnail_request(thumbnail_url)
+    
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are an expert in YouTube content strategy. Based on the analyses of multiple top-performing videos, identify common patterns, success factors, and actionable recommendations. Be specific and detailed in your analysis."
-                },
-                {
-                    "role": "user", 
-                    "content": f"Here are analyses of top-performing YouTube videos. Identify common patterns, success factors, and provide actionable recommendations:\n\n{all_analyses}"
-                }
-            ],
-            temperature=0.7,
-            max_tokens=2000
+        # Fetch the image without blocking the event loop
+        phash = await asyncio.to_thread(get_thumbnail_store().fetch, thumbnail_url)
+        if phash is None:
+            return "Failed to retrieve thumbnail image"
+        
+        cached = get_thumbnail_store().get_analysis(phash, request)
+        if cached is not None:
+            print(f"Loading cached thumbnail analysis for {thumbnail_url}")
+            return cached
+        
+        analysis = await create_completion_async(async_client, request, semaphore, rate_limiter)
+        get_thumbnail_store().put_analysis(phash, request, analysis)
+        return analysis if analysis is not None else "Error analyzing thumbnail"
+    except Exception as e:
+        print(f"Error analyzing thumbnail with Vision: {e}")
+        return "Error analyzing thumbnail"
+
+async def get_combined_analysis_async(async_client, row, semaphore, rate_limiter):
+    """Analyze title and thumbnail concurrently"""
+    print(f"Analyzing {row['title']} ({row['video_id']})...")
+    
+    title_analysis, thumbnail_analysis = await asyncio.gather(
+        analyze_title_with_llm_async(async_client, row['title'], semaphore, rate_limiter),
+        analyze_thumbnail_with_vision_async(async_client, row['thumbnail_url'], semaphore, rate_limiter)
+    )
+    
+    return row, build_video_analysis(row, title_analysis, thumbnail_analysis)
+
+async def analyze_videos_async(data, top_videos, concurrency=DEFAULT_CONCURRENCY,
+                               tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, completed=None):
+    """Analyze all videos concurrently, journaling each analysis as it completes"""
+    async_client = LazyOpenAI(async_client=True, api_key=API_KEY)
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = TokenRateLimiter(tokens_per_minute)
+    
+    completed = dict(completed or {})
+    all_rows = [row for _, row in top_videos.iterrows()]
+    rows = [row for row in all_rows if row['video_id'] not in completed]
+    tasks = [get_combined_analysis_async(async_client, row, semaphore, rate_limiter) for row in rows]
+    
+    for idx, task in enumerate(asyncio.as_completed(tasks)):
+        row, video_analysis = await task
+        print(f"Analyzed video {idx+1} of {len(rows)}")
+        
+        # Store analysis
+        completed[row['video_id']] = video_analysis
+        
+        # Checkpoint the video
+        record_video_analysis(row['video_id'], completed[row['video_id']])
+    
+    # Keep the analyses in ranking order
+    return {row['video_id']: completed[row['video_id']] for row in all_rows}
+
+def analyze_videos(data, top_videos, concurrency=DEFAULT_CONCURRENCY,
+                   tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, sequential=False, batch=False, completed=None):
+    """Analyze every top video, concurrently unless sequential is set, or through the Batch API
+    
+    Videos in completed (analyses recovered from an interrupted run) are not analyzed again.
+    """
+    if batch:
+        return analyze_videos_batch(data, top_videos)
+    
+    completed = dict(completed or {})
+    
+    # Write the run header once; from here on every video is a journal append
+    save_intermediate_results(data, completed, top_videos, VIDEO_ANALYSIS_IN_PROGRESS)
+    
+    if not sequential:
+        video_analyses = asyncio.run(analyze_videos_async(data, top_videos, concurrency, tokens_per_minute, completed))
+    else:
+        for idx, (_, row) in enumerate(top_videos.iterrows()):
+            if row['video_id'] in completed:
+                continue
+            print(f"Analyzing video {idx+1} of {len(top_videos)}...")
+            # Store analysis
+            completed[row['video_id']] = get_combined_analysis(row)
+            
+            # Checkpoint the video
+            record_video_analysis(row['video_id'], completed[row['video_id']])
+        
+        video_analyses = {row['video_id']: completed[row['video_id']] for _, row in top_videos.iterrows()}
+    
+    save_intermediate_results(data, video_analyses, top_videos, "video_analysis")
+    return video_analyses
+
+def build_batch_requests(top_videos):
+    """Build Batch API request lines for every title and thumbnail that is not cached yet"""
+    batch_requests = []
+    queued_hashes = set()
+    
+    for _, row in top_videos.iterrows():
+        title_request = build_title_request(row['title'])
+        if get_llm_cache().get(title_request) is None:
+            batch_requests.append({
+                'custom_id': f"title:{row['video_id']}",
+                'method': "POST",
+                'url': "/v1/chat/completions",
+                'body': title_request
+            })
+        
+        # Thumbnails are keyed by perceptual hash, so identical images are analyzed once
+        thumbnail_request = build_thumbnail_request(row['thumbnail_url'])
+        phash = get_thumbnail_store().fetch(row['thumbnail_url'])
+        if phash is not None and phash not in queued_hashes and get_thumbnail_store().get_analysis(phash, thumbnail_request) is None:
+            queued_hashes.add(phash)
+            batch_requests.append({
+                'custom_id': f"thumbnail:{phash}",
+                'method': "POST",
+                'url': "/v1/chat/completions",
+                'body': thumbnail_request
+            })
+    
+    return batch_requests
+
+def submit_analysis_batch(batch_client, batch_requests, batch_file=BATCH_INPUT_FILE):
+    """Write the requests to a JSONL file, upload it and start a batch job"""
+    with open(batch_file, 'w') as f:
+        for batch_request in batch_requests:
+            f.write(json.dumps(batch_request) + "\n")
+    
+    with open(batch_file, 'rb') as f:
+        input_file = batch_client.files.create(file=f, purpose="batch")
+    
+    batch = batch_client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Submitted batch {batch.id} with {len(batch_requests)} requests")
+    return batch.id
+
+def wait_for_batch(batch_client, batch_id, poll_interval=BATCH_POLL_INTERVAL):
+    """Poll a batch job until it reaches a final state"""
+    while True:
+        batch = batch_client.batches.retrieve(batch_id)
+        if batch.status in ("completed", "failed", "expired", "cancelled"):
+            print(f"Batch {batch_id} finished with status '{batch.status}'")
+            return batch
+        print(f"Batch {batch_id} is '{batch.status}', checking again in {poll_interval} seconds...")
+        time.sleep(poll_interval)
+
+def collect_batch_results(batch_client, batch):
+    """Download the output of a finished batch job, keyed by custom_id"""
+    results = {}
+    
+    # Expired or cancelled batches can still have partial output
+    if not getattr(batch, 'output_file_id', None):
+        return results
+    
+    output = batch_client.files.content(batch.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get('response') or {}
+        if response.get('status_code') == 200:
+            results[result['custom_id']] = response['body']['choices'][0]['message']['content']
+        else:
+            print(f"Batch request {result['custom_id']} failed: {result.get('error') or response.get('body')}")
+    
+    return results
+
+def analyze_videos_batch(data, top_videos, batch_client=None, poll_interval=BATCH_POLL_INTERVAL):
+    """Analyze every top video through the OpenAI Batch API"""
+    batch_client = batch_client or client
+    
+    # Resume polling a batch submitted by a previous run instead of submitting it again
+    intermediate = load_intermediate_results()
+    if intermediate and intermediate.get('analysis_step') == "batch_submitted" and intermediate.get('batch_id'):
+        batch_id = intermediate['batch_id']
+        print(f"Resuming previously submitted batch {batch_id}")
+    else:
+        batch_requests = build_batch_requests(top_videos)
+        batch_id = None
+        if batch_requests:
+            batch_id = submit_analysis_batch(batch_client, batch_requests)
+            save_intermediate_results(data, {}, top_videos, "batch_submitted", extra={'batch_id': batch_id})
+    
+    results = {}
+    if batch_id:
+        batch = wait_for_batch(batch_client, batch_id, poll_interval)
+        results = collect_batch_results(batch_client, batch)
+    
+    # Merge batch output with cached analyses
+    video_analyses = {}
+    finished = {}
+    for _, row in top_videos.iterrows():
+        title_request = build_title_request(row['title'])
+        title_analysis = get_llm_cache().get(title_request)
+        if title_analysis is None:
+            title_analysis = results.get(f"title:{row['video_id']}")
+            if title_analysis is not None:
+                get_llm_cache().put(title_request, title_analysis)
+        
+        thumbnail_request = build_thumbnail_request(row['thumbnail_url'])
+        phash = get_thumbnail_store().fetch(row['thumbnail_url'])
+        thumbnail_analysis = None
+        if phash is None:
+            thumbnail_analysis = "Failed to retrieve thumbnail image"
+        else:
+            thumbnail_analysis = get_thumbnail_store().get_analysis(phash, thumbnail_request)
+            if thumbnail_analysis is None:
+                thumbnail_analysis = results.get(f"thumbnail:{phash}")
+                if thumbnail_analysis is not None:
+                    get_thumbnail_store().put_analysis(phash, thumbnail_request, thumbnail_analysis)
+        
+        video_analyses[row['video_id']] = build_video_analysis(
+            row,
+            title_analysis if title_analysis is not None else "Error analyzing title",
+            thumbnail_analysis if thumbnail_analysis is not None else "Error analyzing thumbnail"
         )
-        return response.choices[0].message.content
+        if title_analysis is not None and thumbnail_analysis is not None:
+            finished[row['video_id']] = video_analyses[row['video_id']]
+    
+    if len(finished) < len(video_analyses):
+        # Keep only the finished videos, so the next run submits the missing analyses again
+        print(f"Batch returned no analysis for {len(video_analyses) - len(finished)} of {len(video_analyses)} videos")
+        save_intermediate_results(data, finished, top_videos, VIDEO_ANALYSIS_IN_PROGRESS)
+    else:
+        save_intermediate_results(data, video_analyses, top_videos, "video_analysis")
+    return video_analyses
+
+_token_encoder = None
+
+def count_tokens(text):
+    """Count tokens locally with tiktoken, or estimate ~4 characters per token without it"""
+    global _token_encoder
+    if _token_encoder is None:
+        try:
+            import tiktoken
+            _token_encoder = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _token_encoder = False
+    if _token_encoder:
+        return len(_token_encoder.encode(text))
+    return len(text) // 4 + 1
+
+def split_to_budget(text, token_budget):
+    """Split a text into consecutive pieces of at most token_budget tokens"""
+    count_tokens("")  # Load the encoder
+    if _token_encoder:
+        tokens = _token_encoder.encode(text)
+        if len(tokens) <= token_budget:
+            return [text]
+        return [_token_encoder.decode(tokens[i:i + token_budget]) for i in range(0, len(tokens), token_budget)]
+    
+    # Same ~4 characters per token estimate as count_tokens
+    piece_chars = max(1, (token_budget - 1) * 4)
+    return [text[i:i + piece_chars] for i in range(0, len(text), piece_chars)] or [text]
+
+def pack_into_chunks(texts, token_budget=PATTERNS_TOKEN_BUDGET):
+    """Greedily pack texts into chunks whose token count stays under the budget
+    
+    A text larger than the budget on its own is split into pieces that each fit.
+    """
+    separator_tokens = count_tokens("\n\n")
+    pieces = []
+    for text in texts:
+        pieces.extend(split_to_budget(text, max(1, token_budget - separator_tokens)))
+    
+    chunks = []
+    current = ""
+    current_tokens = 0
+    
+    for text in pieces:
+        text = text + "\n\n"
+        tokens = count_tokens(text)
+        if current and current_tokens + tokens > token_budget:
+            chunks.append(current)
+            current = ""
+            current_tokens = 0
+        current += text
+        current_tokens += tokens
+    
+    if current:
+        chunks.append(current)
+    
+    return chunks
+
+def build_patterns_request(all_analyses, summarized=False):
+    """Build the chat completion request for the final patterns report"""
+    source = "summaries of analyses" if summarized else "analyses"
+    return {
+        'model': "gpt-4o",
+        'messages': [
+            {
+                "role": "system", 
+                "content": "You are an expert in YouTube content strategy. Based on the analyses of multiple top-performing videos, identify common patterns, success factors, and actionable recommendations. Be specific and detailed in your analysis."
+            },
+            {
+                "role": "user", 
+                "content": f"Here are {source} of top-performing YouTube videos. Identify common patterns, success factors, and provide actionable recommendations:\n\n{all_analyses}"
+            }
+        ],
+        'temperature': 0.7,
+        'max_tokens': 2000,
+        'response_format': PATTERNS_REPORT_FORMAT
+    }
+
+def build_chunk_summary_request(chunk):
+    """Build the chat completion request summarizing one chunk of analyses"""
+    return {
+        'model': "gpt-4o",
+        'messages': [
+            {
+                "role": "system",
+                "content": "You are an expert in YouTube content strategy. Condense the following video analyses into the recurring title patterns, thumbnail patterns and success factors they show, keeping concrete examples and the view counts that support them."
+            },
+            {
+                "role": "user",
+                "content": f"Summarize the common patterns in these analyses of top-performing YouTube videos:\n\n{chunk}"
+            }
+        ],
+        'temperature': 0.3,
+        'max_tokens': PATTERNS_SUMMARY_MAX_TOKENS
+    }
+
+def summarize_chunks(chunks, max_workers=DEFAULT_CONCURRENCY):
+    """Summarize chunks of analyses in parallel (map step)"""
+    def summarize(chunk):
+        return cached_completion(client, build_chunk_summary_request(chunk), get_llm_cache())
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        return list(executor.map(summarize, chunks))
+
+def generate_patterns_report(all_analyses, token_budget=PATTERNS_TOKEN_BUDGET):
+    """Generate a report of common patterns across top videos using GPT
+    
+    Analyses that do not fit in one prompt are packed into chunks under the
+    token budget, summarized in parallel and reduced level by level until the
+    summaries fit into the final patterns prompt. The reduction stops after
+    PATTERNS_MAX_LEVELS levels, or as soon as a level no longer reduces the
+    number of chunks; the remaining text is then cut to the budget.
+    
+    Returns a PatternsReport, or the response text if it is not structured.
+    """
+    if isinstance(all_analyses, str):
+        all_analyses = [all_analyses]
+    
+    try:
+        texts = list(all_analyses)
+        summarized = False
+        chunks = pack_into_chunks(texts, token_budget)
+        
+        for _ in range(PATTERNS_MAX_LEVELS):
+            if len(chunks) <= 1:
+                break
+            print(f"Summarizing {len(texts)} analyses in {len(chunks)} chunks...")
+            texts = [summary for summary in summarize_chunks(chunks) if summary]
+            summarized = True
+            reduced = pack_into_chunks(texts, token_budget)
+            if len(reduced) >= len(chunks):
+                # Summaries are not shorter than their chunks, another level would not converge
+                chunks = reduced
+                break
+            chunks = reduced
+        
+        all_text = "".join(chunks)
+        if len(chunks) > 1:
+            print(f"Summaries still span {len(chunks)} chunks, truncating them to the token budget")
+            all_text = split_to_budget(all_text, token_budget)[0]
+        
+        patterns_text = cached_completion(client, build_patterns_request(all_text, summarized), get_llm_cache())
+        if patterns_text is None:
+            return "Error generating patterns report"
+        return parse_structured(PatternsReport, patterns_text) or patterns_text
     except Exception as e:
         print(f"Error generating patterns report: {e}")
         return "Error generating patterns report"
 
-def save_intermediate_results(data, video_analyses, top_videos, step="video_analysis"):
+def save_intermediate_results(data, video_analyses, top_videos, step="video_analysis", extra=None):
     """Save intermediate results to avoid repeating analysis if there's an error later"""
+    import pandas as pd
+    
     intermediate_results = {
         'channel_name': data['channel']['name'],
         'channel_subscribers': data['channel']['subscribers'],
@@ -212,146 +676,136 @@ def save_intermediate_results(data, video_analyses, top_videos, step="video_anal
         'analysis_step': step,
         'top_videos': top_videos.to_dict('records') if isinstance(top_videos, pd.DataFrame) else top_videos
     }
+    if extra:
+        intermediate_results.update(extra)
     
-    # Save to JSON file
-    with open('youtube_analysis_intermediate.json', 'w') as f:
-        json.dump(intermediate_results, f, indent=2)
+    # Atomic snapshot, which also compacts the journal
+    analysis_journal.save(intermediate_results)
     
     print(f"Intermediate results saved after '{step}' step")
 
+def record_video_analysis(video_id, video_analysis):
+    """Append one completed video analysis to the checkpoint journal"""
+    analysis_journal.append(video_id, video_analysis)
+
 def load_intermediate_results():
-    """Load intermediate results if they exist"""
+    """Load intermediate results if they exist, replaying the checkpoint journal"""
     try:
-        with open('youtube_analysis_intermediate.json', 'r') as f:
-            results = json.load(f)
-        return results
+        return analysis_journal.load()
     except Exception as e:
         print(f"No intermediate results found: {e}")
         return None
 
-def parse_analysis_text(analysis_text):
-    """Parse the analysis text into structured data"""
-    structured_data = {}
+def get_completed_analyses(intermediate, top_videos):
+    """Return the analyses of top videos journaled by an interrupted run"""
+    if not intermediate or intermediate.get('analysis_step') != VIDEO_ANALYSIS_IN_PROGRESS:
+        return {}
     
-    # Extract video title
-    title_match = analysis_text.split("ANALYSIS FOR VIDEO: ")[1].split(" ===")[0] if "ANALYSIS FOR VIDEO: " in analysis_text else ""
-    structured_data["title"] = title_match.strip()
-    
-    # Extract video metrics
-    metrics_section = analysis_text.split("VIDEO METRICS:")[1].split("TITLE ANALYSIS:")[0] if "VIDEO METRICS:" in analysis_text else ""
-    metrics = {}
-    for line in metrics_section.strip().split("\n"):
-        line = line.strip()
-        if line and ":" in line:
-            key, value = line.split(":", 1)
-            key = key.replace("-", "").strip()
-            metrics[key.lower().replace(" ", "_")] = value.strip()
-    structured_data["metrics"] = metrics
-    
-    # Extract title analysis
-    title_analysis_section = analysis_text.split("TITLE ANALYSIS:")[1].split("THUMBNAIL ANALYSIS:")[0] if "TITLE ANALYSIS:" in analysis_text else ""
-    
-    # Parse title analysis into sections
-    title_analysis = {"full_text": title_analysis_section.strip()}
+    video_ids = set(top_videos['video_id'])
+    completed = {video_id: video_analysis for video_id, video_analysis in intermediate['video_analyses'].items()
+                 if video_id in video_ids}
+    if completed:
+        print(f"Resuming interrupted run: {len(completed)} of {len(top_videos)} videos already analyzed")
+    return completed
+
+# Markers of the combined analysis text (see format_combined_analysis)
+VIDEO_TITLE_MARKER = "ANALYSIS FOR VIDEO: "
+VIDEO_TITLE_END = " ==="
+METRICS_MARKER = "VIDEO METRICS:"
+TITLE_ANALYSIS_MARKER = "TITLE ANALYSIS:"
+THUMBNAIL_ANALYSIS_MARKER = "THUMBNAIL ANALYSIS:"
+VIDEO_URL_MARKER = "VIDEO URL:"
+ANALYSIS_END = "=========================================================="
+
+_NUMBERED_HEADERS = ("1.", "2.", "3.", "4.", "5.", "6.", "7.")
+
+def marker_section(analysis_text, marker, end_marker):
+    """Return the text after the first marker, up to the next marker or the first end_marker after it
     
-    # Try to extract structured sections from title analysis
+    Same result as text.split(marker)[1].split(end_marker)[0], or None without the marker,
+    found with bounded searches instead of splitting the whole text into pieces.
+    """
+    start = analysis_text.find(marker)
+    if start < 0:
+        return None
+    start += len(marker)
+    end = analysis_text.find(marker, start)
+    if end < 0:
+        end = len(analysis_text)
+    end_start = analysis_text.find(end_marker, start, end)
+    if end_start >= 0:
+        end = end_start
+    return analysis_text[start:end]
+
+def parse_analysis_sections(section_text):
+    """Split an analysis into sections on numbered ("1.") or bold ("**...**") header lines"""
     sections = {}
     current_section = None
     section_content = []
     
-    for line in title_analysis_section.strip().split("\n"):
+    for line in section_text.strip().split("\n"):
         line = line.strip()
         if not line:
             continue
-            
+        
         # Check if this is a new section header (numbered with a period or has ** around it)
-        if line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.")) or (line.startswith("**") and line.endswith("**")):
-            # Save previous section if it exists
+        if line.startswith(_NUMBERED_HEADERS):
             if current_section and section_content:
                 sections[current_section] = "\n".join(section_content)
                 section_content = []
-            
-            # Extract new section name
-            if line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.")):
-                parts = line.split(".", 1)
-                if len(parts) > 1:
-                    current_section = parts[1].strip().lower()
-                    if ":" in current_section:
-                        current_section = current_section.split(":", 1)[0].strip()
-            else:
-                current_section = line.replace("**", "").strip().lower()
-        else:
-            # Add content to current section
-            if current_section:
-                section_content.append(line)
+            current_section = line.split(".", 1)[1].strip().lower()
+            if ":" in current_section:
+                current_section = current_section.split(":", 1)[0].strip()
+        elif line.startswith("**") and line.endswith("**"):
+            if current_section and section_content:
+                sections[current_section] = "\n".join(section_content)
+                section_content = []
+            current_section = line.replace("**", "").strip().lower()
+        elif current_section:
+            section_content.append(line)
     
     # Add the last section
     if current_section and section_content:
         sections[current_section] = "\n".join(section_content)
     
-    # Add structured sections to title analysis
-    if sections:
-        title_analysis["sections"] = sections
-    
-    structured_data["title_analysis"] = title_analysis
-    
-    # Extract thumbnail analysis
-    thumbnail_analysis_section = ""
-    if "THUMBNAIL ANALYSIS:" in analysis_text:
-        parts = analysis_text.split("THUMBNAIL ANALYSIS:")
-        if len(parts) > 1:
-            thumbnail_analysis_section = parts[1].split("VIDEO URL:")[0] if "VIDEO URL:" in parts[1] else parts[1]
+    return sections
+
+def parse_analysis_text(analysis_text):
+    """Parse the analysis text into structured data
     
-    # Parse thumbnail analysis into sections
-    thumbnail_analysis = {"full_text": thumbnail_analysis_section.strip()}
+    Every part is cut out with bounded searches and parsed from its own slice
+    in a single pass over its lines, so the cost is linear in the length of the text.
+    """
+    structured_data = {}
     
-    # Try to extract structured sections from thumbnail analysis
-    sections = {}
-    current_section = None
-    section_content = []
+    # Extract video title
+    title = marker_section(analysis_text, VIDEO_TITLE_MARKER, VIDEO_TITLE_END)
+    structured_data["title"] = (title or "").strip()
     
-    for line in thumbnail_analysis_section.strip().split("\n"):
+    # Extract video metrics
+    metrics_section = marker_section(analysis_text, METRICS_MARKER, TITLE_ANALYSIS_MARKER) or ""
+    metrics = {}
+    for line in metrics_section.strip().split("\n"):
         line = line.strip()
-        if not line:
-            continue
-            
-        # Check if this is a new section header (numbered with a period or has ** around it)
-        if line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.")) or (line.startswith("**") and line.endswith("**")):
-            # Save previous section if it exists
-            if current_section and section_content:
-                sections[current_section] = "\n".join(section_content)
-                section_content = []
-            
-            # Extract new section name
-            if line.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.")):
-                parts = line.split(".", 1)
-                if len(parts) > 1:
-                    current_section = parts[1].strip().lower()
-                    if ":" in current_section:
-                        current_section = current_section.split(":", 1)[0].strip()
-            else:
-                current_section = line.replace("**", "").strip().lower()
-        else:
-            # Add content to current section
-            if current_section:
-                section_content.append(line)
-    
-    # Add the last section
-    if current_section and section_content:
-        sections[current_section] = "\n".join(section_content)
-    
-    # Add structured sections to thumbnail analysis
-    if sections:
-        thumbnail_analysis["sections"] = sections
+        if line and ":" in line:
+            key, value = line.split(":", 1)
+            key = key.replace("-", "").strip()
+            metrics[key.lower().replace(" ", "_")] = value.strip()
+    structured_data["metrics"] = metrics
     
-    structured_data["thumbnail_analysis"] = thumbnail_analysis
+    # Extract the title and thumbnail analyses, each with its sections
+    for key, marker, end_marker in (("title_analysis", TITLE_ANALYSIS_MARKER, THUMBNAIL_ANALYSIS_MARKER),
+                                    ("thumbnail_analysis", THUMBNAIL_ANALYSIS_MARKER, VIDEO_URL_MARKER)):
+        section_text = marker_section(analysis_text, marker, end_marker) or ""
+        analysis = {"full_text": section_text.strip()}
+        sections = parse_analysis_sections(section_text)
+        if sections:
+            analysis["sections"] = sections
+        structured_data[key] = analysis
     
     # Extract video URL
-    video_url = ""
-    if "VIDEO URL:" in analysis_text:
-        video_url_section = analysis_text.split("VIDEO URL:")[1].split("==========================================================")[0]
-        video_url = video_url_section.strip()
-    structured_data["video_url"] = video_url
+    video_url = marker_section(analysis_text, VIDEO_URL_MARKER, ANALYSIS_END)
+    structured_data["video_url"] = (video_url or "").strip()
     
     return structured_data
 
@@ -396,13 +850,29 @@ def parse_patterns_report(patterns_text):
     return structured_data
 
 def create_final_report(data, video_analyses, patterns_report, top_videos=None):
-    """Create the final reports in both markdown and structured JSON formats"""
+    """Create the final reports in both markdown and structured JSON formats
+    
+    Structured responses are serialized as they are; free-text patterns reports and
+    analyses without a structured form (errors, older runs) are parsed from their text.
+    """
+    import pandas as pd
+    
+    if isinstance(patterns_report, PatternsReport):
+        patterns_text = patterns_report.to_text()
+        patterns_structured = patterns_report.to_ui()
+    else:
+        patterns_text = patterns_report
+        patterns_structured = parse_patterns_report(patterns_report)
+    
     # Save original results (for backward compatibility)
     original_results = {
         'channel_name': data['channel']['name'],
         'channel_subscribers': data['channel']['subscribers'],
-        'video_analyses': video_analyses,
-        'patterns_report': patterns_report
+        'video_analyses': {
+            video_id: {key: analysis[key] for key in ('title', 'views', 'analysis')}
+            for video_id, analysis in video_analyses.items()
+        },
+        'patterns_report': patterns_text
     }
     
     # Save to original JSON file
@@ -415,7 +885,7 @@ def create_final_report(data, video_analyses, patterns_report, top_videos=None):
         'channel_subscribers': data['channel']['subscribers'],
         'top_videos': [],
         'video_analyses': {},
-        'patterns_report': parse_patterns_report(patterns_report)
+        'patterns_report': patterns_structured
     }
     
     # Process top videos
@@ -450,7 +920,7 @@ def create_final_report(data, video_analyses, patterns_report, top_videos=None):
         structured_results['video_analyses'][video_id] = {
             'title': analysis['title'],
             'views': analysis['views'],
-            'structured_analysis': parse_analysis_text(analysis['analysis'])
+            'structured_analysis': analysis.get('structured_analysis') or parse_analysis_text(analysis['analysis'])
         }
     
     # Save structured data to new JSON file
@@ -484,14 +954,14 @@ def create_final_report(data, video_analyses, patterns_report, top_videos=None):
             f.write("\n---\n\n")
         
         f.write("## Patterns & Recommendations\n\n")
-        f.write(patterns_report)
+        f.write(patterns_text)
     
     print("Analysis complete!")
     print("Results saved to 'youtube_analysis_results.json'")
     print("Structured UI-friendly data saved to 'youtube_analysis_ui.json'")
     print("Report saved to 'youtube_analysis_report.md'")
 
-def main():
+def main(count=10, concurrency=DEFAULT_CONCURRENCY, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, sequential=False, batch=False):
     # Check for intermediate results first
     intermediate = load_intermediate_results()
     
@@ -504,14 +974,13 @@ def main():
         video_analyses = intermediate['video_analyses']
         top_videos = intermediate['top_videos']
         
-        # Build all_analyses string from video_analyses
-        all_analyses = ""
-        for video_id, analysis_data in video_analyses.items():
-            all_analyses += analysis_data['analysis'] + "\n\n"
+        # Collect the per-video analyses for the patterns report
+        all_analyses = [analysis_data['analysis'] for analysis_data in video_analyses.values()]
         
     else:
-        # Start from the beginning
-        print("No intermediate results found or results are incomplete. Starting from scratch.")
+        # Start from the beginning, or pick up the videos an interrupted run did not finish
+        if not intermediate or intermediate.get('analysis_step') != VIDEO_ANALYSIS_IN_PROGRESS:
+            print("No intermediate results found or results are incomplete. Starting from scratch.")
         
         # Load the JSON data
         data_path = "youtube_video_data.json"  # Update with your file path if needed
@@ -521,29 +990,16 @@ def main():
             print("Failed to load data. Exiting.")
             return
         
-        # Get top 10 videos by views
-        top_videos = get_top_videos(data, metric='views', count=10)
+        # Get top videos by views
+        top_videos = get_top_videos(data, metric='views', count=count)
         print(f"Found {len(top_videos)} top videos by views.")
         
         # Analyze each video's title and thumbnail
-        all_analyses = ""
-        video_analyses = {}
+        video_analyses = analyze_videos(data, top_videos, concurrency, tokens_per_minute, sequential, batch,
+                                        completed=get_completed_analyses(intermediate, top_videos))
         
-        for idx, (_, row) in enumerate(top_videos.iterrows()):
-            print(f"Analyzing video {idx+1} of {len(top_videos)}...")
-            analysis = get_combined_analysis(row)
-            
-            # Store analysis
-            video_analyses[row['video_id']] = {
-                'title': row['title'],
-                'views': row['views'],
-                'analysis': analysis
-            }
-            
-            all_analyses += analysis + "\n\n"
-            
-            # Save intermediate results after each video
-            save_intermediate_results(data, video_analyses, top_videos, "video_analysis")
+        # Collect the per-video analyses for the patterns report
+        all_analyses = [analysis_data['analysis'] for analysis_data in video_analyses.values()]
     
     # Generate overall patterns report
     print("Generating patterns report...")
@@ -551,8 +1007,9 @@ def main():
     
     # Create final report
     create_final_report(data, video_analyses, patterns_report, top_videos)
+    print(f"LLM cache: {get_llm_cache().stats()}")
 
-def analyze_videos_only():
+def analyze_videos_only(count=10, concurrency=DEFAULT_CONCURRENCY, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, sequential=False, batch=False):
     """Run only the video analysis part without generating patterns"""
     # Load the JSON data
     data_path = "youtube_video_data.json"
@@ -562,35 +1019,23 @@ def analyze_videos_only():
         print("Failed to load data. Exiting.")
         return
     
-    # Get top 10 videos by views
-    top_videos = get_top_videos(data, metric='views', count=10)
+    # Get top videos by views
+    top_videos = get_top_videos(data, metric='views', count=count)
     print(f"Found {len(top_videos)} top videos by views.")
     
-    # Analyze each video's title and thumbnail
-    video_analyses = {}
-    
-    for idx, (_, row) in enumerate(top_videos.iterrows()):
-        print(f"Analyzing video {idx+1} of {len(top_videos)}...")
-        analysis = get_combined_analysis(row)
-        
-        # Store analysis
-        video_analyses[row['video_id']] = {
-            'title': row['title'],
-            'views': row['views'],
-            'analysis': analysis
-        }
-        
-        # Save intermediate results after each video
-        save_intermediate_results(data, video_analyses, top_videos, "video_analysis")
+    # Analyze each video's title and thumbnail, skipping those an interrupted run already finished
+    completed = get_completed_analyses(load_intermediate_results(), top_videos)
+    analyze_videos(data, top_videos, concurrency, tokens_per_minute, sequential, batch, completed=completed)
     
     print("Video analysis complete! Run the script with --patterns flag to generate the patterns report.")
+    print(f"LLM cache: {get_llm_cache().stats()}")
 
 def analyze_patterns_only():
     """Run only the patterns analysis using saved video analyses"""
     # Check for intermediate results
     intermediate = load_intermediate_results()
     
-    if not intermediate or intermediate.get('analysis_step') != "video_analysis":
+    if not intermediate or intermediate.get('analysis_step') not in ("video_analysis", VIDEO_ANALYSIS_IN_PROGRESS):
         print("No intermediate video analysis results found. Run the script with --videos flag first.")
         return
     
@@ -599,10 +1044,12 @@ def analyze_patterns_only():
     video_analyses = intermediate['video_analyses']
     top_videos = intermediate['top_videos']
     
-    # Build all_analyses string from video_analyses
-    all_analyses = ""
-    for video_id, analysis_data in video_analyses.items():
-        all_analyses += analysis_data['analysis'] + "\n\n"
+    if intermediate['analysis_step'] == VIDEO_ANALYSIS_IN_PROGRESS:
+        print(f"Video analysis was interrupted: using the {len(video_analyses)} of {len(top_videos)} videos analyzed so far. "
+              "Run the script with --videos flag to finish it.")
+    
+    # Collect the per-video analyses for the patterns report
+    all_analyses = [analysis_data['analysis'] for analysis_data in video_analyses.values()]
     
     # Generate overall patterns report
     print("Generating patterns report...")
@@ -617,12 +1064,27 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Analyze YouTube video data')
     parser.add_argument('--videos', action='store_true', help='Run only video analysis')
     parser.add_argument('--patterns', action='store_true', help='Run only patterns analysis')
+    parser.add_argument('--count', type=int, default=10, help='Number of top videos to analyze')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Maximum number of OpenAI requests in flight')
+    parser.add_argument('--tpm', type=int, default=DEFAULT_TOKENS_PER_MINUTE,
+                        help='OpenAI tokens-per-minute budget')
+    parser.add_argument('--sequential', action='store_true', help='Analyze videos one at a time')
+    parser.add_argument('--batch', action='store_true',
+                        help='Analyze videos through the OpenAI Batch API (cheaper, results within 24h)')
     
     args = parser.parse_args()
+    options = {
+        'count': args.count,
+        'concurrency': args.concurrency,
+        'tokens_per_minute': args.tpm,
+        'sequential': args.sequential,
+        'batch': args.batch
+    }
     
     if args.videos:
-        analyze_videos_only()
+        analyze_videos_only(**options)
     elif args.patterns:
         analyze_patterns_only()
     else:
-        main()
+        main(**options)
@@ -0,0 +1,250 @@
+"""
+On-disk response cache for googleapiclient requests.
+
+CachingHttp wraps the httplib2-compatible transport of a service object and
+serves repeated GET requests from a ResponseCache instead of the network:
+
+- each endpoint (videos, channels, search, reports, ...) has its own TTL
+- expired videos().list and channels().list responses are revalidated with
+  If-None-Match, so an unchanged resource comes back as a cheap 304
+- the cache file is bounded in size and evicts least recently used entries
+
+Entries are keyed on the account of the credentials as well as the URI, because
+requests such as mine=true or ids=channel==MINE look the same for every channel.
+Only successful responses are stored, so re-running a script after a partial
+failure replays everything that already succeeded without spending quota.
+Any transport with a request() method can be wrapped.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import httplib2
+
+RESPONSE_CACHE_FILE = 'api_response_cache.db'
+
+# Default cache size limit (bytes)
+DEFAULT_MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+# Time to live per endpoint (seconds)
+DEFAULT_ENDPOINT_TTLS = {
+    'channels': 6 * 3600,
+    'videos': 6 * 3600,
+    'playlistItems': 3600,
+    'search': 3600,
+    'commentThreads': 24 * 3600,
+    'reports': 12 * 3600,
+}
+DEFAULT_TTL = 3600
+
+# Endpoints whose expired entries are revalidated with their ETag
+REVALIDATE_ENDPOINTS = {'videos', 'channels'}
+
+
+def get_endpoint_name(uri):
+    """
+    Returns the endpoint name of a request URI, e.g. 'videos' for .../youtube/v3/videos?...
+    """
+    path = urlparse(uri).path.rstrip('/')
+    return path.rsplit('/', 1)[-1]
+
+
+def get_account_key(credentials):
+    """
+    Returns an opaque key identifying the account behind credentials, or '' without credentials.
+    """
+    if credentials is None:
+        return ''
+    identity = (getattr(credentials, 'service_account_email', None)
+                or getattr(credentials, 'refresh_token', None)
+                or getattr(credentials, 'token', None)
+                or '')
+    client_id = getattr(credentials, 'client_id', None) or ''
+    return hashlib.sha256(f"{client_id}\n{identity}".encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of HTTP responses with LRU size-bounded eviction.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_FILE, max_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                etag TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+        self.conn.commit()
+
+    def get(self, key):
+        """
+        Returns the cached entry for key as a dictionary, or None.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT headers, content, etag, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return {
+            'headers': json.loads(row[0]),
+            'content': row[1],
+            'etag': row[2],
+            'stored_at': row[3]
+        }
+
+    def put(self, key, endpoint, headers, content, etag=None):
+        """
+        Stores a response and evicts least recently used entries over the size limit.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, headers, content, etag, stored_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(headers), content, etag, now, now, len(content))
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, key):
+        """
+        Marks an entry as freshly validated.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class CachingHttp:
+    """
+    httplib2-compatible transport that serves GET requests from a ResponseCache.
+    """
+
+    def __init__(self, http, cache, ttls=None, default_ttl=DEFAULT_TTL):
+        self.http = http
+        self.cache = cache
+        self.ttls = dict(DEFAULT_ENDPOINT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        # Upper bound on the TTL of every endpoint, see cache_max_age()
+        self.max_age = None
+        # Responses of different accounts never share an entry
+        self.account_key = get_account_key(self.credentials)
+
+    @property
+    def credentials(self):
+        return getattr(self.http, 'credentials', None)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if method != "GET":
+            return self.http.request(uri, method, body=body, headers=headers, **kwargs)
+
+        endpoint = get_endpoint_name(uri)
+        key = hashlib.sha256(f"{self.account_key}\n{uri}".encode('utf-8')).hexdigest()
+        entry = self.cache.get(key)
+
+        if entry is not None:
+            age = time.time() - entry['stored_at']
+            ttl = self.ttls.get(endpoint, self.default_ttl)
+            if self.max_age is not None:
+                ttl = min(ttl, self.max_age)
+            if age < ttl:
+                return self._cached_response(entry)
+
+            if endpoint in REVALIDATE_ENDPOINTS and entry['etag']:
+                headers = dict(headers or {})
+                headers['if-none-match'] = entry['etag']
+                resp, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+                if resp.status == 304:
+                    self.cache.touch(key)
+                    return self._cached_response(entry)
+                self._store(key, endpoint, resp, content)
+                return resp, content
+
+        resp, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+        self._store(key, endpoint, resp, content)
+        return resp, content
+
+    def _store(self, key, endpoint, resp, content):
+        if resp.status != 200:
+            return
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        etag = resp.get('etag')
+        if etag is None and endpoint in REVALIDATE_ENDPOINTS:
+            # The Data API also reports the resource ETag in the response body
+            try:
+                etag = json.loads(content).get('etag')
+            except (ValueError, AttributeError):
+                etag = None
+        self.cache.put(key, endpoint, dict(resp), content, etag=etag)
+
+    def _cached_response(self, entry):
+        headers = dict(entry['headers'])
+        headers['status'] = '200'
+        return httplib2.Response(headers), entry['content']
+
+    def close(self):
+        if hasattr(self.http, 'close'):
+            self.http.close()
+
+
+@contextmanager
+def cache_max_age(service, seconds):
+    """
+    Caps the cache TTL of every endpoint of a service object at seconds while the block runs.
+
+    Used when the caller needs data at most that old, e.g. an incremental sync
+    that marks refreshed statistics as up to date. Services built without a
+    response cache are left unchanged.
+    """
+    http = getattr(service, '_http', None)
+    if not isinstance(http, CachingHttp):
+        yield
+        return
+    previous = http.max_age
+    http.max_age = seconds if previous is None else min(previous, seconds)
+    try:
+        yield
+    finally:
+        http.max_age = previous
@@ -0,0 +1,184 @@
+"""
+HTTP plumbing shared by the YouTube extractor scripts.
+
+googleapiclient service objects share a single httplib2 connection, which is
+not safe to use from several threads at once. The helpers in this module give
+every worker thread its own authorized connection and provide a small
+bounded-concurrency fetch engine with a per-second request budget.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import httplib2
+import google_auth_httplib2
+from googleapiclient.discovery import build
+
+from api_cache import CachingHttp
+from quota import QuotaHttp
+from retry import RetryingHttp, DEFAULT_MAX_RETRIES
+
+# Defaults for the concurrent fetch engine
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 10
+
+
+class ThreadLocalHttp:
+    """
+    httplib2-compatible transport that keeps one authorized connection per thread.
+
+    Service objects built with this transport can be shared between threads;
+    each call to request() goes through the calling thread's own connection.
+    """
+
+    def __init__(self, credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def _get_http(self):
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        return self._get_http().request(uri, method, body=body, headers=headers, **kwargs)
+
+    def close(self):
+        http = getattr(self._local, 'http', None)
+        if http is not None:
+            http.close()
+            self._local.http = None
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to at most `requests_per_second`.
+    A value of None or 0 disables limiting.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def fetch_concurrently(fetch_func, items, max_workers=DEFAULT_MAX_WORKERS,
+                       requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+    """
+    Calls fetch_func(item) for every item using a bounded thread pool.
+
+    Args:
+        fetch_func: Function performing a single API round-trip
+        items: Iterable of arguments for fetch_func
+        max_workers: Maximum number of requests in flight at once
+        requests_per_second: Request budget shared by all workers (None to disable)
+
+    Returns:
+        List of results in the same order as items
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    limiter = RateLimiter(requests_per_second)
+
+    def limited_fetch(item):
+        limiter.wait()
+        return fetch_func(item)
+
+    if max_workers is None or max_workers <= 1:
+        return [limited_fetch(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(limited_fetch, items))
+
+
+def run_dependent_tasks(tasks, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Runs a set of tasks concurrently, starting each one as soon as its dependencies finish.
+    
+    A failing task does not affect independent tasks; tasks that depend on it are skipped.
+    
+    Args:
+        tasks: Dictionary mapping task name to (function, list of dependency names).
+               The function is called with the dependency results as positional arguments.
+        max_workers: Maximum number of tasks running at once
+        
+    Returns:
+        Tuple of (results, errors) dictionaries keyed by task name
+    """
+    results = {}
+    errors = {}
+    pending = dict(tasks)
+    running = {}
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            # Skip tasks whose dependencies failed
+            for name, (func, deps) in list(pending.items()):
+                failed = [dep for dep in deps if dep in errors]
+                if failed:
+                    errors[name] = Exception(f"Skipped because {', '.join(failed)} failed")
+                    del pending[name]
+            
+            # Start every task whose dependencies are all available
+            for name, (func, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    running[executor.submit(func, *[results[dep] for dep in deps])] = name
+                    del pending[name]
+            
+            if not running:
+                # Remaining tasks depend on unknown tasks
+                for name in pending:
+                    errors[name] = Exception("Unresolvable dependencies")
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+    
+    return results, errors
+
+
+def build_service(api_name, api_version, credentials, cache=None, quota_meter=None, quota_scheduler=None,
+                  max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Builds a googleapiclient service object that can be used from multiple threads.
+    
+    Args:
+        api_name: API name, e.g. 'youtube'
+        api_version: API version, e.g. 'v3'
+        credentials: google.auth credentials
+        cache: Optional api_cache.ResponseCache to serve repeated GET requests from disk
+        quota_meter: Optional quota.QuotaMeter charged for every request sent to the API
+        quota_scheduler: Optional quota.QuotaScheduler admitting requests by priority
+        max_retries: Retries of transient failures with backoff (0 to disable)
+    """
+    http = ThreadLocalHttp(credentials)
+    if quota_meter is not None or quota_scheduler is not None:
+        # Below the cache, so cached responses cost no quota
+        http = QuotaHttp(http, meter=quota_meter, scheduler=quota_scheduler)
+    if max_retries:
+        # Above the quota layer, so every attempt is charged
+        http = RetryingHttp(http, max_retries=max_retries)
+    if cache is not None:
+        http = CachingHttp(http, cache)
+    return build(api_name, api_version, http=http)
@@ -0,0 +1,112 @@
+"""
+Benchmark for parse_analysis_text over recorded video analyses.
+
+The recorded analyses in youtube_analysis_results.json and
+youtube_analysis_intermediate.json are repeated into corpora of increasing
+size and parsed the way create_final_report does. The time per analysis must
+stay flat as the corpus grows, and the time per KB must stay flat as single
+analyses grow, otherwise backfilling old reports would not stay linear.
+
+Exits with status 1 when the cost per analysis or per KB grows by more than
+the allowed factor between the smallest and the largest run.
+
+Usage:
+    python bench_parse_analysis.py
+    python bench_parse_analysis.py --count 5000 --max-growth 1.5
+"""
+
+import json
+import os
+import sys
+import time
+
+from analyze_new_json import parse_analysis_text
+
+RECORDED_FILES = ['youtube_analysis_results.json', 'youtube_analysis_intermediate.json']
+
+DEFAULT_COUNT = 2000
+SCALES = [1, 2, 4]
+
+# Allowed growth of the cost per unit between the smallest and the largest run
+DEFAULT_MAX_GROWTH = 2.0
+
+
+def load_recorded_analyses(paths=RECORDED_FILES):
+    """
+    Returns the analysis texts stored in the given result files.
+    """
+    analyses = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            results = json.load(f)
+        analyses.extend(video['analysis'] for video in results.get('video_analyses', {}).values())
+    if not analyses:
+        raise SystemExit(f"No recorded analyses found in {', '.join(paths)}")
+    return analyses
+
+
+def enlarge_analysis(analysis_text, factor):
+    """
+    Returns the analysis with its title and thumbnail analyses repeated factor times.
+    """
+    head, title_marker, rest = analysis_text.partition("TITLE ANALYSIS:")
+    title_part, thumbnail_marker, rest = rest.partition("THUMBNAIL ANALYSIS:")
+    thumbnail_part, url_marker, tail = rest.partition("VIDEO URL:")
+    return head + title_marker + title_part * factor + thumbnail_marker + thumbnail_part * factor + url_marker + tail
+
+
+def time_parse(analyses):
+    """
+    Returns the seconds needed to parse every analysis once.
+    """
+    start = time.perf_counter()
+    for analysis_text in analyses:
+        parse_analysis_text(analysis_text)
+    return time.perf_counter() - start
+
+
+def run_benchmark(count=DEFAULT_COUNT, scales=SCALES, max_growth=DEFAULT_MAX_GROWTH):
+    """
+    Prints the parse cost per analysis and per KB and returns False if it grows more than max_growth.
+    """
+    recorded = load_recorded_analyses()
+    print(f"{len(recorded)} recorded analyses, {sum(map(len, recorded)) / len(recorded) / 1024:.1f} KB on average")
+
+    print("\nCorpus size (cost per analysis):")
+    per_analysis = []
+    for scale in scales:
+        corpus = [recorded[i % len(recorded)] for i in range(count * scale)]
+        seconds = time_parse(corpus)
+        per_analysis.append(seconds / len(corpus))
+        print(f"  {len(corpus):7d} analyses: {seconds:.3f}s, {per_analysis[-1] * 1e6:.1f} us/analysis")
+
+    print("\nAnalysis length (cost per KB):")
+    per_kb = []
+    for scale in scales:
+        corpus = [enlarge_analysis(recorded[i % len(recorded)], scale * 4) for i in range(count // 4)]
+        size_kb = sum(map(len, corpus)) / 1024
+        seconds = time_parse(corpus)
+        per_kb.append(seconds / size_kb)
+        print(f"  {size_kb / len(corpus):7.1f} KB/analysis: {seconds:.3f}s, {per_kb[-1] * 1e6:.1f} us/KB")
+
+    growth = max(per_analysis[-1] / per_analysis[0], per_kb[-1] / per_kb[0])
+    print(f"\nLargest growth of the unit cost: {growth:.2f}x (allowed {max_growth:.2f}x)")
+    return growth <= max_growth
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark parse_analysis_text on recorded analyses')
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+                        help='Number of analyses in the smallest corpus')
+    parser.add_argument('--max-growth', type=float, default=DEFAULT_MAX_GROWTH,
+                        help='Allowed growth of the cost per analysis and per KB')
+
+    args = parser.parse_args()
+
+    if not run_benchmark(args.count, max_growth=args.max_growth):
+        print("Parsing does not scale linearly")
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""
+Import-time benchmark for the command line entry points.
+
+Every entry point is imported in a fresh interpreter several times. The
+median wall time is compared with a startup budget, and the slowest
+top-level imports reported by `python -X importtime` are listed so a
+regression can be traced back to the module that caused it.
+
+Exits with status 1 when an entry point exceeds the budget, so it can guard
+the startup time in CI or container builds.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py analyze_new_json get_data --budget 0.5 --runs 10
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = [
+    'analyze',
+    'analyze_new',
+    'analyze_new_json',
+    'get_data',
+    'get_data_basic',
+    'get_data_with_comments',
+    'media',
+    'media_basic',
+    'fleet',
+]
+
+# Default import-time budget per entry point (seconds)
+DEFAULT_BUDGET_SECONDS = 1.0
+DEFAULT_RUNS = 5
+
+# Number of slowest imports listed per entry point
+TOP_IMPORTS = 5
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_import(module, *options, **kwargs):
+    """
+    Imports module in a fresh interpreter started in the repository.
+    """
+    return subprocess.run([sys.executable, *options, '-c', f'import {module}'],
+                          cwd=REPO_DIR, check=True, **kwargs)
+
+
+def time_import(module, runs=DEFAULT_RUNS):
+    """
+    Returns the median time in seconds to start an interpreter and import module.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run_import(module)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def slowest_imports(module, count=TOP_IMPORTS):
+    """
+    Returns [(cumulative seconds, package)] for the slowest packages imported directly by module.
+    """
+    result = run_import(module, '-X', 'importtime', capture_output=True, text=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, indented by nesting depth
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth != 1:
+            continue
+        package = name.strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(cumulative) / 1e6
+    return sorted(((seconds, name) for name, seconds in totals.items()), reverse=True)[:count]
+
+
+def run_benchmark(modules=ENTRY_POINTS, budget=DEFAULT_BUDGET_SECONDS, runs=DEFAULT_RUNS):
+    """
+    Prints the import time of every module and returns the modules over budget.
+    """
+    # Startup of the bare interpreter, for reference
+    baseline = time_import('sys', runs)
+    print(f"Interpreter startup: {baseline:.3f}s")
+
+    over_budget = []
+    for module in modules:
+        seconds = time_import(module, runs)
+        status = 'OK' if seconds <= budget else 'OVER BUDGET'
+        print(f"\n{module}: {seconds:.3f}s ({status}, budget {budget:.2f}s)")
+        for cumulative, name in slowest_imports(module):
+            print(f"  {cumulative:7.3f}s  {name}")
+        if seconds > budget:
+            over_budget.append(module)
+    return over_budget
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure the import time of the command line entry points')
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS,
+                        help='Modules to import (default: all entry points)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help='Maximum import time per module in seconds')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help='Number of fresh interpreters per module; the median is reported')
+
+    args = parser.parse_args()
+
+    over_budget = run_benchmark(args.modules, budget=args.budget, runs=args.runs)
+    if over_budget:
+        print(f"\nOver the startup budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\nAll entry points within the startup budget")
@@ -0,0 +1,228 @@
+"""
+Concurrent comment harvester for YouTube videos.
+
+Comments of many videos are fetched in a background thread pool while the
+caller keeps processing videos. Every comment is streamed to an NDJSON file as
+soon as its page arrives, so harvesting 100k comments never has to hold them
+in memory; only the first few top-level comments of each video are kept for
+the video records.
+
+Comment requests run at low quota priority: when the daily budget runs low
+they are skipped rather than starving more important calls.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from api_http import RateLimiter, DEFAULT_MAX_WORKERS, DEFAULT_REQUESTS_PER_SECOND
+from quota import QuotaBudgetExceeded, request_priority, PRIORITY_LOW
+
+COMMENTS_FILE = 'youtube_video_comments.ndjson'
+
+# Largest page size accepted by commentThreads().list and comments().list
+COMMENTS_PAGE_SIZE = 100
+
+# Number of comments fetched per video without full pagination
+DEFAULT_TOP_COMMENTS = 10
+
+
+def format_comment(video_id, comment_id, snippet, parent_id=None, reply_count=None):
+    """
+    Returns the stored form of a comment snippet.
+    """
+    comment = {
+        'video_id': video_id,
+        'comment_id': comment_id,
+        'parent_id': parent_id,
+        'text': snippet['textDisplay'],
+        'like_count': snippet['likeCount'],
+        'author': snippet['authorDisplayName'],
+        'published_at': snippet['publishedAt']
+    }
+    if reply_count is not None:
+        comment['reply_count'] = reply_count
+    return comment
+
+
+def iter_reply_pages(youtube, video_id, thread, limiter=None):
+    """
+    Yields pages of replies to a comment thread.
+
+    The thread already contains up to five replies; the rest are paged with comments().list.
+    """
+    top_level_id = thread['snippet']['topLevelComment']['id']
+    inline_replies = thread.get('replies', {}).get('comments', [])
+
+    if len(inline_replies) >= thread['snippet'].get('totalReplyCount', 0):
+        if inline_replies:
+            yield [
+                format_comment(video_id, reply['id'], reply['snippet'], parent_id=top_level_id)
+                for reply in inline_replies
+            ]
+        return
+
+    page_token = None
+    while True:
+        if limiter is not None:
+            limiter.wait()
+        response = youtube.comments().list(
+            part="snippet",
+            parentId=top_level_id,
+            maxResults=COMMENTS_PAGE_SIZE,
+            pageToken=page_token
+        ).execute()
+
+        yield [
+            format_comment(video_id, reply['id'], reply['snippet'], parent_id=top_level_id)
+            for reply in response.get('items', [])
+        ]
+
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def iter_comment_pages(youtube, video_id, max_comments=DEFAULT_TOP_COMMENTS, full_pagination=False,
+                       include_replies=False, order="relevance", limiter=None):
+    """
+    Yields pages of comments of a video, top-level comments first within each thread.
+
+    Args:
+        youtube: Authenticated YouTube API service object
+        video_id: YouTube video ID
+        max_comments: Maximum number of comments (including replies) to yield, None for no limit
+        full_pagination: Follow nextPageToken instead of stopping after the first page
+        include_replies: Also yield the replies of every comment thread
+        order: 'relevance' or 'time'
+        limiter: Optional api_http.RateLimiter shared by all requests
+    """
+    remaining = max_comments
+    page_token = None
+
+    while remaining is None or remaining > 0:
+        page_size = COMMENTS_PAGE_SIZE if remaining is None else min(COMMENTS_PAGE_SIZE, remaining)
+        if limiter is not None:
+            limiter.wait()
+        response = youtube.commentThreads().list(
+            part="snippet,replies" if include_replies else "snippet",
+            videoId=video_id,
+            maxResults=page_size,
+            pageToken=page_token,
+            order=order
+        ).execute()
+
+        page = []
+        for thread in response.get('items', []):
+            top_level = thread['snippet']['topLevelComment']
+            page.append(format_comment(
+                video_id, top_level['id'], top_level['snippet'],
+                reply_count=thread['snippet'].get('totalReplyCount', 0)
+            ))
+            if include_replies:
+                for replies in iter_reply_pages(youtube, video_id, thread, limiter=limiter):
+                    page.extend(replies)
+            if remaining is not None and len(page) >= remaining:
+                break
+
+        if remaining is not None:
+            page = page[:remaining]
+            remaining -= len(page)
+        yield page
+
+        page_token = response.get('nextPageToken')
+        if not full_pagination or not page_token:
+            break
+
+
+class CommentHarvester:
+    """
+    Background thread pool that harvests comments per video and streams them to NDJSON.
+
+    Usage:
+        with CommentHarvester(youtube) as harvester:
+            for video_id in video_ids:
+                harvester.submit(video_id)
+            ... process videos ...
+            results = harvester.results()
+    """
+
+    def __init__(self, youtube, output_file=COMMENTS_FILE, max_workers=DEFAULT_MAX_WORKERS,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND, max_comments=DEFAULT_TOP_COMMENTS,
+                 full_pagination=False, include_replies=False, top_n=DEFAULT_TOP_COMMENTS):
+        self.youtube = youtube
+        self.output_file = output_file
+        self.max_comments = max_comments
+        self.full_pagination = full_pagination
+        self.include_replies = include_replies
+        self.top_n = top_n
+        self.limiter = RateLimiter(requests_per_second)
+        self.total_comments = 0
+        self._write_lock = threading.Lock()
+        self._file = open(output_file, 'w', encoding='utf-8')
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers or 1))
+        self._futures = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, video_id):
+        """
+        Queues a video for harvesting.
+        """
+        if video_id not in self._futures:
+            self._futures[video_id] = self._executor.submit(self._harvest, video_id)
+
+    def _write(self, comments):
+        lines = ''.join(json.dumps(comment, ensure_ascii=False) + '\n' for comment in comments)
+        with self._write_lock:
+            self._file.write(lines)
+            self._file.flush()
+            self.total_comments += len(comments)
+
+    def _harvest(self, video_id):
+        result = {'top_comments': [], 'harvested': 0, 'status': 'ok'}
+        try:
+            # Comments are nice to have, so they only use quota that is not needed elsewhere
+            with request_priority(PRIORITY_LOW):
+                pages = iter_comment_pages(
+                    self.youtube, video_id,
+                    max_comments=self.max_comments,
+                    full_pagination=self.full_pagination,
+                    include_replies=self.include_replies,
+                    limiter=self.limiter
+                )
+                for page in pages:
+                    self._write(page)
+                    result['harvested'] += len(page)
+                    for comment in page:
+                        if comment['parent_id'] is None and len(result['top_comments']) < self.top_n:
+                            result['top_comments'].append({
+                                'text': comment['text'],
+                                'like_count': comment['like_count'],
+                                'author': comment['author'],
+                                'published_at': comment['published_at']
+                            })
+        except QuotaBudgetExceeded as e:
+            print(f"Skipping comments for video {video_id}: {str(e)}")
+            result['status'] = 'skipped'
+        except Exception as e:
+            print(f"Could not retrieve comments for video {video_id}: {str(e)}")
+            result['status'] = 'failed'
+        return result
+
+    def results(self):
+        """
+        Waits for every submitted video and returns their results keyed by video ID.
+
+        Each result holds the first top_n top-level comments, the number of
+        comments written to the NDJSON file and a status ('ok', 'skipped', 'failed').
+        """
+        return {video_id: future.result() for video_id, future in self._futures.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._file.close()
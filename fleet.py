@@ -0,0 +1,268 @@
+"""
+Fleet runner: media kits and video extraction for many channels at once.
+
+Every channel is described by its own OAuth token file in a token directory
+(e.g. tokens/my_channel.json). Each channel runs in a separate worker process
+with its own API services, response cache, quota meter and output directory:
+
+    fleet_output/
+        my_channel/
+            youtube_media_kit.json
+            youtube_video_data.json
+            ...
+            run.log
+        fleet_summary.json
+
+Usage:
+    python fleet.py tokens/ --output fleet_output --processes 4
+"""
+
+import os
+import json
+import time
+import glob
+import contextlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from quota import QuotaMeter
+from api_cache import RESPONSE_CACHE_FILE
+
+FLEET_OUTPUT_DIR = 'fleet_output'
+FLEET_SUMMARY_FILE = 'fleet_summary.json'
+CHANNEL_LOG_FILE = 'run.log'
+
+FLEET_TASKS = ('media_kit', 'extract')
+DEFAULT_PROCESSES = 4
+
+
+def discover_channels(token_dir):
+    """
+    Returns a dictionary mapping channel name to token file for every *.json file in token_dir.
+    """
+    token_files = sorted(glob.glob(os.path.join(token_dir, '*.json')))
+    return {os.path.splitext(os.path.basename(path))[0]: path for path in token_files}
+
+
+def default_service_factory(token_file, output_dir, quota_meter):
+    """
+    Builds the YouTube Data and Analytics services for one channel.
+
+    Service factories must be module-level functions so they can be sent to the
+    worker processes.
+    """
+    from media import get_authenticated_service
+
+    return get_authenticated_service(
+        token_file=token_file,
+        cache_file=os.path.join(output_dir, RESPONSE_CACHE_FILE),
+        quota_meter=quota_meter,
+        interactive=False
+    )
+
+
+def run_media_kit_task(youtube, youtube_analytics, output_dir, options):
+    from media import create_media_kit
+
+    media_kit = create_media_kit(youtube, youtube_analytics, output_dir=output_dir)
+    if not media_kit or 'error' in media_kit:
+        raise RuntimeError((media_kit or {}).get('error', 'Media kit could not be created'))
+    return {'channel': media_kit.get('channelInfo', {}).get('title')}
+
+
+def run_extract_task(youtube, youtube_analytics, output_dir, options):
+    from get_data import extract_video_data
+
+    _, video_data = extract_video_data(youtube, youtube_analytics, output_dir=output_dir, **options)
+    return {'videos': len(video_data)}
+
+
+TASK_RUNNERS = {
+    'media_kit': run_media_kit_task,
+    'extract': run_extract_task,
+}
+
+
+def run_channel(channel, token_file, output_dir, tasks=FLEET_TASKS,
+                service_factory=default_service_factory, extract_options=None):
+    """
+    Runs the fleet tasks for one channel and returns its run summary.
+
+    Output of the task functions goes to run.log in the channel's output directory,
+    so log lines of channels running in parallel do not interleave.
+    """
+    channel_dir = os.path.join(output_dir, channel)
+    os.makedirs(channel_dir, exist_ok=True)
+
+    meter = QuotaMeter()
+    summary = {
+        'channel': channel,
+        'outputDir': channel_dir,
+        'status': 'ok',
+        'tasks': {}
+    }
+    start = time.monotonic()
+
+    with open(os.path.join(channel_dir, CHANNEL_LOG_FILE), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        try:
+            youtube, youtube_analytics = service_factory(token_file, channel_dir, meter)
+        except Exception as e:
+            print(f"Authentication failed: {str(e)}")
+            summary['status'] = 'failed'
+            summary['error'] = f"Authentication failed: {str(e)}"
+            youtube = youtube_analytics = None
+
+        if youtube is not None:
+            for task in tasks:
+                task_start = time.monotonic()
+                try:
+                    result = TASK_RUNNERS[task](youtube, youtube_analytics, channel_dir, extract_options or {})
+                    summary['tasks'][task] = dict(result, status='ok')
+                except Exception as e:
+                    print(f"Task {task} failed: {str(e)}")
+                    summary['tasks'][task] = {'status': 'failed', 'error': str(e)}
+                    summary['status'] = 'partial'
+                summary['tasks'][task]['seconds'] = round(time.monotonic() - task_start, 2)
+
+            if summary['tasks'] and all(result['status'] == 'failed' for result in summary['tasks'].values()):
+                summary['status'] = 'failed'
+
+    summary['seconds'] = round(time.monotonic() - start, 2)
+    summary['quota'] = meter.summary()
+    return summary
+
+
+def aggregate_summaries(channel_summaries):
+    """
+    Combines per-channel run summaries into a fleet-wide summary.
+    """
+    status_counts = {}
+    quota_units = {}
+    total_videos = 0
+
+    for summary in channel_summaries:
+        status_counts[summary['status']] = status_counts.get(summary['status'], 0) + 1
+        for api, units in summary['quota']['units'].items():
+            quota_units[api] = quota_units.get(api, 0) + units
+        total_videos += summary['tasks'].get('extract', {}).get('videos', 0)
+
+    return {
+        'generatedAt': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'channelCount': len(channel_summaries),
+        'statusCounts': status_counts,
+        'quotaUnits': quota_units,
+        'totalVideos': total_videos,
+        'channels': sorted(channel_summaries, key=lambda summary: summary['channel'])
+    }
+
+
+def run_fleet(token_dir, output_dir=FLEET_OUTPUT_DIR, tasks=FLEET_TASKS, processes=DEFAULT_PROCESSES,
+              service_factory=default_service_factory, extract_options=None):
+    """
+    Runs the fleet tasks for every channel in token_dir through a process pool.
+
+    Args:
+        token_dir: Directory with one OAuth token file per channel
+        output_dir: Directory receiving one sub-directory per channel and the fleet summary
+        tasks: Tasks to run for each channel ('media_kit', 'extract')
+        processes: Number of channels processed in parallel (1 runs everything in this process)
+        service_factory: Function (token_file, channel_dir, quota_meter) -> (youtube, youtube_analytics)
+        extract_options: Keyword arguments for get_data.extract_video_data
+
+    Returns:
+        Aggregated fleet summary, also saved to fleet_summary.json in output_dir
+    """
+    unknown = [task for task in tasks if task not in TASK_RUNNERS]
+    if unknown:
+        raise ValueError(f"Unknown fleet tasks: {', '.join(unknown)}")
+
+    channels = discover_channels(token_dir)
+    if not channels:
+        raise ValueError(f"No channel token files found in {token_dir}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Running {', '.join(tasks)} for {len(channels)} channels with {processes} processes...")
+
+    channel_summaries = []
+    args = [
+        (channel, token_file, output_dir, tuple(tasks), service_factory, extract_options)
+        for channel, token_file in channels.items()
+    ]
+
+    if processes is None or processes <= 1:
+        for channel_args in args:
+            channel_summaries.append(run_channel(*channel_args))
+            print(f"{channel_args[0]}: {channel_summaries[-1]['status']}")
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(args))) as executor:
+            futures = {executor.submit(run_channel, *channel_args): channel_args[0] for channel_args in args}
+            for future, channel in futures.items():
+                try:
+                    channel_summaries.append(future.result())
+                except Exception as e:
+                    # The worker process itself died
+                    channel_summaries.append({
+                        'channel': channel,
+                        'status': 'failed',
+                        'error': str(e),
+                        'tasks': {},
+                        'quota': QuotaMeter().summary()
+                    })
+                print(f"{channel}: {channel_summaries[-1]['status']}")
+
+    fleet_summary = aggregate_summaries(channel_summaries)
+
+    summary_file = os.path.join(output_dir, FLEET_SUMMARY_FILE)
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(fleet_summary, f, ensure_ascii=False, indent=2)
+
+    print(f"Fleet summary saved to {summary_file}")
+    return fleet_summary
+
+
+if __name__ == "__main__":
+    import argparse
+    from api_http import DEFAULT_MAX_WORKERS, DEFAULT_REQUESTS_PER_SECOND
+
+    parser = argparse.ArgumentParser(description='Run media kits and video extraction for many channels')
+    parser.add_argument('token_dir', help='Directory with one OAuth token file per channel')
+    parser.add_argument('--output', default=FLEET_OUTPUT_DIR,
+                        help='Directory for per-channel outputs and the fleet summary')
+    parser.add_argument('--tasks', nargs='+', choices=FLEET_TASKS, default=list(FLEET_TASKS),
+                        help='Tasks to run for each channel')
+    parser.add_argument('--processes', type=int, default=DEFAULT_PROCESSES,
+                        help='Number of channels processed in parallel')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help='Number of parallel analytics requests per channel')
+    parser.add_argument('--rps', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='Maximum analytics requests per second per channel (0 to disable)')
+    parser.add_argument('--max-videos', type=int, default=50,
+                        help='Number of latest videos to extract per channel')
+    parser.add_argument('--all', action='store_true',
+                        help='Extract every video of each channel')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch new uploads and refresh stale statistics using each channel\'s video store')
+
+    args = parser.parse_args()
+
+    fleet_summary = run_fleet(
+        args.token_dir,
+        output_dir=args.output,
+        tasks=args.tasks,
+        processes=args.processes,
+        extract_options={
+            'max_workers': args.workers,
+            'requests_per_second': args.rps,
+            'max_videos': None if args.all else args.max_videos,
+            'incremental': args.incremental
+        }
+    )
+
+    print("\nFLEET SUMMARY:")
+    print(f"Channels: {fleet_summary['channelCount']}")
+    for status, count in sorted(fleet_summary['statusCounts'].items()):
+        print(f"  {status}: {count}")
+    print(f"Videos extracted: {fleet_summary['totalVideos']}")
+    for api, units in sorted(fleet_summary['quotaUnits'].items()):
+        print(f"Quota units ({api}): {units}")
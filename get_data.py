@@ -8,15 +8,18 @@ The output is formatted for easy analysis with Large Language Models (LLMs).
 """
 
 import os
-import pandas as pd
-import json
-import re
+from itertools import islice
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from fastapi import HTTPException
+from api_http import build_service, fetch_concurrently, DEFAULT_MAX_WORKERS, DEFAULT_REQUESTS_PER_SECOND
+from api_cache import ResponseCache, RESPONSE_CACHE_FILE, cache_max_age
+from quota import QuotaScheduler, QuotaBudgetExceeded, get_project_id
+from video_store import VideoStore, VIDEO_STORE_FILE
+from video_export import VideoExportWriter, write_json_document, JSON_FILE
+from video_stats import VideoStats, compute_video_stats
+from video_analytics import get_videos_analytics_batch, ANALYTICS_BATCH_SIZE
 
 # Authentication scopes needed for YouTube API access
 SCOPES = [
@@ -26,6 +29,15 @@ SCOPES = [
 CREDENTIALS_FILE = os.path.join(os.path.dirname(__file__), "credentials.json")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "token.json")
 
+# Maximum number of items per page for playlistItems().list and videos().list
+VIDEOS_PAGE_SIZE = 50
+
+# In incremental mode, statistics older than this are refreshed
+DEFAULT_STORE_TTL_HOURS = 24
+
+# Number of stored records exported per batch in incremental mode
+EXPORT_BATCH_SIZE = 500
+
 
 def analyze_video_performance(video_data):
     """
@@ -33,60 +45,48 @@ def analyze_video_performance(video_data):
     This serves as a starting point for LLM analysis.
     
     Args:
-        video_data: List of video data dictionaries
+        video_data: Iterable of video data dictionaries
         
     Returns:
         String containing analysis report
     """
-    if not video_data:
+    return format_performance_report(compute_video_stats(video_data))
+
+
+def format_performance_report(stats):
+    """
+    Formats the result of video_stats.compute_video_stats as the analysis report.
+    """
+    if not stats['count']:
         return "No video data available for analysis."
     
-    # Sort videos by different metrics
-    by_views = sorted(video_data, key=lambda x: x['views'], reverse=True)
-    by_engagement = sorted(video_data, key=lambda x: x['engagement_rate'], reverse=True)
-    
-    # Filter videos with valid retention rate
-    videos_with_retention = [v for v in video_data if v['retention_rate'] is not None]
-    by_retention = sorted(videos_with_retention, key=lambda x: x['retention_rate'], reverse=True) if videos_with_retention else []
-    
-    # Calculate average performance metrics
-    avg_views = sum(video['views'] for video in video_data) / len(video_data) if video_data else 0
-    avg_engagement = sum(video['engagement_rate'] for video in video_data) / len(video_data) if video_data else 0
-    avg_retention = sum(v['retention_rate'] for v in videos_with_retention) / len(videos_with_retention) if videos_with_retention else 0
-    
     # Build analysis report
     report = "VIDEO PERFORMANCE ANALYSIS\n"
     report += "=" * 50 + "\n\n"
     
     # Top performing videos
     report += "TOP PERFORMING VIDEOS BY VIEWS:\n"
-    for i, video in enumerate(by_views[:5], 1):
+    for i, video in enumerate(stats['top_by_views'], 1):
         report += f"{i}. \"{video['title']}\" - {video['views']} views\n"
     
     report += "\nTOP PERFORMING VIDEOS BY ENGAGEMENT RATE:\n"
-    for i, video in enumerate(by_engagement[:5], 1):
+    for i, video in enumerate(stats['top_by_engagement'], 1):
         report += f"{i}. \"{video['title']}\" - {video['engagement_rate']}% engagement\n"
     
-    if by_retention:
+    if stats['top_by_retention']:
         report += "\nTOP PERFORMING VIDEOS BY VIEWER RETENTION:\n"
-        for i, video in enumerate(by_retention[:5], 1):
+        for i, video in enumerate(stats['top_by_retention'], 1):
             report += f"{i}. \"{video['title']}\" - {video['retention_rate']}% retention\n"
     
     # Content patterns
     report += "\n\nCONTENT PATTERNS:\n"
-    report += f"Average views per video: {int(avg_views)}\n"
-    report += f"Average engagement rate: {avg_engagement:.2f}%\n"
-    if videos_with_retention:
-        report += f"Average retention rate: {avg_retention:.2f}%\n"
+    report += f"Average views per video: {int(stats['avg_views'])}\n"
+    report += f"Average engagement rate: {stats['avg_engagement']:.2f}%\n"
+    if stats['retention_count']:
+        report += f"Average retention rate: {stats['avg_retention']:.2f}%\n"
     
     # Title length analysis
-    title_lengths = [len(video['title']) for video in video_data]
-    avg_title_length = sum(title_lengths) / len(title_lengths) if title_lengths else 0
-    
-    title_word_counts = [len(video['title'].split()) for video in video_data]
-    avg_title_words = sum(title_word_counts) / len(title_word_counts) if title_word_counts else 0
-    
-    report += f"\nAverage title length: {avg_title_length:.1f} characters, {avg_title_words:.1f} words\n"
+    report += f"\nAverage title length: {stats['avg_title_length']:.1f} characters, {stats['avg_title_words']:.1f} words\n"
     
     # Duration analysis
     report += "\nNOTE: This is a basic analysis. For deeper insights, provide this data to an LLM along with specific questions about content strategy."
@@ -116,33 +116,46 @@ def format_duration_for_humans(seconds):
         return f"{minutes}:{seconds:02d}"
 
 
-def get_authenticated_service():
+def get_authenticated_service(use_cache=True, token_file=TOKEN_FILE, cache_file=RESPONSE_CACHE_FILE,
+                              quota_meter=None, interactive=True):
     """
     Authenticates with YouTube API using OAuth 2.0 credentials.
     Returns authenticated YouTube API service object and YouTube Analytics API service object.
+    Set use_cache=False to bypass the on-disk API response cache.
+    
+    token_file and cache_file select the credentials and response cache of one channel.
+    With interactive=False, missing or revoked credentials raise instead of opening
+    the browser login flow.
     """
     try:
         creds = None
-        if os.path.exists(TOKEN_FILE):
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        if os.path.exists(token_file):
+            creds = Credentials.from_authorized_user_file(token_file, SCOPES)
         
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
+            elif not interactive:
+                raise ValueError(f"No valid credentials in {token_file}")
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
                 # Use a fixed port (8080) instead of dynamic port (0)
                 creds = flow.run_local_server(port=8080)
             
-            with open(TOKEN_FILE, 'w') as token:
+            with open(token_file, 'w') as token:
                 token.write(creds.to_json())
         
         # Build both YouTube Data API and YouTube Analytics API service objects
-        youtube = build('youtube', 'v3', credentials=creds)
-        youtube_analytics = build('youtubeAnalytics', 'v2', credentials=creds)
+        # (thread-safe, so analytics can be fetched concurrently)
+        cache = ResponseCache(cache_file) if use_cache else None
+        # Requests are admitted against the project's shared daily quota
+        scheduler = QuotaScheduler(get_project_id(CREDENTIALS_FILE))
+        youtube = build_service('youtube', 'v3', creds, cache=cache, quota_meter=quota_meter, quota_scheduler=scheduler)
+        youtube_analytics = build_service('youtubeAnalytics', 'v2', creds, cache=cache, quota_meter=quota_meter, quota_scheduler=scheduler)
         
         return youtube, youtube_analytics
     except Exception as e:
+        from fastapi import HTTPException
         raise HTTPException(
             status_code=500,
             detail=f"YouTube authentication failed: {str(e)}"
@@ -165,6 +178,100 @@ def get_channel_id(youtube):
         raise Exception("Could not retrieve channel ID")
 
 
+def get_uploads_playlist_id(youtube, channel_id):
+    """
+    Retrieves the ID of the playlist containing all uploads of the channel.
+    """
+    request = youtube.channels().list(
+        part="contentDetails",
+        id=channel_id
+    )
+    response = request.execute()
+    
+    if 'items' in response and len(response['items']) > 0:
+        return response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+    else:
+        raise Exception("Could not retrieve uploads playlist")
+
+
+def iter_upload_video_ids(youtube, uploads_playlist_id):
+    """
+    Walks the uploads playlist page by page (newest uploads first).
+    
+    Uses playlistItems().list, which costs 1 quota unit per page of 50 videos
+    instead of the 100 units charged by search().list.
+    
+    Args:
+        youtube: Authenticated YouTube API service object
+        uploads_playlist_id: ID of the channel's uploads playlist
+        
+    Yields:
+        Lists of up to 50 video IDs, one list per playlist page
+    """
+    next_page_token = None
+    
+    while True:
+        playlist_items_request = youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=uploads_playlist_id,
+            maxResults=VIDEOS_PAGE_SIZE,
+            pageToken=next_page_token
+        )
+        playlist_items_response = playlist_items_request.execute()
+        
+        video_ids = [item['contentDetails']['videoId'] for item in playlist_items_response.get('items', [])]
+        if video_ids:
+            yield video_ids
+        
+        next_page_token = playlist_items_response.get('nextPageToken')
+        if not next_page_token:
+            break
+
+
+def get_videos_details(youtube, video_ids):
+    """
+    Retrieves detailed information for up to 50 videos in a single request.
+    """
+    if not video_ids:
+        return []
+    
+    videos_request = youtube.videos().list(
+        part="snippet,statistics,contentDetails,status",
+        id=','.join(video_ids)
+    )
+    return videos_request.execute().get('items', [])
+
+
+def iter_channel_videos(youtube, channel_id, max_videos=None):
+    """
+    Streams detailed video items for the whole channel, newest first.
+    
+    Only one page of videos is held in memory at a time, so channels with
+    thousands of uploads can be processed in constant memory.
+    
+    Args:
+        youtube: Authenticated YouTube API service object
+        channel_id: YouTube channel ID
+        max_videos: Maximum number of videos to yield (None for all uploads)
+        
+    Yields:
+        Video items with detailed information
+    """
+    uploads_playlist_id = get_uploads_playlist_id(youtube, channel_id)
+    yielded = 0
+    
+    for video_ids in iter_upload_video_ids(youtube, uploads_playlist_id):
+        if max_videos is not None:
+            video_ids = video_ids[:max_videos - yielded]
+        
+        for video in get_videos_details(youtube, video_ids):
+            yield video
+            yielded += 1
+        
+        if max_videos is not None and yielded >= max_videos:
+            break
+
+
 def get_latest_videos(youtube, channel_id, max_results=50):
     """
     Retrieves the latest videos from the specified channel with detailed information.
@@ -172,33 +279,12 @@ def get_latest_videos(youtube, channel_id, max_results=50):
     Args:
         youtube: Authenticated YouTube API service object
         channel_id: YouTube channel ID
-        max_results: Maximum number of videos to retrieve (default: 50)
+        max_results: Maximum number of videos to retrieve (default: 50, None for all)
         
     Returns:
         List of video items with detailed information
     """
-    # First get the list of video IDs
-    request = youtube.search().list(
-        part="id",
-        channelId=channel_id,
-        maxResults=max_results,
-        order="date",
-        type="video"
-    )
-    response = request.execute()
-    
-    # Extract video IDs
-    video_ids = [item['id']['videoId'] for item in response.get('items', [])]
-    
-    # Get detailed video information - request more parts for detailed data
-    if video_ids:
-        videos_request = youtube.videos().list(
-            part="snippet,statistics,contentDetails,status",
-            id=','.join(video_ids)
-        )
-        return videos_request.execute()['items']
-    
-    return []
+    return list(iter_channel_videos(youtube, channel_id, max_videos=max_results))
 
 
 def get_video_analytics(youtube_analytics, video_id):
@@ -232,6 +318,8 @@ def get_video_analytics(youtube_analytics, video_id):
         return {
             'avg_view_duration': avg_duration
         }
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         # Return default values if analytics cannot be retrieved
         print(f"Could not retrieve analytics for video {video_id}: {str(e)}")
@@ -268,10 +356,193 @@ def parse_duration(duration_str):
         return f"{minutes}:{seconds:02d}"
 
 
-def extract_video_data(youtube, youtube_analytics):
+def build_video_entry(video, analytics):
+    """
+    Builds the exported record for a single video.
+    
+    Args:
+        video: Video item returned by videos().list
+        analytics: Analytics data for the video (see get_video_analytics)
+        
+    Returns:
+        Dictionary with the video's metadata and performance metrics
+    """
+    video_id = video['id']
+    snippet = video['snippet']
+    statistics = video['statistics']
+    content_details = video.get('contentDetails', {})
+    
+    # Get best thumbnail (highest resolution available)
+    thumbnails = snippet['thumbnails']
+    thumbnail_url = thumbnails.get('maxres', thumbnails.get('high', thumbnails.get('medium', thumbnails.get('default'))))['url']
+    
+    # Format video duration
+    iso_duration = content_details.get('duration', 'PT0S')
+    duration = parse_duration(iso_duration)
+    
+    # Calculate engagement rates
+    view_count = int(statistics.get('viewCount', 0))
+    like_count = int(statistics.get('likeCount', 0))
+    comment_count = int(statistics.get('commentCount', 0))
+    
+    engagement_rate = 0
+    if view_count > 0:
+        engagement_rate = ((like_count + comment_count) / view_count) * 100
+    
+    # Convert averageViewDuration to human-readable format if available
+    avg_view_duration_seconds = analytics.get('avg_view_duration')
+    avg_view_duration_formatted = format_duration_for_humans(avg_view_duration_seconds)
+    
+    # Calculate viewer retention if both durations are available
+    retention_rate = None
+    if avg_view_duration_seconds is not None and isinstance(avg_view_duration_seconds, (int, float)):
+        # Convert ISO duration to seconds
+        total_seconds = 0
+        duration_str = iso_duration.replace('PT', '')
+    
+        if 'H' in duration_str:
+            hours, duration_str = duration_str.split('H')
+            total_seconds += int(hours) * 3600
+    
+        if 'M' in duration_str:
+            minutes, duration_str = duration_str.split('M')
+            total_seconds += int(minutes) * 60
+    
+        if 'S' in duration_str:
+            seconds = duration_str.replace('S', '')
+            total_seconds += int(seconds)
+    
+        if total_seconds > 0:
+            retention_rate = (avg_view_duration_seconds / total_seconds) * 100
+    
+    # Create video data entry with comprehensive information
+    return {
+        'title': snippet['title'],
+        'video_id': video_id,
+        'published_at': snippet['publishedAt'],
+        'thumbnail_url': thumbnail_url,
+        'duration': duration,
+        'views': view_count,
+        'likes': like_count,
+        'comments': comment_count,
+        'engagement_rate': round(engagement_rate, 2),
+        'avg_view_duration_seconds': avg_view_duration_seconds,
+        'avg_view_duration': avg_view_duration_formatted,
+        'retention_rate': round(retention_rate, 2) if retention_rate is not None else None
+    }
+
+
+def fetch_videos_analytics(youtube_analytics, videos, max_workers=DEFAULT_MAX_WORKERS,
+                           requests_per_second=DEFAULT_REQUESTS_PER_SECOND, batch_analytics=True):
+    """
+    Fetches analytics for a list of videos in parallel.
+    
+    Returns:
+        List of analytics dictionaries in the same order as videos
+    """
+    if batch_analytics:
+        # One report query per chunk of up to 200 videos
+        video_ids = [video['id'] for video in videos]
+        chunks = [video_ids[i:i + ANALYTICS_BATCH_SIZE] for i in range(0, len(video_ids), ANALYTICS_BATCH_SIZE)]
+        chunk_results = fetch_concurrently(
+            lambda chunk: get_videos_analytics_batch(youtube_analytics, chunk),
+            chunks,
+            max_workers=max_workers,
+            requests_per_second=requests_per_second
+        )
+        analytics_by_id = {}
+        for chunk_result in chunk_results:
+            analytics_by_id.update(chunk_result)
+        return [analytics_by_id[video_id] for video_id in video_ids]
+    
+    return fetch_concurrently(
+        lambda video: get_video_analytics(youtube_analytics, video['id']),
+        videos,
+        max_workers=max_workers,
+        requests_per_second=requests_per_second
+    )
+
+
+def sync_video_store(youtube, youtube_analytics, channel_id, store, ttl_hours=DEFAULT_STORE_TTL_HOURS,
+                     max_workers=DEFAULT_MAX_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                     batch_analytics=True):
+    """
+    Brings the local video store up to date with as few API calls as possible.
+    
+    Only uploads that are not in the store yet are fetched, plus a statistics
+    refresh for stored videos whose data is older than ttl_hours.
+    
+    Args:
+        youtube: Authenticated YouTube API service object
+        youtube_analytics: Authenticated YouTube Analytics API service object
+        channel_id: YouTube channel ID
+        store: VideoStore instance
+        ttl_hours: Age after which a stored video's statistics are refreshed
+        
+    Returns:
+        Tuple of (number of new videos, number of refreshed videos)
+    """
+    # Cached responses older than ttl_hours would mark outdated statistics as fresh
+    with cache_max_age(youtube, ttl_hours * 3600), cache_max_age(youtube_analytics, ttl_hours * 3600):
+        # The uploads playlist is ordered newest first, so stop paging at the first known video
+        new_ids = []
+        uploads_playlist_id = get_uploads_playlist_id(youtube, channel_id)
+        for video_ids in iter_upload_video_ids(youtube, uploads_playlist_id):
+            known = [store.contains(video_id) for video_id in video_ids]
+            new_ids.extend(video_id for video_id, is_known in zip(video_ids, known) if not is_known)
+            if any(known):
+                break
+        
+        stale_ids = store.get_stale_ids(ttl_hours * 3600)
+        print(f"Incremental sync: {len(new_ids)} new videos, {len(stale_ids)} videos to refresh")
+        
+        ids_to_fetch = new_ids + stale_ids
+        for i in range(0, len(ids_to_fetch), ANALYTICS_BATCH_SIZE):
+            chunk_ids = ids_to_fetch[i:i + ANALYTICS_BATCH_SIZE]
+            videos = []
+            for j in range(0, len(chunk_ids), VIDEOS_PAGE_SIZE):
+                videos.extend(get_videos_details(youtube, chunk_ids[j:j + VIDEOS_PAGE_SIZE]))
+            
+            chunk_analytics = fetch_videos_analytics(
+                youtube_analytics, videos,
+                max_workers=max_workers,
+                requests_per_second=requests_per_second,
+                batch_analytics=batch_analytics
+            )
+            store.upsert([build_video_entry(video, analytics) for video, analytics in zip(videos, chunk_analytics)])
+            
+            # Videos that were deleted or made private are no longer returned
+            returned_ids = {video['id'] for video in videos}
+            missing_ids = [video_id for video_id in chunk_ids if video_id not in returned_ids]
+            if missing_ids:
+                store.delete(missing_ids)
+        
+    return len(new_ids), len(stale_ids)
+
+
+def extract_video_data(youtube, youtube_analytics, max_workers=DEFAULT_MAX_WORKERS,
+                       requests_per_second=DEFAULT_REQUESTS_PER_SECOND, batch_analytics=True,
+                       max_videos=50, incremental=False, ttl_hours=DEFAULT_STORE_TTL_HOURS, output_dir='.',
+                       parquet=False, in_memory=True):
     """
     Main function to extract video data from the authenticated user's channel.
     Gathers comprehensive data suitable for LLM analysis of content patterns.
+    
+    Args:
+        youtube: Authenticated YouTube API service object
+        youtube_analytics: Authenticated YouTube Analytics API service object
+        max_workers: Number of analytics requests to run in parallel
+        requests_per_second: Maximum analytics requests per second (None to disable)
+        batch_analytics: Query analytics for up to 200 videos per request instead of one per video
+        max_videos: Maximum number of videos to extract, newest first (None for the whole channel)
+        incremental: Sync the local video store and export from it instead of re-downloading everything
+        ttl_hours: In incremental mode, age after which stored statistics are refreshed
+        output_dir: Directory for the exported files and the local video store
+        parquet: Also export the records to youtube_video_data.parquet (requires pyarrow)
+        in_memory: Return the records as a DataFrame and a list. With in_memory=False nothing
+                   is kept in memory and (None, iterator over the NDJSON export) is returned.
+    
+    Records are streamed to youtube_video_data.ndjson and .csv as they are produced.
     """
     try:
         # Get channel ID
@@ -291,122 +562,93 @@ def extract_video_data(youtube, youtube_analytics):
         print(f"Channel: {channel_name}")
         print(f"Subscribers: {subscriber_count}")
         
-        # Get latest videos
-        videos = get_latest_videos(youtube, channel_id)
-        print(f"Retrieved {len(videos)} videos")
-        
-        # Extract and organize video data
+        # Records are written out as they are produced; only kept in memory if asked for
         video_data = []
+        # Performance statistics are collected while the records stream past
+        stats = VideoStats()
         
-        for video in videos:
-            video_id = video['id']
-            snippet = video['snippet']
-            statistics = video['statistics']
-            content_details = video.get('contentDetails', {})
-            
-            # Get best thumbnail (highest resolution available)
-            thumbnails = snippet['thumbnails']
-            thumbnail_url = thumbnails.get('maxres', thumbnails.get('high', thumbnails.get('medium', thumbnails.get('default'))))['url']
-            
-            # Get analytics data
-            analytics = get_video_analytics(youtube_analytics, video_id)
-            
-            # Format video duration
-            iso_duration = content_details.get('duration', 'PT0S')
-            duration = parse_duration(iso_duration)
-            
-            # Calculate engagement rates
-            view_count = int(statistics.get('viewCount', 0))
-            like_count = int(statistics.get('likeCount', 0))
-            comment_count = int(statistics.get('commentCount', 0))
-            
-            engagement_rate = 0
-            if view_count > 0:
-                engagement_rate = ((like_count + comment_count) / view_count) * 100
-            
-            # Convert averageViewDuration to human-readable format if available
-            avg_view_duration_seconds = analytics.get('avg_view_duration')
-            avg_view_duration_formatted = format_duration_for_humans(avg_view_duration_seconds)
-            
-            # Calculate viewer retention if both durations are available
-            retention_rate = None
-            if avg_view_duration_seconds is not None and isinstance(avg_view_duration_seconds, (int, float)):
-                # Convert ISO duration to seconds
-                total_seconds = 0
-                duration_str = iso_duration.replace('PT', '')
-                
-                if 'H' in duration_str:
-                    hours, duration_str = duration_str.split('H')
-                    total_seconds += int(hours) * 3600
-                
-                if 'M' in duration_str:
-                    minutes, duration_str = duration_str.split('M')
-                    total_seconds += int(minutes) * 60
-                
-                if 'S' in duration_str:
-                    seconds = duration_str.replace('S', '')
-                    total_seconds += int(seconds)
-                
-                if total_seconds > 0:
-                    retention_rate = (avg_view_duration_seconds / total_seconds) * 100
-            
-            # Create video data entry with comprehensive information
-            video_entry = {
-                'title': snippet['title'],
-                'video_id': video_id,
-                'published_at': snippet['publishedAt'],
-                'thumbnail_url': thumbnail_url,
-                'duration': duration,
-                'views': view_count,
-                'likes': like_count,
-                'comments': comment_count,
-                'engagement_rate': round(engagement_rate, 2),
-                'avg_view_duration_seconds': avg_view_duration_seconds,
-                'avg_view_duration': avg_view_duration_formatted,
-                'retention_rate': round(retention_rate, 2) if retention_rate is not None else None
-            }
-            
-            video_data.append(video_entry)
+        def export(records):
+            writer.write(records)
+            if in_memory:
+                video_data.extend(records)
+            stats.update(records)
         
-        # Create DataFrame for CSV export
-        df = pd.DataFrame(video_data)
-        
-        # Format the date for better readability
-        if 'published_at' in df.columns:
-            df['published_at'] = pd.to_datetime(df['published_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Sort by publication date (newest first)
-        df = df.sort_values(by='published_at', ascending=False)
+        with VideoExportWriter(output_dir, parquet=parquet) as writer:
+            if incremental:
+                # Only fetch what changed since the last run, then export the whole store
+                with VideoStore(os.path.join(output_dir, VIDEO_STORE_FILE)) as store:
+                    sync_video_store(
+                        youtube, youtube_analytics, channel_id, store,
+                        ttl_hours=ttl_hours,
+                        max_workers=max_workers,
+                        requests_per_second=requests_per_second,
+                        batch_analytics=batch_analytics
+                    )
+                    stored = store.iter_videos()
+                    for chunk in iter(lambda: list(islice(stored, EXPORT_BATCH_SIZE)), []):
+                        export(chunk)
+            else:
+                # Stream videos from the uploads playlist and process them in chunks,
+                # so analytics for each chunk can be fetched in parallel
+                videos = iter_channel_videos(youtube, channel_id, max_videos=max_videos)
+                chunk_size = ANALYTICS_BATCH_SIZE * max(1, max_workers or 1)
+                
+                while True:
+                    chunk = list(islice(videos, chunk_size))
+                    if not chunk:
+                        break
+                    
+                    chunk_analytics = fetch_videos_analytics(
+                        youtube_analytics, chunk,
+                        max_workers=max_workers,
+                        requests_per_second=requests_per_second,
+                        batch_analytics=batch_analytics
+                    )
+                    
+                    export([build_video_entry(video, analytics) for video, analytics in zip(chunk, chunk_analytics)])
+                    print(f"Processed {writer.count} videos")
         
-        # Save to CSV
-        output_file_csv = 'youtube_video_data.csv'
-        df.to_csv(output_file_csv, index=False)
+        print(f"Retrieved {writer.count} videos")
         
-        # Save full data to JSON
-        output_file_json = 'youtube_video_data.json'
-        with open(output_file_json, 'w', encoding='utf-8') as f:
-            json.dump({
+        # Assemble the full JSON document from the NDJSON export
+        output_file_json = os.path.join(output_dir, JSON_FILE)
+        write_json_document(
+            output_file_json,
+            {
                 'channel': {
                     'name': channel_name,
                     'id': channel_id,
                     'subscribers': subscriber_count
-                },
-                'videos': video_data,
-                'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }, f, ensure_ascii=False, indent=2)
+                }
+            },
+            writer.iter_records(),
+            'videos',
+            {'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        )
         
-        print(f"Data successfully exported to {output_file_csv} and {output_file_json}")
+        exported = [writer.csv_path, output_file_json, writer.ndjson_path] + ([writer.parquet_path] if parquet else [])
+        print(f"Data successfully exported to {', '.join(exported)}")
         
         # Simple performance analysis
-        performance_analysis = analyze_video_performance(video_data)
+        performance_analysis = format_performance_report(stats.result())
         
         # Save analysis to a separate file
-        output_analysis_file = 'video_performance_analysis.txt'
+        output_analysis_file = os.path.join(output_dir, 'video_performance_analysis.txt')
         with open(output_analysis_file, 'w', encoding='utf-8') as f:
             f.write(performance_analysis)
         
         print(f"Performance analysis saved to {output_analysis_file}")
         
+        if not in_memory:
+            return None, writer.iter_records()
+        
+        # Create DataFrame with readable dates, newest first
+        import pandas as pd
+        df = pd.DataFrame(video_data)
+        if 'published_at' in df.columns:
+            df['published_at'] = pd.to_datetime(df['published_at']).dt.strftime('%Y-%m-%d %H:%M:%S')
+            df = df.sort_values(by='published_at', ascending=False)
+        
         return df, video_data
     
     except Exception as e:
@@ -415,14 +657,53 @@ def extract_video_data(youtube, youtube_analytics):
 
 
 if __name__ == "__main__":
-    youtube, youtube_analytics = get_authenticated_service()
-    video_data_df, video_data_full = extract_video_data(youtube, youtube_analytics)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Extract YouTube channel video data')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help='Number of parallel analytics requests')
+    parser.add_argument('--rps', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help='Maximum analytics requests per second (0 to disable)')
+    parser.add_argument('--per-video-analytics', action='store_true',
+                        help='Send one analytics query per video instead of batched queries')
+    parser.add_argument('--max-videos', type=int, default=50,
+                        help='Number of latest videos to extract')
+    parser.add_argument('--all', action='store_true',
+                        help='Extract every video of the channel')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch new uploads and refresh stale statistics using the local video store')
+    parser.add_argument('--ttl-hours', type=float, default=DEFAULT_STORE_TTL_HOURS,
+                        help='In incremental mode, refresh statistics older than this many hours')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the on-disk API response cache')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Also export the video data to Parquet (requires pyarrow)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Do not keep the video data in memory; only write it to the export files')
+    
+    args = parser.parse_args()
+    
+    youtube, youtube_analytics = get_authenticated_service(use_cache=not args.no_cache)
+    video_data_df, video_data_full = extract_video_data(
+        youtube, youtube_analytics,
+        max_workers=args.workers,
+        requests_per_second=args.rps,
+        batch_analytics=not args.per_video_analytics,
+        max_videos=None if args.all else args.max_videos,
+        incremental=args.incremental,
+        ttl_hours=args.ttl_hours,
+        parquet=args.parquet,
+        in_memory=not args.stream
+    )
     
     # Display summary
     print("\nSUMMARY:")
-    print(f"Total videos extracted: {len(video_data_df)}")
+    if video_data_df is None:
+        print(f"Total videos extracted: {sum(1 for _ in video_data_full)}")
+    else:
+        print(f"Total videos extracted: {len(video_data_df)}")
     
-    if not video_data_df.empty:
+    if video_data_df is not None and not video_data_df.empty:
         # Most viewed video
         if 'views' in video_data_df and video_data_df['views'].max() > 0:
             print(f"Most viewed video: {video_data_df.loc[video_data_df['views'].idxmax()]['title']}")
@@ -439,6 +720,9 @@ if __name__ == "__main__":
     print("1. youtube_video_data.csv - Basic video data in CSV format")
     print("2. youtube_video_data.json - Comprehensive video data including comments in JSON format")
     print("3. video_performance_analysis.txt - Basic performance analysis")
+    print("4. youtube_video_data.ndjson - One video per line, written while extracting")
+    if args.parquet:
+        print("5. youtube_video_data.parquet - Columnar video data for Arrow/pandas")
     
     print("\nNEXT STEPS:")
     print("1. Upload these files to an LLM conversation")
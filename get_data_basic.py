@@ -7,13 +7,14 @@ including title, thumbnail, views, publish date, likes, CTR, and view duration.
 """
 
 import os
-import pandas as pd
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from fastapi import HTTPException
+from api_http import build_service
+from api_cache import ResponseCache
+from quota import QuotaScheduler, QuotaBudgetExceeded, get_project_id
+from video_analytics import get_videos_analytics_batch
 
 # Authentication scopes needed for YouTube API access
 SCOPES = [
@@ -24,10 +25,11 @@ CREDENTIALS_FILE = os.path.join(os.path.dirname(__file__), "credentials.json")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "token.json")
 
 
-def get_authenticated_service():
+def get_authenticated_service(use_cache=True):
     """
     Authenticates with YouTube API using OAuth 2.0 credentials.
     Returns authenticated YouTube API service object and YouTube Analytics API service object.
+    Set use_cache=False to bypass the on-disk API response cache.
     """
     try:
         creds = None
@@ -46,11 +48,16 @@ def get_authenticated_service():
                 token.write(creds.to_json())
         
         # Build both YouTube Data API and YouTube Analytics API service objects
-        youtube = build('youtube', 'v3', credentials=creds)
-        youtube_analytics = build('youtubeAnalytics', 'v2', credentials=creds)
+        # Repeated requests are served from the on-disk response cache
+        cache = ResponseCache() if use_cache else None
+        # Requests are admitted against the project's shared daily quota
+        scheduler = QuotaScheduler(get_project_id(CREDENTIALS_FILE))
+        youtube = build_service('youtube', 'v3', creds, cache=cache, quota_scheduler=scheduler)
+        youtube_analytics = build_service('youtubeAnalytics', 'v2', creds, cache=cache, quota_scheduler=scheduler)
         
         return youtube, youtube_analytics
     except Exception as e:
+        from fastapi import HTTPException
         raise HTTPException(
             status_code=500,
             detail=f"YouTube authentication failed: {str(e)}"
@@ -139,6 +146,8 @@ def get_video_analytics(youtube_analytics, video_id):
         return {
             'avg_view_duration': avg_duration
         }
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         # Return default values if analytics cannot be retrieved
         print(f"Could not retrieve analytics for video {video_id}: {str(e)}")
@@ -175,7 +184,7 @@ def parse_duration(duration_str):
         return f"{minutes}:{seconds:02d}"
 
 
-def extract_video_data(youtube, youtube_analytics):
+def extract_video_data(youtube, youtube_analytics, batch_analytics=True):
     """
     Main function to extract video data from the authenticated user's channel.
     """
@@ -188,6 +197,11 @@ def extract_video_data(youtube, youtube_analytics):
         videos = get_latest_videos(youtube, channel_id)
         print(f"Retrieved {len(videos)} videos")
         
+        # Fetch analytics for all videos with a few batched report queries
+        batched_analytics = {}
+        if batch_analytics:
+            batched_analytics = get_videos_analytics_batch(youtube_analytics, [video['id'] for video in videos])
+        
         # Extract and organize video data
         video_data = []
         
@@ -201,7 +215,10 @@ def extract_video_data(youtube, youtube_analytics):
             thumbnail_url = thumbnails.get('maxres', thumbnails.get('high', thumbnails.get('medium', thumbnails.get('default'))))['url']
             
             # Get analytics data
-            analytics = get_video_analytics(youtube_analytics, video_id)
+            if batch_analytics:
+                analytics = batched_analytics[video_id]
+            else:
+                analytics = get_video_analytics(youtube_analytics, video_id)
             
             # Format video duration
             content_details = video.get('contentDetails', {})
@@ -222,6 +239,7 @@ def extract_video_data(youtube, youtube_analytics):
             video_data.append(video_entry)
         
         # Create DataFrame and export to CSV
+        import pandas as pd
         df = pd.DataFrame(video_data)
         
         # Format the date for better readability
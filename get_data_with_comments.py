@@ -1,10 +1,11 @@
-def analyze_video_performance(video_data):
+def analyze_video_performance(video_data, tag_performance=None):
     """
     Performs basic analysis on video performance to identify patterns.
     This serves as a starting point for LLM analysis.
     
     Args:
         video_data: List of video data dictionaries
+        tag_performance: Result of compute_tag_performance(video_data), computed if not given
         
     Returns:
         String containing analysis report
@@ -20,27 +21,11 @@ def analyze_video_performance(video_data):
     videos_with_retention = [v for v in video_data if v['retention_rate'] is not None]
     by_retention = sorted(videos_with_retention, key=lambda x: x['retention_rate'], reverse=True) if videos_with_retention else []
     
-    # Get most common tags
-    all_tags = []
-    for video in video_data:
-        all_tags.extend(video.get('tags', []))
-    
-    tag_counts = {}
-    for tag in all_tags:
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-    
-    top_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    # Get most common topics
-    all_topics = []
-    for video in video_data:
-        all_topics.extend(video.get('extracted_topics', []))
-    
-    topic_counts = {}
-    for topic in all_topics:
-        topic_counts[topic] = topic_counts.get(topic, 0) + 1
-    
-    top_topics = sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Per-tag and per-topic usage and performance
+    if tag_performance is None:
+        tag_performance = compute_tag_performance(video_data)
+    top_tags = tag_performance['tags'][:10]
+    top_topics = tag_performance['topics'][:10]
     
     # Calculate average performance metrics
     avg_views = sum(video['views'] for video in video_data) / len(video_data) if video_data else 0
@@ -74,13 +59,19 @@ def analyze_video_performance(video_data):
     
     # Tag analysis
     report += "\nMOST USED TAGS:\n"
-    for tag, count in top_tags:
-        report += f"- {tag}: used in {count} videos\n"
+    for row in top_tags:
+        report += f"- {row['term']}: used in {row['videos']} videos{format_lift(row)}\n"
+    
+    best_tags = best_performing_terms(tag_performance['tags'])
+    if best_tags:
+        report += "\nBEST PERFORMING TAGS (used in at least 3 videos):\n"
+        for row in best_tags:
+            report += f"- {row['term']}: {row['avg_views']} avg views{format_lift(row)}\n"
     
     # Topic analysis
     report += "\nMOST COMMON TOPICS (extracted from titles):\n"
-    for topic, count in top_topics:
-        report += f"- {topic}: appears in {count} videos\n"
+    for row in top_topics:
+        report += f"- {row['term']}: appears in {row['videos']} videos{format_lift(row)}\n"
     
     # Title length analysis
     title_lengths = [len(video['title']) for video in video_data]
@@ -97,41 +88,16 @@ def analyze_video_performance(video_data):
     return report
 
 
-def get_video_comments(youtube, video_id, max_comments=10):
+def format_lift(row):
     """
-    Retrieves top comments for a video.
-    
-    Args:
-        youtube: Authenticated YouTube API service object
-        video_id: YouTube video ID
-        max_comments: Maximum number of comments to retrieve
-        
-    Returns:
-        List of comments
+    Formats the views and engagement lift of a tag performance row for the report.
     """
-    try:
-        request = youtube.commentThreads().list(
-            part="snippet",
-            videoId=video_id,
-            maxResults=max_comments,
-            order="relevance"
-        )
-        response = request.execute()
-        
-        comments = []
-        for item in response.get('items', []):
-            comment = item['snippet']['topLevelComment']['snippet']
-            comments.append({
-                'text': comment['textDisplay'],
-                'like_count': comment['likeCount'],
-                'author': comment['authorDisplayName'],
-                'published_at': comment['publishedAt']
-            })
-        
-        return comments
-    except Exception as e:
-        print(f"Could not retrieve comments for video {video_id}: {str(e)}")
-        return []
+    if row['views_lift'] is None:
+        return ""
+    text = f" ({row['views_lift']:.2f}x avg views"
+    if row['engagement_lift'] is not None:
+        text += f", {row['engagement_lift']:.2f}x avg engagement"
+    return text + ")"
 
 
 def extract_topics_from_title(title):
@@ -195,15 +161,18 @@ The output is formatted for easy analysis with Large Language Models (LLMs).
 """
 
 import os
-import pandas as pd
 import json
 import re
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from fastapi import HTTPException
+from api_http import build_service, DEFAULT_MAX_WORKERS
+from api_cache import ResponseCache
+from quota import QuotaScheduler, QuotaBudgetExceeded, get_project_id
+from comment_harvester import CommentHarvester, COMMENTS_FILE, DEFAULT_TOP_COMMENTS
+from tag_performance import compute_tag_performance, best_performing_terms
+from video_analytics import get_videos_analytics_batch
 
 # Authentication scopes needed for YouTube API access
 SCOPES = [
@@ -214,10 +183,11 @@ CREDENTIALS_FILE = os.path.join(os.path.dirname(__file__), "credentials.json")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "token.json")
 
 
-def get_authenticated_service():
+def get_authenticated_service(use_cache=True):
     """
     Authenticates with YouTube API using OAuth 2.0 credentials.
     Returns authenticated YouTube API service object and YouTube Analytics API service object.
+    Set use_cache=False to bypass the on-disk API response cache.
     """
     try:
         creds = None
@@ -236,11 +206,16 @@ def get_authenticated_service():
                 token.write(creds.to_json())
         
         # Build both YouTube Data API and YouTube Analytics API service objects
-        youtube = build('youtube', 'v3', credentials=creds)
-        youtube_analytics = build('youtubeAnalytics', 'v2', credentials=creds)
+        # Repeated requests are served from the on-disk response cache
+        cache = ResponseCache() if use_cache else None
+        # Requests are admitted against the project's shared daily quota
+        scheduler = QuotaScheduler(get_project_id(CREDENTIALS_FILE))
+        youtube = build_service('youtube', 'v3', creds, cache=cache, quota_scheduler=scheduler)
+        youtube_analytics = build_service('youtubeAnalytics', 'v2', creds, cache=cache, quota_scheduler=scheduler)
         
         return youtube, youtube_analytics
     except Exception as e:
+        from fastapi import HTTPException
         raise HTTPException(
             status_code=500,
             detail=f"YouTube authentication failed: {str(e)}"
@@ -330,6 +305,8 @@ def get_video_analytics(youtube_analytics, video_id):
         return {
             'avg_view_duration': avg_duration
         }
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         # Return default values if analytics cannot be retrieved
         print(f"Could not retrieve analytics for video {video_id}: {str(e)}")
@@ -366,11 +343,25 @@ def parse_duration(duration_str):
         return f"{minutes}:{seconds:02d}"
 
 
-def extract_video_data(youtube, youtube_analytics):
+def extract_video_data(youtube, youtube_analytics, batch_analytics=True, comment_workers=DEFAULT_MAX_WORKERS,
+                       all_comments=False, comments_per_video=DEFAULT_TOP_COMMENTS, include_replies=False):
     """
     Main function to extract video data from the authenticated user's channel.
     Gathers comprehensive data suitable for LLM analysis of content patterns.
+    
+    Comments are harvested in the background while the videos are processed and
+    streamed to youtube_video_comments.ndjson; each video record keeps its top comments.
+    
+    Args:
+        youtube: Authenticated YouTube API service object
+        youtube_analytics: Authenticated YouTube Analytics API service object
+        batch_analytics: Query analytics for up to 200 videos per request instead of one per video
+        comment_workers: Number of videos whose comments are fetched in parallel
+        all_comments: Page through all comments instead of only the first page
+        comments_per_video: Maximum comments (including replies) harvested per video, None for no limit
+        include_replies: Also harvest the replies to each comment
     """
+    harvester = None
     try:
         # Get channel ID
         channel_id = get_channel_id(youtube)
@@ -393,6 +384,22 @@ def extract_video_data(youtube, youtube_analytics):
         videos = get_latest_videos(youtube, channel_id)
         print(f"Retrieved {len(videos)} videos")
         
+        # Fetch analytics for all videos with a few batched report queries
+        batched_analytics = {}
+        if batch_analytics:
+            batched_analytics = get_videos_analytics_batch(youtube_analytics, [video['id'] for video in videos])
+        
+        # Start harvesting comments so they are fetched while the videos are processed
+        harvester = CommentHarvester(
+            youtube,
+            max_workers=comment_workers,
+            max_comments=comments_per_video,
+            full_pagination=all_comments,
+            include_replies=include_replies
+        )
+        for video in videos:
+            harvester.submit(video['id'])
+        
         # Extract and organize video data
         video_data = []
         
@@ -420,15 +427,15 @@ def extract_video_data(youtube, youtube_analytics):
             title_topics = extract_topics_from_title(snippet['title'])
             
             # Get analytics data
-            analytics = get_video_analytics(youtube_analytics, video_id)
+            if batch_analytics:
+                analytics = batched_analytics[video_id]
+            else:
+                analytics = get_video_analytics(youtube_analytics, video_id)
             
             # Format video duration
             iso_duration = content_details.get('duration', 'PT0S')
             duration = parse_duration(iso_duration)
             
-            # Get top comments
-            comments = get_video_comments(youtube, video_id)
-            
             # Calculate engagement rates
             view_count = int(statistics.get('viewCount', 0))
             like_count = int(statistics.get('likeCount', 0))
@@ -484,12 +491,23 @@ def extract_video_data(youtube, youtube_analytics):
                 'avg_view_duration_seconds': avg_view_duration_seconds,
                 'avg_view_duration': avg_view_duration_formatted,
                 'retention_rate': round(retention_rate, 2) if retention_rate is not None else None,
-                'top_comments': comments
+                'top_comments': []
             }
             
             video_data.append(video_entry)
         
+        # Attach the top comments once the harvest is complete
+        comment_results = harvester.results()
+        harvester.close()
+        for video_entry in video_data:
+            video_entry['top_comments'] = comment_results[video_entry['video_id']]['top_comments']
+        
+        skipped = sum(1 for result in comment_results.values() if result['status'] != 'ok')
+        print(f"Harvested {harvester.total_comments} comments to {COMMENTS_FILE}" +
+              (f" ({skipped} videos skipped or failed)" if skipped else ""))
+        
         # Create DataFrame for CSV export
+        import pandas as pd
         df = pd.DataFrame([{k: v for k, v in video.items() if k != 'top_comments'} for video in video_data])
         
         # Format the date for better readability
@@ -503,6 +521,9 @@ def extract_video_data(youtube, youtube_analytics):
         output_file_csv = 'youtube_video_data.csv'
         df.to_csv(output_file_csv, index=False)
         
+        # Tag and topic performance, shared by the JSON export and the report
+        tag_performance = compute_tag_performance(video_data)
+        
         # Save full data including comments to JSON (better for LLM analysis)
         output_file_json = 'youtube_video_data.json'
         with open(output_file_json, 'w', encoding='utf-8') as f:
@@ -513,13 +534,14 @@ def extract_video_data(youtube, youtube_analytics):
                     'subscribers': subscriber_count
                 },
                 'videos': video_data,
+                'tag_performance': tag_performance,
                 'extracted_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }, f, ensure_ascii=False, indent=2)
         
         print(f"Data successfully exported to {output_file_csv} and {output_file_json}")
         
         # Simple performance analysis
-        performance_analysis = analyze_video_performance(video_data)
+        performance_analysis = analyze_video_performance(video_data, tag_performance)
         
         # Save analysis to a separate file
         output_analysis_file = 'video_performance_analysis.txt'
@@ -532,12 +554,40 @@ def extract_video_data(youtube, youtube_analytics):
     
     except Exception as e:
         print(f"Error extracting video data: {str(e)}")
+        if harvester is not None:
+            harvester.close()
         raise
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Extract YouTube channel video data with comments')
+    parser.add_argument('--comment-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help='Number of videos whose comments are fetched in parallel')
+    parser.add_argument('--all-comments', action='store_true',
+                        help='Page through all comments of each video instead of the first page')
+    parser.add_argument('--max-comments', type=int, default=None,
+                        help=f'Maximum comments per video (default: {DEFAULT_TOP_COMMENTS}, or no limit with --all-comments)')
+    parser.add_argument('--replies', action='store_true',
+                        help='Also harvest replies to comments')
+    
+    args = parser.parse_args()
+    
+    # Without a limit, only --all-comments harvests every comment (and reply) of a video
+    if args.max_comments is not None:
+        comments_per_video = args.max_comments
+    else:
+        comments_per_video = None if args.all_comments else DEFAULT_TOP_COMMENTS
+    
     youtube, youtube_analytics = get_authenticated_service()
-    video_data_df, video_data_full = extract_video_data(youtube, youtube_analytics)
+    video_data_df, video_data_full = extract_video_data(
+        youtube, youtube_analytics,
+        comment_workers=args.comment_workers,
+        all_comments=args.all_comments,
+        comments_per_video=comments_per_video,
+        include_replies=args.replies
+    )
     
     # Display summary
     print("\nSUMMARY:")
@@ -560,6 +610,7 @@ if __name__ == "__main__":
     print("1. youtube_video_data.csv - Basic video data in CSV format")
     print("2. youtube_video_data.json - Comprehensive video data including comments in JSON format")
     print("3. video_performance_analysis.txt - Basic performance analysis")
+    print(f"4. {COMMENTS_FILE} - All harvested comments, one JSON object per line")
     
     print("\nNEXT STEPS:")
     print("1. Upload these files to an LLM conversation")
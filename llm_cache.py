@@ -0,0 +1,191 @@
+"""
+Content-addressed cache for OpenAI chat completion responses.
+
+Entries are keyed on a hash of the full request (model, messages, temperature,
+max_tokens, ...), so changing a prompt or a parameter never serves a stale
+answer. All entries live in a single SQLite file that is bounded both by
+size (least recently used entries are evicted first) and by age.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_FILE = 'llm_response_cache.db'
+
+# Default eviction limits
+DEFAULT_MAX_CACHE_BYTES = 100 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 90
+
+
+def request_cache_key(request):
+    """
+    Returns a stable hash of a chat completion request.
+    """
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed store of completion texts with size- and age-based eviction.
+    """
+
+    def __init__(self, path=LLM_CACHE_FILE, max_bytes=DEFAULT_MAX_CACHE_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_accessed_at ON completions (accessed_at)")
+        self.conn.commit()
+
+    def get(self, request):
+        """
+        Returns the cached response text for a request, or None.
+        """
+        key = request_cache_key(request)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT response, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.max_age and now - row[1] > self.max_age:
+                self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+            self._count(row is not None)
+            if row is None:
+                return None
+            self.conn.execute("UPDATE completions SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return row[0]
+
+    def _count(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def record_lookup(self, hit):
+        """
+        Counts a lookup served by another store (e.g. thumbnail vision results) in the hit/miss statistics.
+        """
+        with self._lock:
+            self._count(hit)
+
+    def put(self, request, response):
+        """
+        Stores the response text for a request and applies eviction.
+        """
+        key = request_cache_key(request)
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, created_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, request.get('model'), response, now, now, len(response.encode('utf-8')))
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        if self.max_age:
+            self.conn.execute("DELETE FROM completions WHERE created_at < ?", (now - self.max_age,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM completions ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        """
+        Returns hit/miss counters for this process and the current cache size.
+        """
+        with self._lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+            'entries': entries,
+            'size_bytes': size
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+class LazyOpenAI:
+    """
+    OpenAI client that is only created, and the openai package only imported,
+    on first use. Attribute access is forwarded to the real client.
+    """
+
+    def __init__(self, async_client=False, **kwargs):
+        self._async_client = async_client
+        self._kwargs = kwargs
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI, AsyncOpenAI
+                client_class = AsyncOpenAI if self._async_client else OpenAI
+                self._client = client_class(**self._kwargs)
+            return self._client
+
+    def __getattr__(self, name):
+        return getattr(self._get_client(), name)
+
+
+def cached_completion(llm_client, request, cache):
+    """
+    Returns the completion text for a request, calling the API only on a cache miss.
+    """
+    cached = cache.get(request) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    response = llm_client.chat.completions.create(**request)
+    text = response.choices[0].message.content
+    if cache is not None and text is not None:
+        cache.put(request, text)
+    return text
+
+
+async def cached_completion_async(async_client, request, cache, create=None):
+    """
+    Async version of cached_completion.
+
+    create optionally replaces async_client.chat.completions.create, e.g. to
+    send the request within a concurrency or token budget.
+    """
+    cached = cache.get(request) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    response = await (create or async_client.chat.completions.create)(**request)
+    text = response.choices[0].message.content
+    if cache is not None and text is not None:
+        cache.put(request, text)
+    return text
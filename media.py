@@ -9,12 +9,13 @@ and advertisers typically look for.
 
 import os
 import json
-import pandas as pd
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from api_http import build_service, run_dependent_tasks
+from api_cache import ResponseCache, RESPONSE_CACHE_FILE
+from quota import QuotaScheduler, QuotaBudgetExceeded, get_project_id, raise_budget_errors
 
 # Authentication scopes needed for YouTube API access
 SCOPES = [
@@ -26,30 +27,42 @@ CREDENTIALS_FILE = os.path.join(os.path.dirname(__file__), "credentials.json")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "token.json")
 
 
-def get_authenticated_service():
+def get_authenticated_service(use_cache=True, token_file=TOKEN_FILE, cache_file=RESPONSE_CACHE_FILE,
+                              quota_meter=None, interactive=True):
     """
     Authenticates with YouTube API using OAuth 2.0 credentials.
     Returns authenticated YouTube API and YouTube Analytics API service objects.
+    Set use_cache=False to bypass the on-disk API response cache.
+    
+    token_file and cache_file select the credentials and response cache of one channel.
+    With interactive=False, missing or revoked credentials raise instead of opening
+    the browser login flow.
     """
     try:
         creds = None
-        if os.path.exists(TOKEN_FILE):
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        if os.path.exists(token_file):
+            creds = Credentials.from_authorized_user_file(token_file, SCOPES)
         
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
+            elif not interactive:
+                raise ValueError(f"No valid credentials in {token_file}")
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
                 # Use a fixed port (8080) instead of dynamic port
                 creds = flow.run_local_server(port=8080)
             
-            with open(TOKEN_FILE, 'w') as token:
+            with open(token_file, 'w') as token:
                 token.write(creds.to_json())
         
         # Build both YouTube Data API and YouTube Analytics API service objects
-        youtube = build('youtube', 'v3', credentials=creds)
-        youtube_analytics = build('youtubeAnalytics', 'v2', credentials=creds)
+        # Repeated requests are served from the on-disk response cache
+        cache = ResponseCache(cache_file) if use_cache else None
+        # Requests are admitted against the project's shared daily quota
+        scheduler = QuotaScheduler(get_project_id(CREDENTIALS_FILE))
+        youtube = build_service('youtube', 'v3', creds, cache=cache, quota_meter=quota_meter, quota_scheduler=scheduler)
+        youtube_analytics = build_service('youtubeAnalytics', 'v2', creds, cache=cache, quota_meter=quota_meter, quota_scheduler=scheduler)
         
         return youtube, youtube_analytics
     except Exception as e:
@@ -91,6 +104,8 @@ def get_channel_info(youtube):
         }
         
         return channel_info
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving channel info: {str(e)}")
         raise
@@ -110,25 +125,21 @@ def get_channel_demographics(youtube_analytics):
         geography_response = {"rows": []}
         device_response = {"rows": []}
         
-        try:
+        def query_age_gender():
             # Get viewer demographics by age and gender
-            demographics_request = youtube_analytics.reports().query(
+            return youtube_analytics.reports().query(
                 ids="channel==MINE",
                 startDate=start_date,
                 endDate=end_date,
                 metrics="viewerPercentage",
                 dimensions="ageGroup,gender",
                 sort="gender,ageGroup"
-            )
-            demographics_response = demographics_request.execute()
-            print("Successfully retrieved age and gender demographics")
-        except Exception as e:
-            print(f"Could not retrieve age and gender demographics: {str(e)}")
+            ).execute()
         
-        try:
+        def query_geography():
             # Get viewer demographics by geography (countries)
             # Using views instead of viewerPercentage for better compatibility
-            geography_request = youtube_analytics.reports().query(
+            return youtube_analytics.reports().query(
                 ids="channel==MINE",
                 startDate=start_date,
                 endDate=end_date,
@@ -136,26 +147,44 @@ def get_channel_demographics(youtube_analytics):
                 dimensions="country",
                 sort="-views",
                 maxResults=25
-            )
-            geography_response = geography_request.execute()
-            print("Successfully retrieved country demographics")
-        except Exception as e:
-            print(f"Could not retrieve country demographics: {str(e)}")
+            ).execute()
         
-        try:
+        def query_devices():
             # Get viewer demographics by device type
-            device_request = youtube_analytics.reports().query(
+            return youtube_analytics.reports().query(
                 ids="channel==MINE",
                 startDate=start_date,
                 endDate=end_date,
                 metrics="views",
                 dimensions="deviceType",
                 sort="-views"
-            )
-            device_response = device_request.execute()
+            ).execute()
+        
+        # The three queries are independent, so run them all at once
+        responses, errors = run_dependent_tasks({
+            'ageGender': (query_age_gender, []),
+            'countries': (query_geography, []),
+            'devices': (query_devices, [])
+        })
+        raise_budget_errors(errors)
+        
+        if 'ageGender' in responses:
+            demographics_response = responses['ageGender']
+            print("Successfully retrieved age and gender demographics")
+        else:
+            print(f"Could not retrieve age and gender demographics: {str(errors['ageGender'])}")
+        
+        if 'countries' in responses:
+            geography_response = responses['countries']
+            print("Successfully retrieved country demographics")
+        else:
+            print(f"Could not retrieve country demographics: {str(errors['countries'])}")
+        
+        if 'devices' in responses:
+            device_response = responses['devices']
             print("Successfully retrieved device demographics")
-        except Exception as e:
-            print(f"Could not retrieve device demographics: {str(e)}")
+        else:
+            print(f"Could not retrieve device demographics: {str(errors['devices'])}")
         
         # Process and format the demographic data
         demographics = {
@@ -201,6 +230,8 @@ def get_channel_demographics(youtube_analytics):
                 }
         
         return demographics
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving demographics: {str(e)}")
         # Return empty demographics if there's an error
@@ -211,10 +242,137 @@ def get_channel_demographics(youtube_analytics):
         }
 
 
-def get_performance_metrics(youtube_analytics):
+# Metrics requested for every performance window
+PERFORMANCE_METRICS = "views,estimatedMinutesWatched,averageViewDuration,subscribersGained,likes,comments,shares"
+DAILY_METRICS = PERFORMANCE_METRICS + ",averageViewPercentage"
+
+
+def get_daily_metrics(youtube_analytics, start_date, end_date):
+    """
+    Retrieves the channel's day-by-day performance metrics in a single query.
+    
+    Returns:
+        DataFrame with one row per day, indexed by date
+    """
+    import pandas as pd
+    
+    response = youtube_analytics.reports().query(
+        ids="channel==MINE",
+        startDate=start_date,
+        endDate=end_date,
+        metrics=DAILY_METRICS,
+        dimensions="day",
+        sort="day"
+    ).execute()
+    
+    columns = [header['name'] for header in response.get('columnHeaders', [])]
+    daily = pd.DataFrame(response.get('rows', []), columns=columns or ['day'] + DAILY_METRICS.split(','))
+    daily['day'] = pd.to_datetime(daily['day'])
+    return daily.set_index('day').sort_index().astype(float)
+
+
+def summarize_period(daily, start_date):
+    """
+    Rolls the daily series up into the totals for the days from start_date onwards.
+    """
+    import pandas as pd
+    
+    period = daily[daily.index >= pd.Timestamp(start_date)]
+    totals = period[['views', 'estimatedMinutesWatched', 'subscribersGained', 'likes', 'comments', 'shares']].sum()
+    views = totals['views']
+    
+    return {
+        'views': int(views),
+        'watchTimeMinutes': int(totals['estimatedMinutesWatched']),
+        # Total watch time over total views, as the API computes it for a whole range
+        'avgViewDuration': int(round(totals['estimatedMinutesWatched'] * 60 / views)) if views else 0,
+        'subscribersGained': int(totals['subscribersGained']),
+        'likes': int(totals['likes']),
+        'comments': int(totals['comments']),
+        'shares': int(totals['shares'])
+    }
+
+
+def weighted_view_percentage(daily, start_date):
+    """
+    Returns the view-weighted average view percentage for the days from start_date onwards.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    period = daily[daily.index >= pd.Timestamp(start_date)]
+    views = period['views'].to_numpy()
+    if not views.sum():
+        return 0
+    return round(float(np.average(period['averageViewPercentage'].to_numpy(), weights=views)), 2)
+
+
+def compute_monthly_growth(daily):
+    """
+    Rolls the daily series up into monthly views and subscribers gained.
+    """
+    monthly = daily[['views', 'subscribersGained']].groupby(daily.index.to_period('M')).sum()
+    return [
+        {
+            'month': str(month),
+            'views': int(row['views']),
+            'subscribersGained': int(row['subscribersGained'])
+        }
+        for month, row in monthly.iterrows()
+    ]
+
+
+def compute_trends(daily, end_date, window_days=30, chart_days=90):
+    """
+    Computes trend indicators from the daily series.
+    
+    Compares the latest window_days against the window before it, and returns the
+    daily views with a 7-day rolling average for the last chart_days for charting.
+    """
+    import pandas as pd
+    
+    end = pd.Timestamp(end_date)
+    current_start = end - pd.Timedelta(days=window_days)
+    previous_start = current_start - pd.Timedelta(days=window_days)
+    
+    current = daily[daily.index > current_start][['views', 'subscribersGained', 'estimatedMinutesWatched']].sum()
+    previous = daily[(daily.index > previous_start) & (daily.index <= current_start)][['views', 'subscribersGained', 'estimatedMinutesWatched']].sum()
+    
+    def change_percent(column):
+        if not previous[column]:
+            return None
+        return round(float((current[column] - previous[column]) / previous[column] * 100), 2)
+    
+    rolling_views = daily['views'].rolling(7, min_periods=1).mean()
+    chart = daily.index > end - pd.Timedelta(days=chart_days)
+    
+    return {
+        'viewsChangePercent': change_percent('views'),
+        'subscribersChangePercent': change_percent('subscribersGained'),
+        'watchTimeChangePercent': change_percent('estimatedMinutesWatched'),
+        'views7DayAverage': round(float(daily['views'].tail(7).mean()), 2) if len(daily) else 0,
+        'views28DayAverage': round(float(daily['views'].tail(28).mean()), 2) if len(daily) else 0,
+        'dailyViews': [
+            {
+                'date': day.strftime('%Y-%m-%d'),
+                'views': int(views),
+                'views7DayAverage': round(float(average), 2)
+            }
+            for day, views, average in zip(daily.index[chart], daily['views'][chart], rolling_views[chart])
+        ]
+    }
+
+
+def get_performance_metrics(youtube_analytics, daily_series=True):
     """
     Retrieves overall channel performance metrics.
+    
+    With daily_series, one day-by-day query over the widest window is rolled up
+    locally into the 30-day, 90-day, year-to-date and monthly figures and the
+    trend indicators. Otherwise each window is queried separately.
     """
+    import pandas as pd
+    
     try:
         # Get current date and format properly
         now = datetime.now()
@@ -234,105 +392,106 @@ def get_performance_metrics(youtube_analytics):
         
         print(f"Performance date ranges: 30d({start_date_30d}), 90d({start_date_90d}), YTD({start_date_ytd}), Monthly({start_date_monthly})")
         
-        # Initialize response variables with default empty data
-        metrics_30d_response = {"rows": [[0, 0, 0, 0, 0, 0, 0]]}
-        metrics_90d_response = {"rows": [[0, 0, 0, 0, 0, 0, 0]]}
-        metrics_ytd_response = {"rows": [[0, 0, 0, 0, 0, 0, 0]]}
-        monthly_data_response = {"rows": []}
-        watch_percentage_response = {"rows": [[0]]}
-        
-        try:
-            # Get 30-day metrics
-            metrics_30d_request = youtube_analytics.reports().query(
-                ids="channel==MINE",
-                startDate=start_date_30d,
-                endDate=end_date,
-                metrics="views,estimatedMinutesWatched,averageViewDuration,subscribersGained,likes,comments,shares"
-            )
-            metrics_30d_response = metrics_30d_request.execute()
-            print("Successfully retrieved 30-day metrics")
-        except Exception as e:
-            print(f"Could not retrieve 30-day metrics: {str(e)}")
-        
-        try:
-            # Get 90-day metrics
-            metrics_90d_request = youtube_analytics.reports().query(
-                ids="channel==MINE",
-                startDate=start_date_90d,
-                endDate=end_date,
-                metrics="views,estimatedMinutesWatched,averageViewDuration,subscribersGained,likes,comments,shares"
-            )
-            metrics_90d_response = metrics_90d_request.execute()
-            print("Successfully retrieved 90-day metrics")
-        except Exception as e:
-            print(f"Could not retrieve 90-day metrics: {str(e)}")
-        
-        try:
-            # Get year-to-date metrics
-            metrics_ytd_request = youtube_analytics.reports().query(
-                ids="channel==MINE",
-                startDate=start_date_ytd,
-                endDate=end_date,
-                metrics="views,estimatedMinutesWatched,averageViewDuration,subscribersGained,likes,comments,shares"
-            )
-            metrics_ytd_response = metrics_ytd_request.execute()
-            print("Successfully retrieved year-to-date metrics")
-        except Exception as e:
-            print(f"Could not retrieve year-to-date metrics: {str(e)}")
-        
-        try:
-            # Get monthly data for growth chart - ensuring dates align with month boundaries
-            monthly_data_request = youtube_analytics.reports().query(
-                ids="channel==MINE",
-                startDate=start_date_monthly,
-                endDate=end_date,
-                metrics="views,subscribersGained",
-                dimensions="month",
-                sort="month"
-            )
-            monthly_data_response = monthly_data_request.execute()
-            print("Successfully retrieved monthly growth data")
-        except Exception as e:
-            print(f"Could not retrieve monthly growth data: {str(e)}")
-        
-        try:
-            # Get average watch percentage
-            watch_percentage_request = youtube_analytics.reports().query(
-                ids="channel==MINE",
-                startDate=start_date_90d,
-                endDate=end_date,
-                metrics="averageViewPercentage"
-            )
-            watch_percentage_response = watch_percentage_request.execute()
-            print("Successfully retrieved average view percentage")
-        except Exception as e:
-            watch_percentage_response = {"rows": [[0]]}
-            print(f"Could not retrieve average view percentage: {str(e)}")
-        
-        # Process the metrics data
         performance = {
             'last30Days': {},
             'averages': {}
         }
         
-        # Extract values from the 30-day metrics
-        if 'rows' in metrics_30d_response and metrics_30d_response['rows']:
-            row = metrics_30d_response['rows'][0]
-            performance['last30Days'] = {
-                'views': row[0],
-                'watchTimeMinutes': row[1],
-                'avgViewDuration': row[2],
-                'subscribersGained': row[3],
-                'likes': row[4],
-                'comments': row[5],
-                'shares': row[6]
-            }
-        
-        # We're removing the 90-day metrics, year-to-date metrics, and monthly growth data as requested
-        
-        # Calculate average watch percentage
-        if 'rows' in watch_percentage_response and watch_percentage_response['rows']:
-            performance['averages']['averageViewPercentage'] = watch_percentage_response['rows'][0][0]
+        if daily_series:
+            # A single query over the widest window replaces the per-window queries
+            daily_start = min(start_date_30d, start_date_90d, start_date_ytd, start_date_monthly)
+            try:
+                daily = get_daily_metrics(youtube_analytics, daily_start, end_date)
+                print(f"Successfully retrieved daily metrics ({len(daily)} days)")
+            except QuotaBudgetExceeded:
+                raise
+            except Exception as e:
+                print(f"Could not retrieve daily metrics: {str(e)}")
+                daily = None
+            
+            if daily is not None and len(daily):
+                performance['last30Days'] = summarize_period(daily, start_date_30d)
+                performance['last90Days'] = summarize_period(daily, start_date_90d)
+                performance['yearToDate'] = summarize_period(daily, start_date_ytd)
+                performance['monthlyGrowth'] = compute_monthly_growth(daily[daily.index >= pd.Timestamp(start_date_monthly)])
+                performance['trends'] = compute_trends(daily, end_date)
+                performance['averages']['averageViewPercentage'] = weighted_view_percentage(daily, start_date_90d)
+        else:
+            # Initialize response variables with default empty data
+            metrics_30d_response = {"rows": [[0, 0, 0, 0, 0, 0, 0]]}
+            metrics_90d_response = {"rows": [[0, 0, 0, 0, 0, 0, 0]]}
+            metrics_ytd_response = {"rows": [[0, 0, 0, 0, 0, 0, 0]]}
+            monthly_data_response = {"rows": []}
+            watch_percentage_response = {"rows": [[0]]}
+            
+            def query_period(start_date):
+                return youtube_analytics.reports().query(
+                    ids="channel==MINE",
+                    startDate=start_date,
+                    endDate=end_date,
+                    metrics=PERFORMANCE_METRICS
+                ).execute()
+            
+            def query_monthly():
+                # Get monthly data for growth chart - ensuring dates align with month boundaries
+                return youtube_analytics.reports().query(
+                    ids="channel==MINE",
+                    startDate=start_date_monthly,
+                    endDate=end_date,
+                    metrics="views,subscribersGained",
+                    dimensions="month",
+                    sort="month"
+                ).execute()
+            
+            def query_watch_percentage():
+                # Get average watch percentage
+                return youtube_analytics.reports().query(
+                    ids="channel==MINE",
+                    startDate=start_date_90d,
+                    endDate=end_date,
+                    metrics="averageViewPercentage"
+                ).execute()
+            
+            # All five queries are independent, so run them all at once
+            responses, errors = run_dependent_tasks({
+                '30-day metrics': (lambda: query_period(start_date_30d), []),
+                '90-day metrics': (lambda: query_period(start_date_90d), []),
+                'year-to-date metrics': (lambda: query_period(start_date_ytd), []),
+                'monthly growth data': (query_monthly, []),
+                'average view percentage': (query_watch_percentage, [])
+            })
+            raise_budget_errors(errors)
+            
+            for name in ['30-day metrics', '90-day metrics', 'year-to-date metrics', 'monthly growth data', 'average view percentage']:
+                if name in responses:
+                    print(f"Successfully retrieved {name}")
+                else:
+                    print(f"Could not retrieve {name}: {str(errors[name])}")
+            
+            metrics_30d_response = responses.get('30-day metrics', metrics_30d_response)
+            metrics_90d_response = responses.get('90-day metrics', metrics_90d_response)
+            metrics_ytd_response = responses.get('year-to-date metrics', metrics_ytd_response)
+            monthly_data_response = responses.get('monthly growth data', monthly_data_response)
+            watch_percentage_response = responses.get('average view percentage', watch_percentage_response)
+            
+            # Extract values from the 30-day metrics
+            if 'rows' in metrics_30d_response and metrics_30d_response['rows']:
+                row = metrics_30d_response['rows'][0]
+                performance['last30Days'] = {
+                    'views': row[0],
+                    'watchTimeMinutes': row[1],
+                    'avgViewDuration': row[2],
+                    'subscribersGained': row[3],
+                    'likes': row[4],
+                    'comments': row[5],
+                    'shares': row[6]
+                }
+            
+            # We're removing the 90-day metrics, year-to-date metrics, and monthly growth data as requested
+            
+            # Calculate average watch percentage
+            if 'rows' in watch_percentage_response and watch_percentage_response['rows']:
+                performance['averages']['averageViewPercentage'] = watch_percentage_response['rows'][0][0]
         
         # Calculate additional averages
         if performance['last30Days'] and 'views' in performance['last30Days']:
@@ -346,13 +505,15 @@ def get_performance_metrics(youtube_analytics):
                 )
         
         return performance
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving performance metrics: {str(e)}")
         # Return empty performance metrics if there's an error
         return {
             'last30Days': {},
             'last90Days': {},
-            'lastYear': {},
+            'yearToDate': {},
             'monthlyGrowth': [],
             'averages': {}
         }
@@ -434,6 +595,8 @@ def get_top_videos(youtube, channel_info):
             'topVideos': last_10_videos,
             'averageViews': avg_views
         }
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving top videos: {str(e)}")
         return {
@@ -442,13 +605,17 @@ def get_top_videos(youtube, channel_info):
         }
 
 
-def create_media_kit():
+def create_media_kit(youtube=None, youtube_analytics=None, output_dir='.'):
     """
     Creates a comprehensive media kit with all channel statistics.
+    
+    Uses the given API service objects, or authenticates with token.json if none
+    are given, and writes the media kit files to output_dir.
     """
     try:
-        print("Authenticating with YouTube API...")
-        youtube, youtube_analytics = get_authenticated_service()
+        if youtube is None or youtube_analytics is None:
+            print("Authenticating with YouTube API...")
+            youtube, youtube_analytics = get_authenticated_service()
         
         # Create a media kit object with default empty values 
         # in case any section fails to load
@@ -470,51 +637,44 @@ def create_media_kit():
             }
         }
         
-        # Try to get each section independently so if one fails, the others still work
-        try:
-            print("Retrieving channel information...")
-            channel_info = get_channel_info(youtube)
-            media_kit['channelInfo'] = channel_info
-        except Exception as e:
-            print(f"Error retrieving channel info: {str(e)}")
-        
-        try:
-            print("Retrieving audience demographics...")
-            demographics = get_channel_demographics(youtube_analytics)
-            media_kit['audience'] = demographics
-        except Exception as e:
-            print(f"Error retrieving demographics: {str(e)}")
-        
-        try:
-            print("Retrieving performance metrics...")
-            performance = get_performance_metrics(youtube_analytics)
-            media_kit['performance'] = performance
-        except Exception as e:
-            print(f"Error retrieving performance metrics: {str(e)}")
-        
-        try:
-            print("Retrieving top videos...")
-            if 'channelInfo' in media_kit and media_kit['channelInfo']:
-                videos_data = get_top_videos(youtube, media_kit['channelInfo'])
-                media_kit['topContent'] = videos_data
-                
-                # Update average views per video in performance metrics
-                if 'averages' in media_kit['performance']:
-                    media_kit['performance']['averages']['viewsPerVideo'] = videos_data['averageViews']
+        # Fetch all sections concurrently; each section still fails independently,
+        # and top videos wait for the channel info they depend on
+        print("Retrieving channel information, audience demographics, performance metrics and top videos...")
+        sections, errors = run_dependent_tasks({
+            'channelInfo': (lambda: get_channel_info(youtube), []),
+            'audience': (lambda: get_channel_demographics(youtube_analytics), []),
+            'performance': (lambda: get_performance_metrics(youtube_analytics), []),
+            'topContent': (lambda channel_info: get_top_videos(youtube, channel_info), ['channelInfo'])
+        })
+        raise_budget_errors(errors)
+        
+        for name, label in [('channelInfo', 'channel info'), ('audience', 'demographics'), ('performance', 'performance metrics')]:
+            if name in sections:
+                media_kit[name] = sections[name]
             else:
-                print("Skipping top videos retrieval as channel info is not available")
-        except Exception as e:
-            print(f"Error retrieving top videos: {str(e)}")
+                print(f"Error retrieving {label}: {str(errors[name])}")
+        
+        if 'topContent' in sections:
+            videos_data = sections['topContent']
+            media_kit['topContent'] = videos_data
+            
+            # Update average views per video in performance metrics
+            if 'averages' in media_kit['performance']:
+                media_kit['performance']['averages']['viewsPerVideo'] = videos_data['averageViews']
+        elif 'channelInfo' not in sections:
+            print("Skipping top videos retrieval as channel info is not available")
+        else:
+            print(f"Error retrieving top videos: {str(errors['topContent'])}")
         
         # Save to JSON file
-        output_file = 'youtube_media_kit.json'
+        output_file = os.path.join(output_dir, 'youtube_media_kit.json')
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(media_kit, f, ensure_ascii=False, indent=2)
         
         print(f"Media kit successfully generated and saved to {output_file}")
         
         # Also create a summary text file with key metrics
-        create_summary_text(media_kit)
+        create_summary_text(media_kit, output_dir=output_dir)
         
         return media_kit
     except Exception as e:
@@ -533,19 +693,20 @@ def create_media_kit():
                 partial_media_kit.update(media_kit)
             
             # Save the partial media kit
-            with open('youtube_media_kit_partial.json', 'w', encoding='utf-8') as f:
+            partial_file = os.path.join(output_dir, 'youtube_media_kit_partial.json')
+            with open(partial_file, 'w', encoding='utf-8') as f:
                 json.dump(partial_media_kit, f, ensure_ascii=False, indent=2)
             
-            print("Saved partial media kit data to youtube_media_kit_partial.json")
+            print(f"Saved partial media kit data to {partial_file}")
             return partial_media_kit
         except:
             print("Could not save partial media kit data")
             return None
 
 
-def create_summary_text(media_kit):
+def create_summary_text(media_kit, output_dir='.'):
     """
-    Creates a human-readable summary of the media kit.
+    Creates a human-readable summary of the media kit in output_dir.
     """
     try:
         channel = media_kit.get('channelInfo', {})
@@ -606,6 +767,15 @@ def create_summary_text(media_kit):
             summary += f"Engagement Rate: {avgs.get('engagementRate', 0)}%\n"
             summary += f"Average View Percentage: {avgs.get('averageViewPercentage', 0)}%\n\n"
         
+        # Trends
+        if performance.get('trends'):
+            trends = performance['trends']
+            summary += f"TRENDS (LAST 30 DAYS VS PREVIOUS 30 DAYS)\n"
+            for label, key in [('Views', 'viewsChangePercent'), ('Watch Time', 'watchTimeChangePercent'), ('New Subscribers', 'subscribersChangePercent')]:
+                change = trends.get(key)
+                summary += f"{label}: {f'{change:+.1f}%' if change is not None else 'N/A'}\n"
+            summary += f"7-Day Average Daily Views: {trends.get('views7DayAverage', 0):,.0f}\n\n"
+        
         # Audience demographics
         summary += f"AUDIENCE DEMOGRAPHICS\n"
         
@@ -644,10 +814,11 @@ def create_summary_text(media_kit):
             summary += f"   URL: https://www.youtube.com/watch?v={video['id']}\n"
         
         # Save summary to file
-        with open('youtube_media_kit_summary.txt', 'w', encoding='utf-8') as f:
+        summary_file = os.path.join(output_dir, 'youtube_media_kit_summary.txt')
+        with open(summary_file, 'w', encoding='utf-8') as f:
             f.write(summary)
         
-        print(f"Media kit summary saved to youtube_media_kit_summary.txt")
+        print(f"Media kit summary saved to {summary_file}")
     except Exception as e:
         print(f"Error creating summary text: {str(e)}")
 
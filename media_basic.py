@@ -9,12 +9,13 @@ and advertisers typically look for.
 
 import os
 import json
-import pandas as pd
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from api_http import build_service
+from api_cache import ResponseCache
+from quota import QuotaScheduler, QuotaBudgetExceeded, get_project_id
 
 # Authentication scopes needed for YouTube API access
 SCOPES = [
@@ -26,10 +27,11 @@ CREDENTIALS_FILE = os.path.join(os.path.dirname(__file__), "credentials.json")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "token.json")
 
 
-def get_authenticated_service():
+def get_authenticated_service(use_cache=True):
     """
     Authenticates with YouTube API using OAuth 2.0 credentials.
     Returns authenticated YouTube API and YouTube Analytics API service objects.
+    Set use_cache=False to bypass the on-disk API response cache.
     """
     try:
         creds = None
@@ -48,8 +50,12 @@ def get_authenticated_service():
                 token.write(creds.to_json())
         
         # Build both YouTube Data API and YouTube Analytics API service objects
-        youtube = build('youtube', 'v3', credentials=creds)
-        youtube_analytics = build('youtubeAnalytics', 'v2', credentials=creds)
+        # Repeated requests are served from the on-disk response cache
+        cache = ResponseCache() if use_cache else None
+        # Requests are admitted against the project's shared daily quota
+        scheduler = QuotaScheduler(get_project_id(CREDENTIALS_FILE))
+        youtube = build_service('youtube', 'v3', creds, cache=cache, quota_scheduler=scheduler)
+        youtube_analytics = build_service('youtubeAnalytics', 'v2', creds, cache=cache, quota_scheduler=scheduler)
         
         return youtube, youtube_analytics
     except Exception as e:
@@ -95,6 +101,8 @@ def get_channel_info(youtube):
         }
         
         return channel_info
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving channel info: {str(e)}")
         raise
@@ -126,6 +134,8 @@ def get_channel_demographics(youtube_analytics):
             )
             demographics_response = demographics_request.execute()
             print("Successfully retrieved age and gender demographics")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve age and gender demographics: {str(e)}")
         
@@ -143,6 +153,8 @@ def get_channel_demographics(youtube_analytics):
             )
             geography_response = geography_request.execute()
             print("Successfully retrieved country demographics")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve country demographics: {str(e)}")
         
@@ -158,6 +170,8 @@ def get_channel_demographics(youtube_analytics):
             )
             device_response = device_request.execute()
             print("Successfully retrieved device demographics")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve device demographics: {str(e)}")
         
@@ -205,6 +219,8 @@ def get_channel_demographics(youtube_analytics):
                 }
         
         return demographics
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving demographics: {str(e)}")
         # Return empty demographics if there's an error
@@ -255,6 +271,8 @@ def get_performance_metrics(youtube_analytics):
             )
             metrics_30d_response = metrics_30d_request.execute()
             print("Successfully retrieved 30-day metrics")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve 30-day metrics: {str(e)}")
         
@@ -268,6 +286,8 @@ def get_performance_metrics(youtube_analytics):
             )
             metrics_90d_response = metrics_90d_request.execute()
             print("Successfully retrieved 90-day metrics")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve 90-day metrics: {str(e)}")
         
@@ -281,6 +301,8 @@ def get_performance_metrics(youtube_analytics):
             )
             metrics_ytd_response = metrics_ytd_request.execute()
             print("Successfully retrieved year-to-date metrics")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve year-to-date metrics: {str(e)}")
         
@@ -296,6 +318,8 @@ def get_performance_metrics(youtube_analytics):
             )
             monthly_data_response = monthly_data_request.execute()
             print("Successfully retrieved monthly growth data")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Could not retrieve monthly growth data: {str(e)}")
         
@@ -309,6 +333,8 @@ def get_performance_metrics(youtube_analytics):
             )
             watch_percentage_response = watch_percentage_request.execute()
             print("Successfully retrieved average view percentage")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             watch_percentage_response = {"rows": [[0]]}
             print(f"Could not retrieve average view percentage: {str(e)}")
@@ -395,13 +421,15 @@ def get_performance_metrics(youtube_analytics):
                 )
         
         return performance
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving performance metrics: {str(e)}")
         # Return empty performance metrics if there's an error
         return {
             'last30Days': {},
             'last90Days': {},
-            'lastYear': {},
+            'yearToDate': {},
             'monthlyGrowth': [],
             'averages': {}
         }
@@ -479,6 +507,8 @@ def get_top_videos(youtube, channel_info):
             'totalVideos': len(videos),
             'averageViews': avg_views
         }
+    except QuotaBudgetExceeded:
+        raise
     except Exception as e:
         print(f"Error retrieving top videos: {str(e)}")
         return {
@@ -525,6 +555,8 @@ def create_media_kit():
             print("Retrieving channel information...")
             channel_info = get_channel_info(youtube)
             media_kit['channelInfo'] = channel_info
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error retrieving channel info: {str(e)}")
         
@@ -532,6 +564,8 @@ def create_media_kit():
             print("Retrieving audience demographics...")
             demographics = get_channel_demographics(youtube_analytics)
             media_kit['audience'] = demographics
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error retrieving demographics: {str(e)}")
         
@@ -539,6 +573,8 @@ def create_media_kit():
             print("Retrieving performance metrics...")
             performance = get_performance_metrics(youtube_analytics)
             media_kit['performance'] = performance
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error retrieving performance metrics: {str(e)}")
         
@@ -553,6 +589,8 @@ def create_media_kit():
                     media_kit['performance']['averages']['viewsPerVideo'] = videos_data['averageViews']
             else:
                 print("Skipping top videos retrieval as channel info is not available")
+        except QuotaBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error retrieving top videos: {str(e)}")
         
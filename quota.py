@@ -0,0 +1,344 @@
+"""
+Quota accounting and scheduling for YouTube Data and Analytics API requests.
+
+Every request that actually reaches the network is priced with the YouTube
+Data API cost table (search=100, list=1, writes=50, ...) and recorded on a
+QuotaMeter. QuotaHttp sits below CachingHttp, so responses served from the
+on-disk cache are never charged.
+
+A QuotaScheduler additionally keeps a token bucket per Google Cloud project,
+persisted in SQLite so that separate runs and processes share one budget.
+Each request has a priority: critical calls (channel and upload listings) may
+spend the whole budget, normal calls leave a small reserve, and low-value calls
+(comments, search) are deferred briefly and then skipped with
+QuotaBudgetExceeded once the budget runs low. A quotaExceeded answer from the
+API empties the bucket, so the rest of the run fails fast instead of
+collecting a long series of errors.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from api_cache import get_endpoint_name
+
+QUOTA_STATE_FILE = 'api_quota_state.db'
+
+# YouTube Data API v3 cost of a read (list) request per endpoint, in quota units
+DATA_API_READ_COSTS = {
+    'search': 100,
+}
+DEFAULT_READ_COST = 1
+
+# Cost of write requests (insert, update, delete, rate, ...) per endpoint
+DATA_API_WRITE_COSTS = {
+    'videos': 50,
+    'thumbnails': 50,
+    'captions': 400,
+}
+DEFAULT_WRITE_COST = 50
+
+# Uploads are priced separately from other writes
+VIDEO_UPLOAD_COST = 1600
+
+# Each YouTube Analytics query counts as one request against its own quota
+ANALYTICS_QUERY_COST = 1
+
+
+# Daily quota per API in units; APIs without a limit are only metered
+DEFAULT_DAILY_LIMITS = {
+    'youtube': 10000,
+}
+
+# Request priorities
+PRIORITY_CRITICAL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Default priority per endpoint when the caller does not set one
+ENDPOINT_PRIORITIES = {
+    'channels': PRIORITY_CRITICAL,
+    'playlistItems': PRIORITY_CRITICAL,
+    'videos': PRIORITY_CRITICAL,
+    'commentThreads': PRIORITY_LOW,
+    'comments': PRIORITY_LOW,
+    'search': PRIORITY_LOW,
+}
+
+# Share of the daily limit that must remain after a call of each priority
+PRIORITY_RESERVES = {
+    PRIORITY_CRITICAL: 0.0,
+    PRIORITY_NORMAL: 0.05,
+    PRIORITY_LOW: 0.25,
+}
+
+# How long a low-priority call may wait for the bucket to refill before it is skipped
+DEFAULT_MAX_DEFER_SECONDS = 30
+
+# Error reasons the API returns once a project's quota is used up
+QUOTA_EXCEEDED_REASONS = (b'quotaExceeded', b'dailyLimitExceeded')
+
+_priority = threading.local()
+
+
+class QuotaBudgetExceeded(Exception):
+    """
+    Raised instead of sending a request the remaining quota budget cannot cover.
+    """
+
+    def __init__(self, api, endpoint, message):
+        super().__init__(message)
+        self.api = api
+        self.endpoint = endpoint
+
+
+@contextmanager
+def request_priority(priority):
+    """
+    Sets the priority of the API requests made by the current thread inside the block.
+    """
+    previous = getattr(_priority, 'value', None)
+    _priority.value = priority
+    try:
+        yield
+    finally:
+        _priority.value = previous
+
+
+def current_priority(endpoint):
+    """
+    Returns the priority of a request to endpoint made by the current thread.
+    """
+    priority = getattr(_priority, 'value', None)
+    if priority is None:
+        priority = ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_NORMAL)
+    return priority
+
+
+def raise_budget_errors(errors):
+    """
+    Re-raises the first QuotaBudgetExceeded found in a dictionary of task errors.
+    """
+    for error in errors.values():
+        if isinstance(error, QuotaBudgetExceeded):
+            raise error
+
+
+def get_project_id(credentials_file):
+    """
+    Returns the Google Cloud project ID of an OAuth client secrets file, or 'default'.
+    """
+    try:
+        with open(credentials_file, 'r', encoding='utf-8') as f:
+            client_config = json.load(f)
+    except (OSError, ValueError):
+        return 'default'
+    for client_type in ('installed', 'web'):
+        if client_type in client_config:
+            return client_config[client_type].get('project_id') or 'default'
+    return 'default'
+
+
+def get_api_name(uri):
+    """
+    Returns 'youtubeAnalytics' for YouTube Analytics API requests and 'youtube' otherwise.
+    """
+    return 'youtubeAnalytics' if 'youtubeanalytics' in uri.lower() else 'youtube'
+
+
+def request_cost(uri, method="GET"):
+    """
+    Returns the quota cost of a single API request.
+    """
+    if get_api_name(uri) == 'youtubeAnalytics':
+        return ANALYTICS_QUERY_COST
+
+    endpoint = get_endpoint_name(uri)
+    if method == "GET":
+        return DATA_API_READ_COSTS.get(endpoint, DEFAULT_READ_COST)
+    if '/upload/' in uri and endpoint == 'videos':
+        return VIDEO_UPLOAD_COST
+    return DATA_API_WRITE_COSTS.get(endpoint, DEFAULT_WRITE_COST)
+
+
+class QuotaMeter:
+    """
+    Thread-safe tally of the quota units and requests spent, per API and endpoint.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.units = defaultdict(int)
+        self.requests = defaultdict(int)
+
+    def record(self, api, endpoint, cost):
+        with self._lock:
+            self.units[api] += cost
+            self.requests[f"{api}.{endpoint}"] += 1
+
+    def summary(self):
+        """
+        Returns the units spent per API and the request count per endpoint.
+        """
+        with self._lock:
+            return {
+                'units': dict(self.units),
+                'requests': dict(sorted(self.requests.items()))
+            }
+
+
+class QuotaScheduler:
+    """
+    Persisted token bucket per project and API that admits requests by priority.
+
+    Each bucket holds up to the API's daily limit and refills continuously at
+    daily_limit units per day.
+    """
+
+    def __init__(self, project_id, path=QUOTA_STATE_FILE, daily_limits=None,
+                 max_defer_seconds=DEFAULT_MAX_DEFER_SECONDS):
+        self.project_id = project_id
+        self.path = path
+        self.daily_limits = dict(DEFAULT_DAILY_LIMITS if daily_limits is None else daily_limits)
+        self.max_defer_seconds = max_defer_seconds
+        self._lock = threading.Lock()
+        # Other processes may share the file, so wait for their transactions
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS quota_buckets (
+                project_id TEXT NOT NULL,
+                api TEXT NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (project_id, api)
+            )
+            """
+        )
+
+    def _refilled_tokens(self, api, now):
+        limit = self.daily_limits[api]
+        row = self.conn.execute(
+            "SELECT tokens, updated_at FROM quota_buckets WHERE project_id = ? AND api = ?",
+            (self.project_id, api)
+        ).fetchone()
+        if row is None:
+            return limit
+        return min(limit, row[0] + (now - row[1]) * limit / 86400)
+
+    def _save_tokens(self, api, tokens, now):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO quota_buckets (project_id, api, tokens, updated_at) VALUES (?, ?, ?, ?)",
+            (self.project_id, api, tokens, now)
+        )
+
+    def _try_acquire(self, api, cost, priority):
+        """
+        Takes cost tokens if the bucket keeps its reserve for this priority.
+
+        Returns:
+            0 on success, otherwise the number of seconds until the bucket could cover the call
+        """
+        limit = self.daily_limits[api]
+        reserve = PRIORITY_RESERVES.get(priority, 0.0) * limit
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                tokens = self._refilled_tokens(api, now)
+                if tokens - cost >= reserve:
+                    self._save_tokens(api, tokens - cost, now)
+                    self.conn.execute("COMMIT")
+                    return 0
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if cost + reserve > limit:
+            return float('inf')
+        return (cost + reserve - tokens) * 86400 / limit
+
+    def acquire(self, api, endpoint, cost, priority=PRIORITY_NORMAL):
+        """
+        Charges a request against the budget or raises QuotaBudgetExceeded.
+
+        Low-priority requests wait up to max_defer_seconds for the bucket to refill.
+        """
+        if api not in self.daily_limits:
+            return
+        wait = self._try_acquire(api, cost, priority)
+        if wait and priority == PRIORITY_LOW and wait <= self.max_defer_seconds:
+            time.sleep(wait)
+            wait = self._try_acquire(api, cost, priority)
+        if wait:
+            raise QuotaBudgetExceeded(
+                api, endpoint,
+                f"Skipping {api}.{endpoint} request: remaining quota is reserved for higher-priority calls"
+                if priority != PRIORITY_CRITICAL else
+                f"Daily {api} quota exhausted for project {self.project_id}"
+            )
+
+    def exhaust(self, api):
+        """
+        Empties the bucket after the API reported the quota as exceeded.
+        """
+        if api not in self.daily_limits:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._save_tokens(api, 0, time.time())
+            self.conn.execute("COMMIT")
+
+    def remaining(self, api):
+        """
+        Returns the units currently available for an API, or None if it is not limited.
+        """
+        if api not in self.daily_limits:
+            return None
+        with self._lock:
+            return int(self._refilled_tokens(api, time.time()))
+
+    def close(self):
+        self.conn.close()
+
+
+class QuotaHttp:
+    """
+    httplib2-compatible transport that admits requests through a QuotaScheduler
+    and charges every request sent to a QuotaMeter.
+    """
+
+    def __init__(self, http, meter=None, scheduler=None):
+        self.http = http
+        self.meter = meter
+        self.scheduler = scheduler
+
+    @property
+    def credentials(self):
+        return getattr(self.http, 'credentials', None)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        api = get_api_name(uri)
+        endpoint = get_endpoint_name(uri)
+        cost = request_cost(uri, method)
+
+        if self.scheduler is not None:
+            self.scheduler.acquire(api, endpoint, cost, current_priority(endpoint))
+        if self.meter is not None:
+            self.meter.record(api, endpoint, cost)
+
+        resp, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+
+        if resp.status == 403 and self.scheduler is not None:
+            data = content if isinstance(content, bytes) else str(content).encode('utf-8')
+            if any(reason in data for reason in QUOTA_EXCEEDED_REASONS):
+                self.scheduler.exhaust(api)
+                raise QuotaBudgetExceeded(api, endpoint, f"The {api} API reported the daily quota as exceeded")
+        return resp, content
+
+    def close(self):
+        if hasattr(self.http, 'close'):
+            self.http.close()
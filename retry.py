@@ -0,0 +1,221 @@
+"""
+Retry layer for transient YouTube API failures.
+
+RetryingHttp wraps the httplib2-compatible transport of a service object and
+retries requests that failed for a transient reason:
+
+- connection errors and timeouts
+- 5xx responses and 429 Too Many Requests
+- 403 responses whose reason is rateLimitExceeded / userRateLimitExceeded
+
+Retries use exponential backoff with full jitter and honor a Retry-After
+header. Permanent errors (400, 404, quotaExceeded, ...) are returned at once,
+so googleapiclient raises its usual HttpError.
+
+Each endpoint also has a circuit breaker: after a run of consecutive failures
+the endpoint is short-circuited with CircuitOpenError for a cooldown period
+instead of piling more requests onto a struggling backend.
+"""
+
+import random
+import socket
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httplib2
+
+from api_cache import get_endpoint_name
+from quota import QuotaBudgetExceeded
+
+# Default retry policy
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+# Longest Retry-After the client is willing to honor (seconds)
+MAX_RETRY_AFTER = 300
+
+# Circuit breaker defaults
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN_SECONDS = 30
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# 403 reasons that mean "slow down" rather than "not allowed"
+RETRYABLE_403_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded')
+
+RETRYABLE_EXCEPTIONS = (
+    ConnectionError,
+    TimeoutError,
+    socket.timeout,
+    httplib2.ServerNotFoundError,
+)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised without sending a request while an endpoint's circuit breaker is open.
+    """
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"Circuit open for {endpoint} after repeated failures, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def is_retryable_response(resp, content):
+    """
+    Returns True if an HTTP response reports a transient failure.
+    """
+    if resp.status in RETRYABLE_STATUSES:
+        return True
+    if resp.status == 403:
+        data = content if isinstance(content, bytes) else str(content).encode('utf-8')
+        return any(reason in data for reason in RETRYABLE_403_REASONS)
+    return False
+
+
+def get_retry_after(resp):
+    """
+    Returns the delay requested by a Retry-After header in seconds, or None.
+    """
+    value = resp.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+
+    The circuit opens after failure_threshold consecutive failures. Once the
+    cooldown has passed a single trial request is let through: success closes
+    the circuit again, failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, cooldown_seconds=DEFAULT_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._opened_at = {}
+        self._trial_running = set()
+
+    def before_request(self, endpoint):
+        """
+        Raises CircuitOpenError if requests to endpoint are currently short-circuited.
+
+        Returns:
+            True if the caller was let through as the half-open trial request
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(endpoint)
+            if opened_at is None:
+                return False
+            retry_in = opened_at + self.cooldown_seconds - time.monotonic()
+            if retry_in > 0 or endpoint in self._trial_running:
+                raise CircuitOpenError(endpoint, max(retry_in, 0))
+            self._trial_running.add(endpoint)
+            return True
+
+    def release_trial(self, endpoint):
+        """
+        Frees the trial slot of an endpoint whose trial request ended without a recorded outcome.
+        """
+        with self._lock:
+            self._trial_running.discard(endpoint)
+
+    def record_success(self, endpoint):
+        with self._lock:
+            self._failures.pop(endpoint, None)
+            self._opened_at.pop(endpoint, None)
+            self._trial_running.discard(endpoint)
+
+    def record_failure(self, endpoint):
+        with self._lock:
+            failures = self._failures.get(endpoint, 0) + 1
+            self._failures[endpoint] = failures
+            if endpoint in self._trial_running or failures >= self.failure_threshold:
+                self._opened_at[endpoint] = time.monotonic()
+            self._trial_running.discard(endpoint)
+
+
+class RetryingHttp:
+    """
+    httplib2-compatible transport that retries transient failures with backoff.
+    """
+
+    def __init__(self, http, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, breaker=None, sleep=time.sleep):
+        self.http = http
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.sleep = sleep
+
+    @property
+    def credentials(self):
+        return getattr(self.http, 'credentials', None)
+
+    def backoff_delay(self, attempt):
+        """
+        Returns a full-jitter delay for the given retry attempt (0-based).
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        endpoint = get_endpoint_name(uri)
+        attempt = 0
+
+        while True:
+            trial = self.breaker.before_request(endpoint)
+            retry_after = None
+            try:
+                resp, content = self.http.request(uri, method, body=body, headers=headers, **kwargs)
+            except RETRYABLE_EXCEPTIONS:
+                self.breaker.record_failure(endpoint)
+                if attempt >= self.max_retries:
+                    raise
+            except QuotaBudgetExceeded:
+                # Refused by the local quota budget: the endpoint itself did not fail
+                if trial:
+                    self.breaker.release_trial(endpoint)
+                raise
+            except Exception:
+                # Not retried, but a failed trial must still re-open the circuit
+                self.breaker.record_failure(endpoint)
+                raise
+            except BaseException:
+                # Interrupted (e.g. KeyboardInterrupt): no outcome, but the trial slot is freed
+                if trial:
+                    self.breaker.release_trial(endpoint)
+                raise
+            else:
+                if not is_retryable_response(resp, content):
+                    self.breaker.record_success(endpoint)
+                    return resp, content
+                self.breaker.record_failure(endpoint)
+                if attempt >= self.max_retries:
+                    # Let googleapiclient raise its usual HttpError
+                    return resp, content
+                retry_after = get_retry_after(resp)
+
+            delay = self.backoff_delay(attempt)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, MAX_RETRY_AFTER))
+            self.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        if hasattr(self.http, 'close'):
+            self.http.close()
@@ -0,0 +1,116 @@
+"""
+Vectorized tag and topic performance table.
+
+analyze_video_performance used to count tags and topics with nested Python
+loops and sort the full counters. compute_term_performance() flattens the
+(video, term) pairs once, maps every term to an integer code and derives all
+per-term figures with bincount over those codes:
+
+- number of videos using the term
+- mean views, engagement rate and retention rate of those videos
+- lift: the mean views and engagement rate relative to the channel average
+
+The resulting table is consumed by both the text report and the JSON export.
+A term repeated within one video counts once for that video. Terms with equal
+usage keep the order in which they first appear.
+"""
+
+# Fields of the video records holding the terms to analyze
+TAG_FIELD = 'tags'
+TOPIC_FIELD = 'extracted_topics'
+
+
+def _round(value, digits=2):
+    # NaN (no video with a retention rate) is exported as null
+    return None if value != value else round(float(value), digits)
+
+
+def compute_term_performance(video_data, field=TAG_FIELD):
+    """
+    Computes the performance of every term (tag or topic) found in a field of the video records.
+
+    Args:
+        video_data: List of video data dictionaries
+        field: Record field holding a list of terms
+
+    Returns:
+        List of dictionaries, one per term, most used terms first
+    """
+    import numpy as np
+
+    if not video_data:
+        return []
+
+    term_lists = [video.get(field) or [] for video in video_data]
+    flat_terms = [term for term_list in term_lists for term in term_list]
+    if not flat_terms:
+        return []
+    # Integer code per term, in order of first appearance
+    codes_by_term = dict.fromkeys(flat_terms)
+    for code, term in enumerate(codes_by_term):
+        codes_by_term[term] = code
+    terms = list(codes_by_term)
+    codes = np.fromiter(map(codes_by_term.__getitem__, flat_terms), dtype=np.int64, count=len(flat_terms))
+    video_index = np.repeat(np.arange(len(video_data), dtype=np.int64), [len(term_list) for term_list in term_lists])
+
+    views = np.array([video['views'] for video in video_data], dtype=np.float64)
+    engagement = np.array([video['engagement_rate'] for video in video_data], dtype=np.float64)
+    retention = np.array([np.nan if video.get('retention_rate') is None else video['retention_rate']
+                          for video in video_data], dtype=np.float64)
+
+    # Sparse video x term incidence as unique (term, video) pairs
+    video_count = len(video_data)
+    pairs = np.sort(codes * video_count + video_index)
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+    pair_terms = pairs // video_count
+    pair_videos = pairs % video_count
+
+    term_count = len(terms)
+    counts = np.bincount(pair_terms, minlength=term_count)
+    mean_views = np.bincount(pair_terms, weights=views[pair_videos], minlength=term_count) / counts
+    mean_engagement = np.bincount(pair_terms, weights=engagement[pair_videos], minlength=term_count) / counts
+
+    has_retention = ~np.isnan(retention[pair_videos])
+    retention_counts = np.bincount(pair_terms[has_retention], minlength=term_count)
+    retention_sums = np.bincount(pair_terms[has_retention], weights=retention[pair_videos][has_retention],
+                                 minlength=term_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_retention = np.where(retention_counts > 0, retention_sums / retention_counts, np.nan)
+
+        channel_views = views.mean()
+        channel_engagement = engagement.mean()
+        views_lift = mean_views / channel_views if channel_views else np.full(term_count, np.nan)
+        engagement_lift = mean_engagement / channel_engagement if channel_engagement else np.full(term_count, np.nan)
+
+    # Stable, so equally used terms keep their order of first appearance
+    order = np.argsort(-counts, kind='stable')
+    return [
+        {
+            'term': terms[i],
+            'videos': int(counts[i]),
+            'avg_views': int(mean_views[i]),
+            'avg_engagement_rate': _round(mean_engagement[i]),
+            'avg_retention_rate': _round(mean_retention[i]),
+            'views_lift': _round(views_lift[i]),
+            'engagement_lift': _round(engagement_lift[i])
+        }
+        for i in order.tolist()
+    ]
+
+
+def compute_tag_performance(video_data):
+    """
+    Returns the performance tables of the tags and of the topics extracted from titles.
+    """
+    return {
+        'tags': compute_term_performance(video_data, TAG_FIELD),
+        'topics': compute_term_performance(video_data, TOPIC_FIELD)
+    }
+
+
+def best_performing_terms(table, min_videos=3, count=10):
+    """
+    Returns the terms with the highest views lift among those used in at least min_videos videos.
+    """
+    eligible = [row for row in table if row['videos'] >= min_videos and row['views_lift'] is not None]
+    return sorted(eligible, key=lambda row: row['views_lift'], reverse=True)[:count]
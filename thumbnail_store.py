@@ -0,0 +1,242 @@
+"""
+Local store of video thumbnails and their vision analyses.
+
+Thumbnails are downloaded through a pooled HTTP session with conditional
+GETs (ETag / Last-Modified), so unchanged images cost a 304 instead of a
+full download. Every image gets a perceptual hash (dHash), and vision
+results are stored per hash and prompt: an unchanged thumbnail is never
+analyzed twice, and visually identical thumbnails reused across videos
+share one result.
+
+Only the validators and the hash of each image are kept, not the image
+itself. Like the LLM response cache, the store is bounded by size (least
+recently used vision results are evicted first) and by age.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from io import BytesIO
+
+from llm_cache import request_cache_key, DEFAULT_MAX_CACHE_BYTES, DEFAULT_MAX_AGE_DAYS
+
+THUMBNAIL_STORE_DIR = 'thumbnail_store'
+
+# Perceptual hashes within this Hamming distance are treated as the same image
+DEFAULT_MAX_HASH_DISTANCE = 2
+
+
+def compute_phash(image_bytes, hash_size=8):
+    """
+    Computes a 64-bit difference hash (dHash) of an image as a hex string.
+
+    The image is shrunk to (hash_size + 1) x hash_size grayscale pixels and
+    each bit records whether a pixel is brighter than its right neighbour,
+    so re-encoding or resizing the same picture yields the same hash.
+    """
+    from PIL import Image
+
+    image = Image.open(BytesIO(image_bytes)).convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(image.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def hash_distance(hash_a, hash_b):
+    """
+    Returns the Hamming distance between two hex perceptual hashes.
+    """
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def prompt_key(request):
+    """
+    Hashes a vision request with its image URLs removed, so the same prompt
+    on the same picture maps to the same key whatever URL the picture has.
+    """
+    messages = []
+    for message in request.get('messages', []):
+        content = message['content']
+        if not isinstance(content, str):
+            content = [part for part in content if part.get('type') != 'image_url']
+        messages.append(dict(message, content=content))
+    return request_cache_key(dict(request, messages=messages))
+
+
+class ThumbnailStore:
+    """
+    Thumbnail image store with perceptual-hash-keyed vision results.
+    """
+
+    def __init__(self, directory=THUMBNAIL_STORE_DIR, max_hash_distance=DEFAULT_MAX_HASH_DISTANCE, pool_size=10,
+                 max_bytes=DEFAULT_MAX_CACHE_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS, llm_cache=None):
+        """
+        llm_cache: Optional llm_cache.LLMCache whose hit/miss counters also count vision result lookups
+        """
+        self.directory = directory
+        self.max_hash_distance = max_hash_distance
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.llm_cache = llm_cache
+        os.makedirs(directory, exist_ok=True)
+
+        self.pool_size = pool_size
+        self._session = None
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, 'thumbnails.db'), check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                phash TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vision_results (
+                phash TEXT NOT NULL,
+                prompt_key TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (phash, prompt_key)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_vision_results_accessed_at ON vision_results (accessed_at)")
+        self.conn.commit()
+
+    @property
+    def session(self):
+        """
+        Pooled keep-alive connections to the thumbnail CDN, created on first download.
+        """
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                self._session.mount('https://', adapter)
+                self._session.mount('http://', adapter)
+            return self._session
+
+    def fetch(self, url, timeout=30):
+        """
+        Downloads a thumbnail unless the stored copy is still current.
+
+        Returns:
+            Perceptual hash of the image, or None if it could not be retrieved
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, phash FROM thumbnails WHERE url = ?", (url,)
+            ).fetchone()
+
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers['If-None-Match'] = row[0]
+            if row[1]:
+                headers['If-Modified-Since'] = row[1]
+
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and row is not None:
+            with self._lock:
+                self.conn.execute("UPDATE thumbnails SET fetched_at = ? WHERE url = ?", (time.time(), url))
+                self.conn.commit()
+            return row[2]
+        if response.status_code != 200:
+            return None
+
+        phash = compute_phash(response.content)
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO thumbnails (url, etag, last_modified, phash, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, response.headers.get('ETag'), response.headers.get('Last-Modified'), phash, time.time())
+            )
+            self.conn.commit()
+        return phash
+
+    def get_analysis(self, phash, request):
+        """
+        Returns a stored vision result for a visually identical image and the same prompt, or None.
+        """
+        key = prompt_key(request)
+        match = None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT phash, analysis, created_at FROM vision_results WHERE phash = ? AND prompt_key = ?", (phash, key)
+            ).fetchone()
+            candidates = [row] if row is not None else []
+            if row is None and self.max_hash_distance:
+                candidates = self.conn.execute(
+                    "SELECT phash, analysis, created_at FROM vision_results WHERE prompt_key = ?", (key,)
+                ).fetchall()
+
+            now = time.time()
+            for candidate_hash, analysis, created_at in candidates:
+                if self.max_age and now - created_at > self.max_age:
+                    continue
+                if hash_distance(phash, candidate_hash) <= self.max_hash_distance:
+                    match = (candidate_hash, analysis)
+                    break
+            if match is not None:
+                self.conn.execute("UPDATE vision_results SET accessed_at = ? WHERE phash = ? AND prompt_key = ?",
+                                  (now, match[0], key))
+                self.conn.commit()
+
+        if self.llm_cache is not None:
+            self.llm_cache.record_lookup(match is not None)
+        return match[1] if match is not None else None
+
+    def put_analysis(self, phash, request, analysis):
+        """
+        Stores the vision result for an image hash and prompt and applies eviction.
+        """
+        if analysis is None:
+            return
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO vision_results (phash, prompt_key, analysis, created_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (phash, prompt_key(request), analysis, now, now, len(analysis.encode('utf-8')))
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        if self.max_age:
+            self.conn.execute("DELETE FROM vision_results WHERE created_at < ?", (now - self.max_age,))
+            self.conn.execute("DELETE FROM thumbnails WHERE fetched_at < ?", (now - self.max_age,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM vision_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for phash, key, size in self.conn.execute(
+                "SELECT phash, prompt_key, size FROM vision_results ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM vision_results WHERE phash = ? AND prompt_key = ?", (phash, key))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+        self.conn.close()
@@ -0,0 +1,581 @@
+"""
+Embedding index over video titles (and optionally comments) for similarity
+search and topic clustering.
+
+extract_topics_from_title() only keeps the first words of each title segment,
+so videos about the same subject phrased differently never meet. This module
+builds a local vector space instead, with NumPy only:
+
+- Titles are tokenized into words and word pairs and turned into TF-IDF
+  vectors with signed feature hashing, so there is no vocabulary to keep in
+  memory. Harvested comments can be mixed in with a lower weight.
+- The L2-normalized vectors are written in chunks to a memory-mapped .npy
+  matrix (youtube_title_vectors.npy), so 100k videos never need the whole
+  matrix in RAM and later queries only page in the rows they touch.
+- A random-hyperplane LSH index (youtube_title_index.npz) answers approximate
+  nearest-neighbor queries: candidates come from the matching buckets of a few
+  hash tables and are re-ranked by exact cosine similarity.
+- Spherical k-means groups the videos into topics. Each topic is labelled with
+  its most distinctive terms and gets performance aggregates (views,
+  engagement, retention), saved to youtube_topic_clusters.json.
+
+Usage:
+    python title_embeddings.py
+    python title_embeddings.py --clusters 30 --comments
+    python title_embeddings.py --similar VIDEO_ID
+    python title_embeddings.py --search "budget travel tips"
+"""
+
+import html
+import json
+import os
+import re
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from comment_harvester import COMMENTS_FILE
+from video_dataset import VIDEO_DATA_FILE, load_video_dataset
+
+VECTORS_FILE = 'youtube_title_vectors.npy'
+INDEX_FILE = 'youtube_title_index.npz'
+CLUSTERS_FILE = 'youtube_topic_clusters.json'
+
+DEFAULT_DIMENSIONS = 512
+DEFAULT_TABLES = 8
+# Target number of videos per LSH bucket, used to pick the number of hyperplanes
+BUCKET_SIZE = 16
+# Rows embedded, hashed or assigned at once, bounds the memory of every step
+CHUNK_ROWS = 8192
+
+# Document frequencies are counted in a larger hash space than the vectors,
+# so the IDF of a term is not blurred by the terms sharing its dimension
+IDF_BITS = 20
+
+# Weight of the comment vector relative to the title vector
+COMMENT_WEIGHT = 0.3
+COMMENTS_PER_VIDEO = 20
+
+FILLER_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
+    'of', 'is', 'it', 'this', 'that', 'my', 'your', 'i', 'you', 'we', 'how', 'what', 'why'
+])
+
+_WORD_RE = re.compile(r'[^\W_]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def tokenize(text):
+    """
+    Returns the features of a text: its non-filler words and adjacent word pairs.
+    """
+    words = [word for word in _WORD_RE.findall(text.lower()) if word not in FILLER_WORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def hash_documents(texts, names=None):
+    """
+    Hashes the features of every text.
+
+    Args:
+        texts: Iterable of strings
+        names: Optional dictionary filled with {hash: feature}, used to label clusters
+
+    Returns:
+        Tuple of (offsets, hashes): the features of text i are hashes[offsets[i]:offsets[i + 1]]
+    """
+    cache = {}
+    offsets = [0]
+    hashes = []
+    for text in texts:
+        for feature in tokenize(text):
+            value = cache.get(feature)
+            if value is None:
+                value = cache[feature] = zlib.crc32(feature.encode('utf-8'))
+            hashes.append(value)
+        offsets.append(len(hashes))
+    if names is not None:
+        names.update((value, feature) for feature, value in cache.items())
+    return np.asarray(offsets, dtype=np.int64), np.asarray(hashes, dtype=np.uint32)
+
+
+def _document_ids(offsets):
+    return np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+
+
+def compute_idf(offsets, hashes):
+    """
+    Returns the smoothed inverse document frequency of every bucket of the IDF hash space.
+    """
+    buckets = (hashes & ((1 << IDF_BITS) - 1)).astype(np.int64)
+    # Count each feature once per document
+    pairs = np.unique(_document_ids(offsets) << IDF_BITS | buckets)
+    df = np.bincount(pairs & ((1 << IDF_BITS) - 1), minlength=1 << IDF_BITS)
+    count = len(offsets) - 1
+    return (np.log((1 + count) / (1 + df)) + 1).astype(np.float32)
+
+
+def embed_rows(offsets, hashes, idf, dimensions, start, stop):
+    """
+    Returns the L2-normalized TF-IDF vectors of documents start..stop as a float32 block.
+    """
+    begin, end = offsets[start], offsets[stop]
+    rows = _document_ids(offsets[start:stop + 1] - begin)
+    block_hashes = hashes[begin:end]
+
+    columns = (block_hashes % dimensions).astype(np.int64)
+    # The top bit gives the sign, so colliding features cancel out on average
+    signs = np.where(block_hashes >> 31, -1.0, 1.0)
+    weights = signs * idf[block_hashes & ((1 << IDF_BITS) - 1)]
+
+    block = np.bincount(rows * dimensions + columns, weights=weights,
+                        minlength=(stop - start) * dimensions)
+    block = block.reshape(stop - start, dimensions).astype(np.float32)
+    return normalize_rows(block)
+
+
+def normalize_rows(block):
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return block / norms
+
+
+def load_comment_texts(video_ids, path=COMMENTS_FILE, per_video=COMMENTS_PER_VIDEO):
+    """
+    Returns {video_id: text} with the first comments of each video in a comments NDJSON file.
+    """
+    wanted = set(video_ids)
+    texts = {}
+    counts = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                comment = json.loads(line)
+            except ValueError:
+                continue
+            video_id = comment.get('video_id')
+            if video_id not in wanted or counts.get(video_id, 0) >= per_video:
+                continue
+            counts[video_id] = counts.get(video_id, 0) + 1
+            # textDisplay is HTML
+            text = html.unescape(_TAG_RE.sub(' ', comment.get('text', '')))
+            texts.setdefault(video_id, []).append(text)
+    return {video_id: ' '.join(parts) for video_id, parts in texts.items()}
+
+
+def _bit_count(count):
+    # Enough hyperplanes for BUCKET_SIZE videos per bucket, within what an int64 code holds
+    return int(np.clip(np.round(np.log2(max(count, 1) / BUCKET_SIZE)), 4, 24))
+
+
+def _hash_codes(block, planes):
+    tables, bits, dimensions = planes.shape
+    projected = block @ planes.reshape(tables * bits, dimensions).T
+    signs = (projected > 0).reshape(len(block), tables, bits)
+    return (signs * (np.int64(1) << np.arange(bits, dtype=np.int64))).sum(axis=2).T
+
+
+class TitleIndex:
+    """
+    Memory-mapped title vectors with a random-hyperplane LSH index.
+    """
+
+    def __init__(self, vectors, video_ids, planes, sorted_codes, order, idf, source=None):
+        self.vectors = vectors
+        self.video_ids = video_ids
+        self.planes = planes
+        self.sorted_codes = sorted_codes
+        self.order = order
+        self.idf = idf
+        self.source = source or {}
+        self._rows = {video_id: row for row, video_id in enumerate(video_ids)}
+
+    @property
+    def dimensions(self):
+        return self.planes.shape[2]
+
+    @classmethod
+    def build(cls, titles, video_ids, comments=None, dimensions=DEFAULT_DIMENSIONS, tables=DEFAULT_TABLES,
+              vectors_path=VECTORS_FILE, seed=0):
+        """
+        Embeds the titles into a memory-mapped matrix at vectors_path and indexes them.
+
+        Args:
+            titles: List of video titles
+            video_ids: List of video IDs, in the same order
+            comments: Optional {video_id: comment text}, mixed in with COMMENT_WEIGHT
+        """
+        count = len(titles)
+        offsets, hashes = hash_documents(titles)
+        idf = compute_idf(offsets, hashes)
+        if comments:
+            comment_offsets, comment_hashes = hash_documents(comments.get(video_id, '') for video_id in video_ids)
+            comment_idf = compute_idf(comment_offsets, comment_hashes)
+
+        rng = np.random.default_rng(seed)
+        planes = rng.standard_normal((tables, _bit_count(count), dimensions)).astype(np.float32)
+        codes = np.empty((tables, count), dtype=np.int64)
+
+        temp_path = vectors_path + '.tmp.npy'
+        vectors = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32, shape=(count, dimensions))
+        for start in range(0, count, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, count)
+            block = embed_rows(offsets, hashes, idf, dimensions, start, stop)
+            if comments:
+                block += COMMENT_WEIGHT * embed_rows(comment_offsets, comment_hashes, comment_idf,
+                                                     dimensions, start, stop)
+                block = normalize_rows(block)
+            vectors[start:stop] = block
+            codes[:, start:stop] = _hash_codes(block, planes)
+        vectors.flush()
+        del vectors
+        os.replace(temp_path, vectors_path)
+
+        order = np.argsort(codes, axis=1, kind='stable')
+        sorted_codes = np.take_along_axis(codes, order, axis=1)
+        return cls(np.load(vectors_path, mmap_mode='r'), list(video_ids), planes, sorted_codes, order, idf)
+
+    def save(self, path=INDEX_FILE):
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, planes=self.planes, sorted_codes=self.sorted_codes, order=self.order,
+                 idf=self.idf, video_ids=np.asarray(self.video_ids, dtype=str),
+                 source=json.dumps(self.source))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE, vectors_path=VECTORS_FILE):
+        """
+        Opens a saved index. The vectors stay on disk and are paged in on demand.
+        """
+        with np.load(path) as data:
+            return cls(np.load(vectors_path, mmap_mode='r'), data['video_ids'].tolist(), data['planes'],
+                       data['sorted_codes'], data['order'], data['idf'], json.loads(str(data['source'])))
+
+    def embed_text(self, text):
+        """
+        Returns the vector of a free-text query, weighted with the IDF of the indexed titles.
+        """
+        offsets, hashes = hash_documents([text])
+        return embed_rows(offsets, hashes, self.idf, self.dimensions, 0, 1)[0]
+
+    def candidates(self, vector, probe_neighbors=True):
+        """
+        Returns the rows sharing an LSH bucket with the vector in any table.
+
+        With probe_neighbors, buckets whose code differs by one bit are probed too.
+        """
+        codes = _hash_codes(vector[np.newaxis, :], self.planes)[:, 0]
+        bits = self.planes.shape[1]
+        probes = [0] + ([np.int64(1) << bit for bit in range(bits)] if probe_neighbors else [])
+
+        found = []
+        for table, code in enumerate(codes):
+            probe_codes = np.asarray([code ^ flip for flip in probes], dtype=np.int64)
+            lows = np.searchsorted(self.sorted_codes[table], probe_codes, side='left')
+            highs = np.searchsorted(self.sorted_codes[table], probe_codes, side='right')
+            found.extend(self.order[table, low:high] for low, high in zip(lows, highs) if high > low)
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def query(self, vector, k=10, exclude=None, exact=False):
+        """
+        Returns up to k (video_id, similarity) pairs closest to the vector.
+
+        Args:
+            exclude: Optional row to leave out (the query video itself)
+            exact: Scan every vector instead of the LSH candidates
+        """
+        if exact:
+            rows = np.arange(len(self.video_ids))
+            scores = np.concatenate([self.vectors[start:start + CHUNK_ROWS] @ vector
+                                     for start in range(0, len(rows), CHUNK_ROWS)])
+        else:
+            rows = self.candidates(vector)
+            # Sorted rows keep the reads from the memory map sequential
+            scores = self.vectors[rows] @ vector if len(rows) else np.empty(0, dtype=np.float32)
+        if exclude is not None:
+            scores = np.where(rows == exclude, -np.inf, scores)
+
+        k = min(k, len(rows) - (exclude is not None and exclude in rows))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self.video_ids[rows[i]], float(scores[i])) for i in best]
+
+    def similar(self, video_id, k=10, exact=False):
+        """
+        Returns the k videos whose titles are closest to the given video.
+        """
+        row = self._rows[video_id]
+        return self.query(np.asarray(self.vectors[row]), k, exclude=row, exact=exact)
+
+    def search(self, text, k=10):
+        """
+        Returns the k videos whose titles are closest to a free-text query.
+        """
+        return self.query(self.embed_text(text), k)
+
+
+def _init_centroids(vectors, n_clusters, rng, sample_size):
+    """
+    Picks k-means++ seeds (with cosine distance) from a sample of the vectors.
+    """
+    count = len(vectors)
+    sample_rows = np.sort(rng.choice(count, size=min(count, sample_size), replace=False))
+    sample = np.asarray(vectors[sample_rows])
+
+    centroids = [sample[rng.integers(len(sample))]]
+    distances = 1 - sample @ centroids[0]
+    for _ in range(1, n_clusters):
+        weights = np.clip(distances, 0, None) ** 2
+        total = weights.sum()
+        choice = rng.choice(len(sample), p=weights / total) if total > 0 else rng.integers(len(sample))
+        centroids.append(sample[choice])
+        distances = np.minimum(distances, 1 - sample @ centroids[-1])
+    return np.asarray(centroids, dtype=np.float32)
+
+
+def cluster_vectors(vectors, n_clusters, iterations=30, seed=0, sample_size=20000):
+    """
+    Groups normalized vectors with spherical k-means (cosine similarity).
+
+    The vectors are read chunk by chunk, so they can be a memory map larger than RAM.
+
+    Returns:
+        Tuple of (labels array, centroids array)
+    """
+    count = len(vectors)
+    n_clusters = max(1, min(n_clusters, count))
+    rng = np.random.default_rng(seed)
+    centroids = _init_centroids(vectors, n_clusters, rng, sample_size)
+    labels = np.full(count, -1, dtype=np.int64)
+
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        best_scores = np.empty(count, dtype=np.float32)
+        changed = 0
+        for start in range(0, count, CHUNK_ROWS):
+            block = np.asarray(vectors[start:start + CHUNK_ROWS])
+            scores = block @ centroids.T
+            block_labels = scores.argmax(axis=1)
+            best_scores[start:start + len(block)] = scores[np.arange(len(block)), block_labels]
+            changed += int((labels[start:start + len(block)] != block_labels).sum())
+            labels[start:start + len(block)] = block_labels
+
+            members = np.zeros((n_clusters, len(block)), dtype=np.float32)
+            members[block_labels, np.arange(len(block))] = 1
+            sums += members @ block
+
+        sizes = np.bincount(labels, minlength=n_clusters)
+        # Reseed empty clusters with the videos that fit their cluster worst
+        empty = np.flatnonzero(sizes == 0)
+        if len(empty):
+            worst = np.argsort(best_scores, kind='stable')[:len(empty)]
+            sums[empty] = np.asarray(vectors[worst])
+        centroids = normalize_rows(sums)
+        if changed == 0:
+            break
+
+    return labels, centroids
+
+
+def default_cluster_count(count):
+    return int(np.clip(np.sqrt(count / 2), 2, 50))
+
+
+def cluster_terms(labels, offsets, hashes, idf, names, n_clusters, top_terms=3):
+    """
+    Returns the most distinctive features of each cluster: frequent in it and rare overall.
+    """
+    documents = _document_ids(offsets)
+    # Each feature counts once per video
+    pairs = np.unique(documents << 32 | hashes.astype(np.int64))
+    clusters = labels[pairs >> 32]
+    feature_hashes = pairs & 0xFFFFFFFF
+    keys, counts = np.unique(clusters << 32 | feature_hashes, return_counts=True)
+    key_clusters = keys >> 32
+    key_hashes = keys & 0xFFFFFFFF
+    scores = counts * idf[key_hashes & ((1 << IDF_BITS) - 1)]
+
+    ranked = np.lexsort((-scores, key_clusters))
+    terms = [[] for _ in range(n_clusters)]
+    for i in ranked:
+        cluster_terms_list = terms[key_clusters[i]]
+        if len(cluster_terms_list) < top_terms:
+            cluster_terms_list.append(names.get(int(key_hashes[i]), ''))
+    return terms
+
+
+def _grouped_mean(labels, values, n_clusters):
+    valid = ~np.isnan(values)
+    sums = np.bincount(labels[valid], weights=values[valid], minlength=n_clusters)
+    counts = np.bincount(labels[valid], minlength=n_clusters)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def summarize_clusters(labels, n_clusters, df, terms, top_videos=3):
+    """
+    Returns per-cluster performance aggregates, the best performing topics first.
+    """
+    views = df['views'].to_numpy(dtype=np.float64)
+    engagement = df['engagement_rate'].to_numpy(dtype=np.float64, na_value=np.nan)
+    retention = df['retention_rate'].to_numpy(dtype=np.float64, na_value=np.nan)
+    titles = df['title'].astype(object).fillna('').tolist()
+    video_ids = df['video_id'].astype(str).tolist()
+
+    sizes = np.bincount(labels, minlength=n_clusters)
+    total_views = np.bincount(labels, weights=views, minlength=n_clusters)
+    avg_views = total_views / np.maximum(sizes, 1)
+    channel_avg_views = views.mean() if len(views) else 0
+    avg_engagement = _grouped_mean(labels, engagement, n_clusters)
+    avg_retention = _grouped_mean(labels, retention, n_clusters)
+
+    # Videos grouped by cluster, most viewed first
+    ranked = np.lexsort((-views, labels))
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+
+    clusters = []
+    for cluster in range(n_clusters):
+        if sizes[cluster] == 0:
+            continue
+        members = ranked[starts[cluster]:starts[cluster + 1]]
+        # Members are sorted by descending views, so the median sits in the middle
+        middle = len(members) // 2
+        median_views = views[members[middle]] if len(members) % 2 else (views[members[middle - 1]] + views[members[middle]]) / 2
+        clusters.append({
+            'cluster': cluster,
+            'label': ', '.join(term for term in terms[cluster] if term),
+            'terms': terms[cluster],
+            'videos': int(sizes[cluster]),
+            'total_views': int(total_views[cluster]),
+            'avg_views': int(avg_views[cluster]),
+            'median_views': int(median_views),
+            'views_index': round(float(avg_views[cluster] / channel_avg_views), 2) if channel_avg_views else None,
+            'avg_engagement_rate': None if np.isnan(avg_engagement[cluster]) else round(float(avg_engagement[cluster]), 2),
+            'avg_retention_rate': None if np.isnan(avg_retention[cluster]) else round(float(avg_retention[cluster]), 2),
+            'top_videos': [{'video_id': video_ids[i], 'title': titles[i], 'views': int(views[i])}
+                           for i in members[:top_videos]]
+        })
+
+    clusters.sort(key=lambda c: c['avg_views'], reverse=True)
+    return clusters
+
+
+def format_cluster_report(clusters):
+    report = "TOPIC CLUSTERS (by average views):\n"
+    for rank, cluster in enumerate(clusters, 1):
+        report += f"{rank}. {cluster['label'] or '(untitled)'} - {cluster['videos']} videos, "
+        report += f"{cluster['avg_views']} avg views"
+        if cluster['views_index'] is not None:
+            report += f" ({cluster['views_index']:.2f}x channel average)"
+        if cluster['avg_engagement_rate'] is not None:
+            report += f", {cluster['avg_engagement_rate']:.2f}% engagement"
+        if cluster['avg_retention_rate'] is not None:
+            report += f", {cluster['avg_retention_rate']:.2f}% retention"
+        report += "\n"
+        for video in cluster['top_videos']:
+            report += f"   - \"{video['title']}\" - {video['views']} views\n"
+    return report
+
+
+def _source_stamp(json_path, with_comments):
+    stat = os.stat(json_path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'comments': with_comments}
+
+
+def open_index(df, json_path=VIDEO_DATA_FILE, with_comments=False, dimensions=DEFAULT_DIMENSIONS,
+               index_path=INDEX_FILE, vectors_path=VECTORS_FILE, rebuild=False):
+    """
+    Returns the index of the videos in df, reusing the saved one if it was built from the same data.
+    """
+    stamp = _source_stamp(json_path, with_comments)
+    if not rebuild and os.path.exists(index_path) and os.path.exists(vectors_path):
+        index = TitleIndex.load(index_path, vectors_path)
+        if index.source == stamp and index.dimensions == dimensions:
+            return index
+
+    video_ids = df['video_id'].astype(str).tolist()
+    comments = None
+    if with_comments:
+        if os.path.exists(COMMENTS_FILE):
+            comments = load_comment_texts(video_ids)
+        else:
+            print(f"No {COMMENTS_FILE} found, indexing titles only")
+    index = TitleIndex.build(df['title'].astype(object).fillna('').tolist(), video_ids, comments,
+                             dimensions=dimensions, vectors_path=vectors_path)
+    index.source = stamp
+    index.save(index_path)
+    return index
+
+
+def build_topic_clusters(json_path=VIDEO_DATA_FILE, n_clusters=None, with_comments=False,
+                         dimensions=DEFAULT_DIMENSIONS, output_file=CLUSTERS_FILE):
+    """
+    Indexes the videos of a video data file, clusters them into topics and saves the summary.
+
+    Returns:
+        Dictionary with the clusters and the cluster of every video
+    """
+    channel, df = load_video_dataset(json_path)
+    if df.empty:
+        raise ValueError(f"No videos found in {json_path}")
+
+    index = open_index(df, json_path, with_comments, dimensions)
+    n_clusters = n_clusters or default_cluster_count(len(df))
+    labels, _ = cluster_vectors(index.vectors, n_clusters)
+
+    names = {}
+    offsets, hashes = hash_documents(df['title'].astype(object).fillna('').tolist(), names)
+    terms = cluster_terms(labels, offsets, hashes, index.idf, names, n_clusters)
+    clusters = summarize_clusters(labels, n_clusters, df, terms)
+
+    result = {
+        'channel': channel,
+        'video_count': len(df),
+        'clusters': clusters,
+        'assignments': dict(zip(index.video_ids, labels.tolist())),
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Embed video titles, find similar videos and cluster them into topics')
+    parser.add_argument('--input', default=VIDEO_DATA_FILE,
+                        help=f'Video data file (default: {VIDEO_DATA_FILE})')
+    parser.add_argument('--clusters', type=int, default=None,
+                        help='Number of topic clusters (default: about sqrt(videos / 2), at most 50)')
+    parser.add_argument('--comments', action='store_true',
+                        help=f'Mix the harvested comments from {COMMENTS_FILE} into the vectors')
+    parser.add_argument('--dimensions', type=int, default=DEFAULT_DIMENSIONS,
+                        help='Dimensions of the title vectors')
+    parser.add_argument('--similar', metavar='VIDEO_ID',
+                        help='List the videos with the most similar titles instead of clustering')
+    parser.add_argument('--search', metavar='TEXT',
+                        help='List the videos whose titles are closest to a text instead of clustering')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Number of results for --similar and --search')
+
+    args = parser.parse_args()
+
+    if args.similar or args.search:
+        _, df = load_video_dataset(args.input)
+        index = open_index(df, args.input, args.comments, args.dimensions)
+        titles = dict(zip(df['video_id'].astype(str), df['title'].astype(object).fillna('')))
+        if args.similar and args.similar not in titles:
+            parser.error(f"Unknown video ID: {args.similar}")
+        matches = index.similar(args.similar, args.top) if args.similar else index.search(args.search, args.top)
+        for rank, (video_id, score) in enumerate(matches, 1):
+            print(f"{rank}. \"{titles[video_id]}\" ({video_id}) - similarity {score:.2f}")
+    else:
+        result = build_topic_clusters(args.input, args.clusters, args.comments, args.dimensions)
+        print(format_cluster_report(result['clusters']))
+        print(f"Topic clusters saved to {CLUSTERS_FILE}")
@@ -0,0 +1,67 @@
+"""
+Batched YouTube Analytics queries shared by the extraction scripts.
+"""
+
+from datetime import datetime, timedelta
+
+from quota import QuotaBudgetExceeded
+
+# Maximum number of video IDs the Analytics API accepts in a single video filter
+ANALYTICS_BATCH_SIZE = 200
+
+
+def get_videos_analytics_batch(youtube_analytics, video_ids, chunk_size=ANALYTICS_BATCH_SIZE):
+    """
+    Retrieves analytics data (average view duration) for many videos at once.
+
+    Instead of one query per video, this sends one report query per chunk of up
+    to 200 video IDs (filters=video==id1,id2,...) and joins the rows back to the
+    videos in memory. The filter returns at most one row per video, so a single
+    page of len(chunk) results always holds the whole chunk.
+
+    Args:
+        youtube_analytics: Authenticated YouTube Analytics API service object
+        video_ids: List of YouTube video IDs
+        chunk_size: Number of video IDs per report query (max 200)
+
+    Returns:
+        Dictionary mapping video ID to its analytics data
+    """
+    # Get the current date and a date 30 days ago
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+
+    analytics = {video_id: {'avg_view_duration': None} for video_id in video_ids}
+
+    for i in range(0, len(video_ids), chunk_size):
+        chunk = video_ids[i:i + chunk_size]
+
+        try:
+            # Video reports require a sort order and at most 200 results per page
+            duration_request = youtube_analytics.reports().query(
+                ids="channel==MINE",
+                startDate=start_date,
+                endDate=end_date,
+                metrics="views,averageViewDuration",
+                dimensions="video",
+                filters=f"video=={','.join(chunk)}",
+                sort="-views",
+                maxResults=len(chunk)
+            )
+            duration_response = duration_request.execute()
+
+            rows = duration_response.get('rows', [])
+            headers = [header['name'] for header in duration_response.get('columnHeaders', [])]
+            video_col = headers.index('video') if 'video' in headers else 0
+            duration_col = headers.index('averageViewDuration') if 'averageViewDuration' in headers else 2
+
+            for row in rows:
+                if row[video_col] in analytics:
+                    analytics[row[video_col]]['avg_view_duration'] = row[duration_col]
+        except QuotaBudgetExceeded:
+            raise
+        except Exception as e:
+            # Leave default values for this chunk and continue with the script
+            print(f"Could not retrieve analytics for {len(chunk)} videos: {str(e)}")
+
+    return analytics
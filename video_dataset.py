@@ -0,0 +1,152 @@
+"""
+Typed, cached columnar dataset of extracted videos.
+
+The analysis scripts used to parse youtube_video_data.json, build a DataFrame
+and coerce its columns on every run. load_video_dataset() does that once and
+stores the typed result as an uncompressed Feather (Arrow IPC) file next to
+the JSON:
+
+- views, likes and comments as int64
+- engagement_rate and retention_rate as float32
+- video_id as a categorical
+- published_at as datetime64 (UTC)
+
+Later runs memory-map the Feather file instead of touching the JSON. The cache
+records the size and modification time of the JSON it was built from and is
+rebuilt as soon as the JSON changes. Without pyarrow the dataset is built from
+the JSON every time.
+"""
+
+import json
+import os
+
+VIDEO_DATA_FILE = 'youtube_video_data.json'
+
+# Video columns kept in the dataset, with their dtypes
+COUNT_COLUMNS = ['views', 'likes', 'comments']
+RATE_COLUMNS = ['engagement_rate', 'retention_rate']
+STRING_COLUMNS = ['title', 'thumbnail_url', 'duration', 'avg_view_duration']
+
+# Schema metadata keys of the Feather cache
+SOURCE_MTIME_KEY = b'source_mtime_ns'
+SOURCE_SIZE_KEY = b'source_size'
+CHANNEL_KEY = b'channel'
+
+
+def get_cache_path(json_path):
+    """
+    Returns the Feather cache path for a video data JSON file.
+    """
+    return os.path.splitext(json_path)[0] + '.feather'
+
+
+def build_video_frame(videos):
+    """
+    Builds the typed DataFrame from a list of video records.
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(videos)
+
+    for column in COUNT_COLUMNS:
+        values = pd.to_numeric(df[column], errors='coerce') if column in df else pd.Series(0, index=df.index)
+        df[column] = values.fillna(0).astype('int64')
+    for column in RATE_COLUMNS:
+        values = pd.to_numeric(df[column], errors='coerce') if column in df else pd.Series(float('nan'), index=df.index)
+        df[column] = values.astype('float32')
+    if 'avg_view_duration_seconds' in df:
+        df['avg_view_duration_seconds'] = pd.to_numeric(df['avg_view_duration_seconds'], errors='coerce').astype('float64')
+    for column in STRING_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype('string')
+
+    df['video_id'] = df['video_id'].astype('category') if 'video_id' in df else pd.Categorical([])
+    if 'published_at' in df:
+        df['published_at'] = pd.to_datetime(df['published_at'], utc=True, errors='coerce')
+
+    # Nested fields (tags, comments, ...) are not needed by the analyzers
+    nested = [column for column in df.columns if df[column].dtype == object]
+    return df.drop(columns=nested)
+
+
+def _source_stamp(json_path):
+    stat = os.stat(json_path)
+    return {SOURCE_MTIME_KEY: str(stat.st_mtime_ns).encode(), SOURCE_SIZE_KEY: str(stat.st_size).encode()}
+
+
+def _read_cache(json_path, cache_path):
+    """
+    Returns (channel, DataFrame) from a fresh Feather cache, or None.
+    """
+    import pyarrow.feather as feather
+
+    if not os.path.exists(cache_path):
+        return None
+    table = feather.read_table(cache_path, memory_map=True)
+    metadata = table.schema.metadata or {}
+    stamp = _source_stamp(json_path)
+    if any(metadata.get(key) != value for key, value in stamp.items()):
+        return None
+    return json.loads(metadata[CHANNEL_KEY]), table.to_pandas()
+
+
+def _write_cache(json_path, cache_path, channel, df):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update(_source_stamp(json_path))
+    metadata[CHANNEL_KEY] = json.dumps(channel, ensure_ascii=False).encode('utf-8')
+
+    # Uncompressed, so later runs can memory-map the columns directly
+    temp_path = cache_path + '.tmp'
+    feather.write_feather(table.replace_schema_metadata(metadata), temp_path, compression='uncompressed')
+    os.replace(temp_path, cache_path)
+
+
+def load_video_dataset(json_path=VIDEO_DATA_FILE, use_cache=True):
+    """
+    Loads the channel info and the typed video DataFrame of a video data JSON file.
+
+    Returns:
+        Tuple of (channel dictionary, DataFrame)
+    """
+    cache_path = get_cache_path(json_path)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        use_cache = False
+
+    if use_cache:
+        cached = _read_cache(json_path, cache_path)
+        if cached is not None:
+            return cached
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    channel = data.get('channel', {})
+    df = build_video_frame(data.get('videos', []))
+
+    if use_cache:
+        _write_cache(json_path, cache_path, channel, df)
+    return channel, df
+
+
+def select_top_videos(df, metric='views', count=10):
+    """
+    Returns the top `count` videos by metric, in the plain types of the JSON records.
+
+    Uses a partial selection (nlargest) instead of sorting the whole dataset.
+    """
+    top = df.nlargest(count, metric).copy()
+
+    top['video_id'] = top['video_id'].astype(str)
+    if 'published_at' in top:
+        top['published_at'] = top['published_at'].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    for column in RATE_COLUMNS:
+        top[column] = top[column].astype('float64').round(2)
+    for column in STRING_COLUMNS:
+        if column in top:
+            top[column] = top[column].astype(object)
+    return top
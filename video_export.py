@@ -0,0 +1,187 @@
+"""
+Streaming export of extracted video records.
+
+VideoExportWriter appends every record to its output files as soon as it is
+produced, instead of collecting the whole channel in memory first:
+
+- youtube_video_data.ndjson: one JSON object per line, flushed after every
+  batch, so downstream jobs can start reading while extraction is running
+- youtube_video_data.csv: the same records as CSV rows
+- youtube_video_data.parquet (optional): columnar export written in row groups
+  with pyarrow
+
+The indented youtube_video_data.json document read by the analysis scripts is
+assembled at the end by streaming the NDJSON file back, so memory use stays
+flat however many videos the channel has.
+"""
+
+import csv
+import json
+import os
+import textwrap
+from datetime import datetime
+
+NDJSON_FILE = 'youtube_video_data.ndjson'
+CSV_FILE = 'youtube_video_data.csv'
+JSON_FILE = 'youtube_video_data.json'
+PARQUET_FILE = 'youtube_video_data.parquet'
+
+# Rows buffered per Parquet row group
+DEFAULT_PARQUET_BATCH_SIZE = 1000
+
+# Exported fields in column order, with their Arrow types
+VIDEO_FIELDS = [
+    ('title', 'string'),
+    ('video_id', 'string'),
+    ('published_at', 'string'),
+    ('thumbnail_url', 'string'),
+    ('duration', 'string'),
+    ('views', 'int64'),
+    ('likes', 'int64'),
+    ('comments', 'int64'),
+    ('engagement_rate', 'float64'),
+    ('avg_view_duration_seconds', 'float64'),
+    ('avg_view_duration', 'string'),
+    ('retention_rate', 'float64'),
+]
+
+
+def format_csv_date(published_at):
+    """
+    Formats an ISO 8601 publication date the way the CSV export shows it.
+    """
+    try:
+        return datetime.strptime(published_at, '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d %H:%M:%S')
+    except (TypeError, ValueError):
+        return published_at
+
+
+def iter_ndjson(path):
+    """
+    Yields the records of an NDJSON file one at a time.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_json_document(path, header, records, records_key, footer):
+    """
+    Writes {**header, records_key: [...records], **footer} as an indented JSON document
+    without holding the records in memory.
+
+    The output is identical to json.dump(document, f, ensure_ascii=False, indent=2).
+    """
+    def member(key, value):
+        text = json.dumps({key: value}, ensure_ascii=False, indent=2)
+        # Strip the enclosing braces of the single-key object
+        return text[2:-2]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        for key, value in header.items():
+            f.write(member(key, value) + ',\n')
+
+        f.write(f'  {json.dumps(records_key)}: [')
+        first = True
+        for record in records:
+            f.write('\n' if first else ',\n')
+            f.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=2), '    '))
+            first = False
+        f.write(']' if first else '\n  ]')
+
+        for key, value in footer.items():
+            f.write(',\n' + member(key, value))
+        f.write('\n}')
+
+
+class ParquetRecordWriter:
+    """
+    Writes records to a Parquet file in row groups of batch_size rows.
+    """
+
+    def __init__(self, path, fields=VIDEO_FIELDS, batch_size=DEFAULT_PARQUET_BATCH_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+        self._pa = pa
+        self.fields = fields
+        self.batch_size = batch_size
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in fields])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self._buffer = []
+
+    def write(self, records):
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        columns = {name: [record.get(name) for record in self._buffer] for name, _ in self.fields}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self.schema))
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+class VideoExportWriter:
+    """
+    Streams video records to NDJSON, CSV and optionally Parquet as they are produced.
+    """
+
+    def __init__(self, output_dir='.', parquet=False, parquet_batch_size=DEFAULT_PARQUET_BATCH_SIZE):
+        self.output_dir = output_dir
+        self.ndjson_path = os.path.join(output_dir, NDJSON_FILE)
+        self.csv_path = os.path.join(output_dir, CSV_FILE)
+        self.parquet_path = os.path.join(output_dir, PARQUET_FILE) if parquet else None
+        self.count = 0
+
+        self._ndjson = open(self.ndjson_path, 'w', encoding='utf-8')
+        self._csv_file = open(self.csv_path, 'w', encoding='utf-8', newline='')
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=[name for name, _ in VIDEO_FIELDS], extrasaction='ignore')
+        self._csv.writeheader()
+        self._parquet = ParquetRecordWriter(self.parquet_path, batch_size=parquet_batch_size) if parquet else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, records):
+        """
+        Appends a batch of records to every output.
+        """
+        records = list(records)
+        self._ndjson.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        self._ndjson.flush()
+
+        for record in records:
+            self._csv.writerow(dict(record, published_at=format_csv_date(record.get('published_at'))))
+        self._csv_file.flush()
+
+        if self._parquet is not None:
+            self._parquet.write(records)
+        self.count += len(records)
+
+    def close(self):
+        if self._ndjson.closed:
+            return
+        self._ndjson.close()
+        self._csv_file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def iter_records(self):
+        """
+        Yields the records written so far, read back from the NDJSON file.
+        """
+        return iter_ndjson(self.ndjson_path)
@@ -0,0 +1,127 @@
+"""
+Single-pass performance statistics over video records.
+
+VideoStats consumes video records one at a time, e.g. straight from the export
+stream or an NDJSON file, and keeps only what the report needs: running sums
+for the averages and a bounded min-heap per ranking. Memory use does not
+depend on the number of videos. Collecting the top K of N videos costs
+O(N log K) instead of one full sort per ranking.
+
+Rankings match a stable descending sort: among videos with equal values, the
+one seen first ranks higher.
+"""
+
+import heapq
+
+# Number of videos kept per ranking
+DEFAULT_TOP_K = 5
+
+# Rankings kept: by views, engagement_rate and retention_rate
+RANKINGS = ('views', 'engagement', 'retention')
+
+
+class VideoStats:
+    """
+    Incremental top-K rankings and averages over video records.
+
+    Usage:
+        stats = VideoStats()
+        stats.update(records)
+        result = stats.result()
+    """
+
+    def __init__(self, top_k=DEFAULT_TOP_K):
+        self.top_k = top_k
+        self.count = 0
+        self.retention_count = 0
+        self.total_views = 0
+        self.total_engagement = 0
+        self.total_retention = 0
+        self.total_title_length = 0
+        self.total_title_words = 0
+        self._heaps = {name: [] for name in RANKINGS}
+
+    def _push(self, name, value, video):
+        heap = self._heaps[name]
+        # (value, -index) is unique, so records themselves are never compared
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, (value, -self.count, video))
+        elif value > heap[0][0]:
+            # A later video with an equal value never displaces an earlier one
+            heapq.heapreplace(heap, (value, -self.count, video))
+
+    def add(self, video):
+        """
+        Adds a single video record.
+        """
+        views = video['views']
+        engagement = video['engagement_rate']
+        retention = video['retention_rate']
+        title = video['title']
+
+        self.total_views += views
+        self.total_engagement += engagement
+        self.total_title_length += len(title)
+        self.total_title_words += len(title.split())
+
+        if self.top_k > 0:
+            self._push('views', views, video)
+            self._push('engagement', engagement, video)
+        if retention is not None:
+            self.retention_count += 1
+            self.total_retention += retention
+            if self.top_k > 0:
+                self._push('retention', retention, video)
+        self.count += 1
+
+    def update(self, videos):
+        """
+        Adds every record of an iterable.
+        """
+        for video in videos:
+            self.add(video)
+
+    def top(self, name):
+        """
+        Returns the records of a ranking, best first.
+        """
+        return [video for _, _, video in sorted(self._heaps[name], key=lambda entry: entry[:2], reverse=True)]
+
+    def result(self):
+        """
+        Returns the statistics as a dictionary:
+
+        - count, retention_count: number of videos, and of videos with a retention rate
+        - top_by_views, top_by_engagement, top_by_retention: top_k records per ranking
+        - avg_views, avg_engagement, avg_retention: averages (0 without data)
+        - avg_title_length, avg_title_words: average title length in characters and words
+        """
+        count = self.count
+        return {
+            'count': count,
+            'retention_count': self.retention_count,
+            'top_by_views': self.top('views'),
+            'top_by_engagement': self.top('engagement'),
+            'top_by_retention': self.top('retention'),
+            'avg_views': self.total_views / count if count else 0,
+            'avg_engagement': self.total_engagement / count if count else 0,
+            'avg_retention': self.total_retention / self.retention_count if self.retention_count else 0,
+            'avg_title_length': self.total_title_length / count if count else 0,
+            'avg_title_words': self.total_title_words / count if count else 0,
+        }
+
+
+def compute_video_stats(videos, top_k=DEFAULT_TOP_K):
+    """
+    Computes the statistics of an iterable of video records in a single pass.
+
+    Args:
+        videos: Iterable of video dictionaries (a list, a generator, iter_ndjson(...))
+        top_k: Number of videos kept per ranking
+
+    Returns:
+        Dictionary as described in VideoStats.result()
+    """
+    stats = VideoStats(top_k=top_k)
+    stats.update(videos)
+    return stats.result()
@@ -0,0 +1,90 @@
+"""
+Local SQLite store of extracted video records.
+
+Each video is keyed by its video ID and remembers when it was last synced,
+so incremental runs only need to fetch new uploads and refresh the
+statistics of videos whose data has become stale.
+"""
+
+import json
+import sqlite3
+import time
+
+VIDEO_STORE_FILE = 'youtube_video_store.db'
+
+
+class VideoStore:
+    """
+    Persistent store of video records keyed by video ID.
+    """
+
+    def __init__(self, path=VIDEO_STORE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                published_at TEXT,
+                data TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_synced_at ON videos (synced_at)")
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def contains(self, video_id):
+        row = self.conn.execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return row is not None
+
+    def get_stale_ids(self, ttl_seconds, now=None):
+        """
+        Returns the IDs of videos that were last synced more than ttl_seconds ago.
+        """
+        now = time.time() if now is None else now
+        rows = self.conn.execute(
+            "SELECT video_id FROM videos WHERE synced_at < ? ORDER BY published_at DESC",
+            (now - ttl_seconds,)
+        )
+        return [row[0] for row in rows]
+
+    def upsert(self, video_entries, synced_at=None):
+        """
+        Inserts or replaces video records and marks them as synced.
+        """
+        synced_at = time.time() if synced_at is None else synced_at
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO videos (video_id, published_at, data, synced_at) VALUES (?, ?, ?, ?)",
+            [
+                (entry['video_id'], entry.get('published_at'), json.dumps(entry, ensure_ascii=False), synced_at)
+                for entry in video_entries
+            ]
+        )
+        self.conn.commit()
+
+    def delete(self, video_ids):
+        """
+        Removes videos that no longer exist on the channel.
+        """
+        self.conn.executemany("DELETE FROM videos WHERE video_id = ?", [(video_id,) for video_id in video_ids])
+        self.conn.commit()
+
+    def iter_videos(self):
+        """
+        Yields stored video records, newest first.
+        """
+        for row in self.conn.execute("SELECT data FROM videos ORDER BY published_at DESC"):
+            yield json.loads(row[0])